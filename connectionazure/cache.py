@@ -0,0 +1,232 @@
+from collections import OrderedDict, namedtuple
+import threading
+import hashlib
+import time
+import os
+
+DEFAULT_CLIENT_CACHE_SIZE = 1024
+DEFAULT_READ_CACHE_SIZE = 1024 * 1024 * 1024
+DEFAULT_LISTING_CACHE_SIZE = 256
+
+CacheEntry = namedtuple('CacheEntry', ['etag', 'validated_at', 'data'])
+CacheEntry.__doc__ = """content of a file saved on the disk cache with its ETag and the time it was last validated."""
+
+
+class LRUCache:
+    """thread safe cache that keeps the max_size most recently used items.
+
+    Args:
+        max_size (int, optional): maximum number of items kept. Defaults to DEFAULT_CLIENT_CACHE_SIZE.
+    """
+    def __init__(self, max_size: int=DEFAULT_CLIENT_CACHE_SIZE):
+        self.max_size = max_size
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def get_or_create(self, key, factory):
+        """return the item of the key creating it with factory if it is not cached.
+
+        Args:
+            key (hashable): key of the item.
+            factory (callable): function without args that creates the item.
+
+        Returns:
+            the cached or created item.
+        """
+        with self._lock:
+            if key in self._items:
+                self._items.move_to_end(key)
+                return self._items[key]
+
+        value = factory()
+
+        with self._lock:
+            self._items[key] = value
+            self._items.move_to_end(key)
+            while len(self._items) > self.max_size:
+                self._items.popitem(last=False)
+
+        return value
+
+    def clear(self) -> None:
+        """remove all items of the cache."""
+        with self._lock:
+            self._items.clear()
+
+
+class ListingCache:
+    """thread safe cache of directory listings that expire after ttl seconds.
+
+    The keys are tuples of container, path and if the listing is recursive. Invalidating a path removes all
+    listings of the container that may include it, the listings of its parents and of its subdirectories. Listings
+    that started before an invalidation are not stored, so a listing running while a path changes is never cached.
+
+    Args:
+        ttl (float): seconds a listing is kept.
+        max_size (int, optional): maximum number of listings kept. Defaults to DEFAULT_LISTING_CACHE_SIZE.
+    """
+    def __init__(self, ttl: float, max_size: int=DEFAULT_LISTING_CACHE_SIZE):
+        self.ttl = ttl
+        self.max_size = max_size
+        self.generation = 0
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    @staticmethod
+    def key(container: str, path: str, recursive: bool) -> tuple:
+        """return the key of the listing of a path."""
+        return container, path.strip('/'), recursive
+
+    def _get_item(self, key: tuple):
+        item = self._items.get(key)
+        if item is None:
+            return None
+
+        if time.monotonic() - item[0] >= self.ttl:
+            del self._items[key]
+            return None
+
+        self._items.move_to_end(key)
+        return item
+
+    def get(self, key: tuple):
+        """return the records of the listing or None if it is not cached or expired."""
+        with self._lock:
+            item = self._get_item(key)
+            return None if item is None else item[1]
+
+    def contains_path(self, key: tuple, path: str):
+        """return if path is in the cached listing, None if the listing is not cached or expired."""
+        with self._lock:
+            item = self._get_item(key)
+            return None if item is None else path.strip('/') in item[2]
+
+    def put(self, key: tuple, records, generation: int) -> None:
+        """save the records of a listing started when the cache was at generation."""
+        records = tuple(records)
+        with self._lock:
+            if generation != self.generation:
+                return
+
+            self._items[key] = (time.monotonic(), records, frozenset(record.path for record in records))
+            self._items.move_to_end(key)
+            while len(self._items) > self.max_size:
+                self._items.popitem(last=False)
+
+    def invalidate(self, container: str=None, path: str='') -> None:
+        """remove the listings that may include path, all listings of the container if path is empty
+        and all listings if container is None."""
+        path = path.strip('/')
+        with self._lock:
+            self.generation += 1
+            for key in list(self._items):
+                listed_container, listed_path = key[0], key[1]
+                if container is not None and listed_container != container:
+                    continue
+                if (path == '' or listed_path == '' or path == listed_path or path.startswith(listed_path + '/')
+                        or listed_path.startswith(path + '/')):
+                    del self._items[key]
+
+
+class DiskCache:
+    """cache of file contents on a local folder, bounded by size, shared by threads and processes.
+
+    Each entry is a single file named by the hash of its key with the ETag on the first line followed by the
+    content. Entries are written to a temporary file that is renamed, so readers never see a partial entry. The
+    modification time of the entry is the last time it was stored or validated, used for the TTL, and the access
+    time is set on every hit, used to evict the least recently used entries when the folder is bigger than max_size.
+
+    Args:
+        directory (str): folder of the cache, created if it does not exist.
+        max_size (int, optional): maximum size in bytes of all entries. Defaults to DEFAULT_READ_CACHE_SIZE.
+        ttl (float, optional): seconds an entry is used without being validated, always validated if None. Defaults to None.
+    """
+    def __init__(self, directory: str, max_size: int=DEFAULT_READ_CACHE_SIZE, ttl: float=None):
+        self.directory = directory
+        self.max_size = max_size
+        self.ttl = ttl
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, hashlib.sha256(key.encode()).hexdigest())
+
+    def get(self, key: str):
+        """return the CacheEntry of the key, marking it as recently used, or None if it is not cached."""
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as file_handle:
+                validated_at = os.fstat(file_handle.fileno()).st_mtime
+                etag = file_handle.readline()[:-1].decode()
+                entry = CacheEntry(etag, validated_at, file_handle.read())
+            os.utime(path, (time.time(), validated_at))
+        except FileNotFoundError:
+            return None
+
+        return entry
+
+    def is_fresh(self, entry: CacheEntry) -> bool:
+        """True if the entry was validated less than ttl seconds ago."""
+        return self.ttl is not None and time.time() - entry.validated_at < self.ttl
+
+    def put(self, key: str, etag: str, data: bytes) -> None:
+        """save the content of the key with its ETag, evicting the least recently used entries if needed."""
+        if len(data) > self.max_size:
+            return
+
+        path = self._path(key)
+        temp_path = f'{path}.{os.getpid()}.{threading.get_ident()}.part'
+        try:
+            with open(temp_path, 'wb') as file_handle:
+                file_handle.write(etag.encode() + b'\n')
+                file_handle.write(data)
+            os.replace(temp_path, path)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+
+        self.evict()
+
+    def touch(self, key: str) -> None:
+        """mark the entry of the key as validated and recently used."""
+        try:
+            os.utime(self._path(key))
+        except FileNotFoundError:
+            pass
+
+    def evict(self) -> None:
+        """remove the least recently used entries until the entries fit in max_size."""
+        entries = []
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith('.part'):
+                continue
+            try:
+                stat = entry.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_atime, stat.st_size, entry.path))
+
+        total_size = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total_size <= self.max_size:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total_size -= size
+
+    def clear(self) -> None:
+        """remove all entries of the cache."""
+        for entry in os.scandir(self.directory):
+            try:
+                os.remove(entry.path)
+            except FileNotFoundError:
+                pass
+
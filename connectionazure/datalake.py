@@ -1,19 +1,158 @@
 import os
 from azure.storage.filedatalake import DataLakeServiceClient
+from azure.storage.blob import BlobServiceClient
+from azure.core.exceptions import ResourceNotFoundError, ResourceNotModifiedError
+from azure.core import MatchConditions
 from azure.identity import ClientSecretCredential
-from numpy import source
+from azure.core.pipeline.transport import RequestsTransport
+from requests import Session
+from requests.adapters import HTTPAdapter
 import pandas as pd
-from connectionazure.utils import read_file_as_bytes, write_file_as_bytes
+from connectionazure.utils import iterate_chunks, write_chunks_to_file, write_to_file
+from connectionazure.results import PathRecord, TransferResult, WrittenFile, SyncPlan, DIRECTORY_COLUMNS, LISTING_BATCH_SIZE, \
+    path_records_to_table, containers_to_table
+from connectionazure.cache import LRUCache, DiskCache, ListingCache, DEFAULT_CLIENT_CACHE_SIZE, DEFAULT_READ_CACHE_SIZE, \
+    DEFAULT_LISTING_CACHE_SIZE
+from connectionazure.retry import call_with_retries, call_with_throttling_retries, TokenBucket, AdaptiveConcurrencyLimiter, \
+    ThrottledTransport, DEFAULT_MAX_CONCURRENT_REQUESTS
+from connectionazure.streams import DataLakeFileReader, DataLakeFileWriter
+from connectionazure.parquet import read_parquet_projection, parse_partitions, prune_partition_filters, add_partition_columns, \
+    partition_path, rows_per_file, split_partitions, serialize_dataframe_as_parquet, SIZE_SAMPLE_ROWS
+from connectionazure.filesystem import create_filesystem
+from connectionazure.metrics import NULL_OPERATION
+from connectionazure.listing import compile_path_pattern, pattern_depth, match_path, may_contain_matches
+from connectionazure.sync import SYNC_COMPARE_MODES, list_local_files, list_remote_files, file_md5, is_changed, build_sync_plan
+import pyarrow as pa
+import pyarrow.parquet as pq
 from io import BytesIO
 import concurrent.futures
+import contextvars
+import queue
+import threading
+from collections import deque
+from functools import partial
+import time
+import fnmatch
+
+DEFAULT_CHUNK_SIZE = 8 * 1024 * 1024
+DEFAULT_MAX_CONCURRENCY = 8
+DEFAULT_MAX_RETRIES = 3
+DEFAULT_MAX_WORKERS = 16
+RANGE_READ_AHEAD = 64 * 1024
+DEFAULT_COPY_POLL_INTERVAL = 1.0
+DEFAULT_TARGET_FILE_SIZE = 128 * 1024 * 1024
+# defaults the storage sdk only applies when it creates the transport itself
+CONNECTION_TIMEOUT = 20
+READ_TIMEOUT = 60
+DATA_BLOCK_SIZE = 256 * 1024
+
+
+def _run_transfers(transfers, max_workers: int, max_retries: int=0, progress_callback=None,
+                   retry_function=call_with_retries) -> TransferResult:
+    """run transfers in a pool of threads keeping at most 2 * max_workers of them queued.
+
+    Args:
+        transfers (iterable): tuples with the path reported on the result, the function that transfers it
+            returning the number of bytes transferred and the args of the function.
+        max_workers (int): number of transfers running at the same time.
+        max_retries (int, optional): number of retries of each transfer. Defaults to 0.
+        progress_callback (callable, optional): called with the TransferResult after each transfer. Defaults to None.
+        retry_function (callable, optional): function that calls each transfer with retries. Defaults to call_with_retries.
+
+    Returns:
+        TransferResult: paths transferred, paths that failed with their errors, bytes transferred and time spent.
+    """
+    result = TransferResult()
+    start = time.perf_counter()
+    pending = dict()
+
+    def collect(done):
+        for future in done:
+            path = pending.pop(future)
+            try:
+                result.bytes_transferred += future.result()
+                result.succeeded.append(path)
+            except Exception as error:
+                result.failed[path] = error
+
+            result.elapsed_seconds = time.perf_counter() - start
+            if progress_callback is not None:
+                progress_callback(result)
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+        for path, function, args in transfers:
+            if len(pending) >= 2 * max_workers:
+                done, _ = concurrent.futures.wait(pending, return_when=concurrent.futures.FIRST_COMPLETED)
+                collect(done)
+
+            pending[executor.submit(contextvars.copy_context().run, retry_function, function, max_retries, *args)] = path
+
+        collect(concurrent.futures.as_completed(list(pending)))
+
+    result.elapsed_seconds = time.perf_counter() - start
+
+    return result
 
 
 class ConnectionAzureDataLake:
-    def __init__(self):
-        pass
-
-    def initialize_storage_account_ad_env_variable(self) -> None:
+    def __init__(self, client_cache_size: int=DEFAULT_CLIENT_CACHE_SIZE, read_cache_directory: str=None,
+                 read_cache_size: int=DEFAULT_READ_CACHE_SIZE, read_cache_ttl: float=None, listing_cache_ttl: float=None,
+                 listing_cache_size: int=DEFAULT_LISTING_CACHE_SIZE, max_requests_per_second: float=None,
+                 max_concurrent_requests: int=DEFAULT_MAX_CONCURRENT_REQUESTS, metrics=None):
+        """
+        Args:
+            client_cache_size (int, optional): number of file system and directory clients reused between calls.
+                Defaults to DEFAULT_CLIENT_CACHE_SIZE.
+            read_cache_directory (str, optional): local folder used to cache the files downloaded by
+                download_file_as_binary, disabled if None. Defaults to None.
+            read_cache_size (int, optional): maximum size in bytes of the read cache. Defaults to DEFAULT_READ_CACHE_SIZE.
+            read_cache_ttl (float, optional): seconds a cached file is used without checking its ETag, always
+                checked if None. Defaults to None.
+            listing_cache_ttl (float, optional): seconds a directory listing is reused, disabled if None. Defaults to None.
+            listing_cache_size (int, optional): number of directory listings cached. Defaults to DEFAULT_LISTING_CACHE_SIZE.
+            max_requests_per_second (float, optional): requests per second sent by all threads of the connection,
+                unlimited if None. With many processes each one should receive its share of the account limit. Defaults to None.
+            max_concurrent_requests (int, optional): maximum requests in flight of the connection, the limit is halved when
+                the service throttles the requests and raised again when the latency recovers.
+                Defaults to DEFAULT_MAX_CONCURRENT_REQUESTS.
+            metrics (MetricsRecorder, optional): recorder of the wall time by phase, bytes, requests and retries of
+                the calls and of the latency of each request, disabled if None. Defaults to None.
+        """
+        self.client_cache = LRUCache(client_cache_size)
+        self.read_cache = None if read_cache_directory is None else DiskCache(read_cache_directory, read_cache_size,
+                                                                               read_cache_ttl)
+        self.listing_cache = None if listing_cache_ttl is None else ListingCache(listing_cache_ttl, listing_cache_size)
+        self.rate_limiter = None if max_requests_per_second is None else TokenBucket(max_requests_per_second)
+        self.concurrency_limiter = AdaptiveConcurrencyLimiter(max_concurrent_requests)
+        self.connection_pool_size = None
+        self.metrics = metrics
+
+    @property
+    def service_client(self):
+        return self._service_client
+
+    @service_client.setter
+    def service_client(self, service_client):
+        self._service_client = service_client
+        self._blob_service_client = None
+        self.client_cache.clear()
+
+    @property
+    def blob_service_client(self) -> BlobServiceClient:
+        """client of the blob endpoint of the same storage account and credential, used by server side copies."""
+        if self._blob_service_client is None:
+            self._blob_service_client = BlobServiceClient(
+                account_url=self.service_client.primary_endpoint.replace('.dfs.', '.blob.', 1),
+                credential=self.service_client.credential, transport=self._create_transport())
+
+        return self._blob_service_client
+
+    def initialize_storage_account_ad_env_variable(self, connection_pool_size: int=None) -> None:
         """get cliend id, client secrect, tenant id and the storage account name from the enviroment variables and authenticat.
+
+        Args:
+            connection_pool_size (int, optional): number of http connections kept open, it should be at least the number
+                of parallel workers. Defaults to None, the default of the sdk.
         """
         client_id = os.environ['client_id']
         client_secret = os.environ['client_secret']
@@ -22,56 +161,302 @@ class ConnectionAzureDataLake:
 
         credential = ClientSecretCredential(tenant_id, client_id, client_secret)
 
+        self.connection_pool_size = connection_pool_size
         self.service_client = DataLakeServiceClient(account_url="{}://{}.dfs.core.windows.net".format(
-            "https", storage_account_name), credential=credential)
-    
+            "https", storage_account_name), credential=credential, transport=self._create_transport())
+
+    def _create_transport(self) -> ThrottledTransport:
+        if self.connection_pool_size is None:
+            transport = RequestsTransport(connection_timeout=CONNECTION_TIMEOUT, read_timeout=READ_TIMEOUT,
+                                          connection_data_block_size=DATA_BLOCK_SIZE)
+        else:
+            session = Session()
+            session.mount('https://', HTTPAdapter(pool_connections=self.connection_pool_size,
+                                                  pool_maxsize=self.connection_pool_size))
+            transport = RequestsTransport(session=session, session_owner=False, connection_timeout=CONNECTION_TIMEOUT,
+                                          read_timeout=READ_TIMEOUT, connection_data_block_size=DATA_BLOCK_SIZE)
+
+        return ThrottledTransport(transport, self.concurrency_limiter, self.rate_limiter, metrics=self.metrics)
+
+    def _operation(self, name: str):
+        """return the context manager that measures a call of a method, a no-op if metrics are disabled."""
+        if self.metrics is None:
+            return NULL_OPERATION
+        return self.metrics.operation(name)
+
+    def get_file_system_client(self, container: str):
+        """get the client of a container reusing it from the client cache.
+
+        Args:
+            container (str): name of the container.
+
+        Returns:
+            FileSystemClient: client of the container.
+        """
+        return self.client_cache.get_or_create(
+            (container,), lambda: self.service_client.get_file_system_client(file_system=container))
+
+    def get_directory_client(self, container: str, path: str):
+        """get the client of a directory reusing it from the client cache.
+
+        Args:
+            container (str): name of the container.
+            path (str): path of the directory.
+
+        Returns:
+            DataLakeDirectoryClient: client of the directory.
+        """
+        return self.client_cache.get_or_create(
+            (container, path), lambda: self.get_file_system_client(container).get_directory_client(path))
+
+    def iterate_directory_pages(self, container: str, path='', recursive=True, max_results: int=None,
+                                continuation_token: str=None):
+        """iterate over the pages of a directory listing, allowing to resume it from a continuation token.
+
+        Args:
+            container (str): container name.
+            path (str, optional): path to that will be list content. Defaults to ''.
+            recursive (bool, optional): if the content of the subdirectories will be listed. Defaults to True.
+            max_results (int, optional): maximum number of paths of each page. Defaults to None, the service limit.
+            continuation_token (str, optional): token returned with a previous page to resume the listing. Defaults to None.
+
+        Yields:
+            tuple: list of PathRecord of the page and the continuation token of the next page, None on the last page.
+        """
+        file_system_client = self.get_file_system_client(container)
+
+        pages = file_system_client.get_paths(path=path, recursive=recursive, max_results=max_results).by_page(
+            continuation_token=continuation_token)
+
+        for page in pages:
+            records = [PathRecord(path_properties.permissions, path_properties.name, path_properties.last_modified,
+                                  path_properties.owner, path_properties.is_directory, path_properties.content_length,
+                                  path_properties.etag) for path_properties in page]
+
+            yield records, pages.continuation_token
+
+    def iterate_directory_contents(self, container: str, path='', recursive=True, max_results: int=None,
+                                   continuation_token: str=None):
+        """iterate over all directory content page by page without loading it in memory.
+
+        Args:
+            container (str): container name.
+            path (str, optional): path to that will be list content. Defaults to ''.
+            recursive (bool, optional): if the content of the subdirectories will be listed. Defaults to True.
+            max_results (int, optional): maximum number of paths of each page. Defaults to None, the service limit.
+            continuation_token (str, optional): token returned with a previous page to resume the listing. Defaults to None.
+
+        Yields:
+            PathRecord: permission, path, last modified data, owner, if it is a directory, size and etag of each path.
+        """
+        if self.listing_cache is None or max_results is not None or continuation_token is not None:
+            for records, _ in self.iterate_directory_pages(container, path, recursive=recursive, max_results=max_results,
+                                                           continuation_token=continuation_token):
+                yield from records
+            return
+
+        key = ListingCache.key(container, path, recursive)
+        cached = self.listing_cache.get(key)
+        if cached is not None:
+            yield from cached
+            return
+
+        generation = self.listing_cache.generation
+        listed = []
+        for records, _ in self.iterate_directory_pages(container, path, recursive=recursive):
+            listed.extend(records)
+            yield from records
+
+        self.listing_cache.put(key, listed, generation)
+
+    def invalidate_listing_cache(self, container: str=None, path: str='') -> None:
+        """remove the cached listings that may include a path.
+
+        Args:
+            container (str, optional): container of the path, all listings are removed if None. Defaults to None.
+            path (str, optional): path that changed, all listings of the container are removed if empty. Defaults to ''.
+        """
+        if self.listing_cache is not None:
+            self.listing_cache.invalidate(container, path)
 
-    def list_directory_contents(self, container: str, path='') -> pd.DataFrame:
+    def list_directory_contents(self, container: str, path='', as_table=False):
         """list all directory content.
 
+        The listing is built as an arrow table one page at a time, with typed columns and permissions and owner
+        dictionary encoded.
+
         Args:
             container (str): container name.
             path (str, optional): path to that will be list content. Defaults to ''.
+            as_table (bool, optional): if a pyarrow Table with the columns of PATH_SCHEMA, size and etag included,
+                is returned instead of a dataframe. Defaults to False.
 
         Returns:
-            DataFrame: return a dataframe with the permission, path, last modified data, owner and the name of the directory.
+            DataFrame: return a dataframe with the permission, path, last modified data, owner and the name of the directory,
+                or a pa.Table if as_table is True.
         """
-        file_system_client = self.service_client.get_file_system_client(file_system=container)
+        with self._operation('list_directory_contents') as operation, operation.phase('serialization'):
+            table = path_records_to_table(operation.iterate(self.iterate_directory_contents(container, path), 'listing'))
 
-        paths = file_system_client.get_paths(path=path)
+            return table if as_table else table.select(DIRECTORY_COLUMNS).to_pandas()
 
-        directories = dict()
-        count=0
-        for path in paths:
-            directory = dict()
-            directory['permissions'] = path.permissions
-            directory['path'] = path.name
-            directory['last_modified'] = path.last_modified
-            directory['owner'] = path.owner
-            directory['is_directory'] = path.is_directory
-            directories[count] = directory.copy()
-            count+=1
+    def iterate_directory_tree(self, container: str, path: str='', max_depth: int=None, fan_out_depth: int=1,
+                               pattern: str=None, regex=False, include_directories=True,
+                               max_workers: int=DEFAULT_MAX_WORKERS):
+        """list a directory tree with the subdirectories listed in parallel, yielding the paths as they are listed.
 
-        return pd.DataFrame(directories).T
+        The first fan_out_depth levels are listed one directory at a time and each subdirectory found on them is
+        listed by a pool of max_workers threads, the subdirectories of the last of these levels recursively. With
+        max_depth or a pattern without '**' every level is listed one directory at a time down to the deepest
+        level needed. The directories that can not have paths matching the pattern are skipped with their subtree.
+        The paths of the directories listed at the same time are merged, so they are not yielded in order.
 
-    def list_containers(self) -> pd.DataFrame:
-        """list containers in the storage account.
+        Args:
+            container (str): container name.
+            path (str, optional): path of the directory listed. Defaults to ''.
+            max_depth (int, optional): deepest level listed, the children of path are on level 1. Defaults to None, all levels.
+            fan_out_depth (int, optional): levels listed before the subtrees are listed recursively. Defaults to 1.
+            pattern (str, optional): levels separated by '/' of the paths yielded relative to path, each one a glob
+                matched against the name on that level, '**' matches any number of levels. Defaults to None.
+            regex (bool, optional): if the levels of the pattern are regular expressions instead of globs. Defaults to False.
+            include_directories (bool, optional): if directories are yielded or only files. Defaults to True.
+            max_workers (int, optional): number of directories listed at the same time. Defaults to DEFAULT_MAX_WORKERS.
+
+        Yields:
+            PathRecord: permission, path, last modified data, owner, if it is a directory, size and etag of each path.
+        """
+        root = path.strip('/')
+        root_depth = len([part for part in root.split('/') if part])
+        matchers = None if pattern is None else compile_path_pattern(pattern, regex)
+
+        depth_limit = max_depth
+        if matchers is not None and pattern_depth(matchers) is not None:
+            depth_limit = pattern_depth(matchers) if depth_limit is None else min(depth_limit, pattern_depth(matchers))
+
+        results = queue.Queue(maxsize=2 * max_workers)
+        stop = threading.Event()
+        lock = threading.Lock()
+        pending = 0
+        futures = set()
+
+        def put(item):
+            while not stop.is_set():
+                try:
+                    results.put(item, timeout=0.1)
+                    return
+                except queue.Full:
+                    continue
+
+        def accept(record, names):
+            return ((depth_limit is None or len(names) <= depth_limit) and (include_directories or not record.is_directory)
+                    and (matchers is None or match_path(names, matchers)))
+
+        def descend(names):
+            return ((depth_limit is None or len(names) < depth_limit)
+                    and (matchers is None or may_contain_matches(names, matchers)))
+
+        def list_directory(directory, recursive):
+            try:
+                batch = []
+                for record in self.iterate_directory_contents(container, directory, recursive=recursive):
+                    if stop.is_set():
+                        return
+
+                    names = record.path.split('/')[root_depth:]
+                    if accept(record, names):
+                        batch.append(record)
+                        if len(batch) >= LISTING_BATCH_SIZE:
+                            put(('records', batch))
+                            batch = []
+
+                    if not recursive and record.is_directory and descend(names):
+                        submit(record.path, len(names))
+
+                put(('records', batch))
+                put(('done', None))
+            except ResourceNotFoundError as error:
+                put(('error', error) if directory == root else ('done', None))
+            except Exception as error:
+                put(('error', error))
+
+        def submit(directory, depth):
+            nonlocal pending
+            with lock:
+                pending += 1
+                future = executor.submit(contextvars.copy_context().run, list_directory, directory,
+                                         depth_limit is None and depth >= fan_out_depth)
+                futures.add(future)
+            future.add_done_callback(discard)
+
+        def discard(future):
+            with lock:
+                futures.discard(future)
+
+        executor = concurrent.futures.ThreadPoolExecutor(max_workers=max_workers)
+        try:
+            submit(root, 0)
+            while pending > 0:
+                kind, value = results.get()
+                if kind == 'records':
+                    yield from value
+                elif kind == 'done':
+                    with lock:
+                        pending -= 1
+                else:
+                    raise value
+        finally:
+            stop.set()
+            with lock:
+                queued = list(futures)
+            for future in queued:
+                future.cancel()
+            executor.shutdown(wait=True)
+
+    def list_directory_tree(self, container: str, path: str='', max_depth: int=None, fan_out_depth: int=1,
+                            pattern: str=None, regex=False, include_directories=True,
+                            max_workers: int=DEFAULT_MAX_WORKERS, as_table=False):
+        """list a directory tree with the subdirectories listed in parallel, see iterate_directory_tree.
+
+        Args:
+            container (str): container name.
+            path (str, optional): path of the directory listed. Defaults to ''.
+            max_depth (int, optional): deepest level listed, the children of path are on level 1. Defaults to None, all levels.
+            fan_out_depth (int, optional): levels listed before the subtrees are listed recursively. Defaults to 1.
+            pattern (str, optional): levels separated by '/' of the paths listed relative to path, each one a glob
+                matched against the name on that level, '**' matches any number of levels. Defaults to None.
+            regex (bool, optional): if the levels of the pattern are regular expressions instead of globs. Defaults to False.
+            include_directories (bool, optional): if directories are listed or only files. Defaults to True.
+            max_workers (int, optional): number of directories listed at the same time. Defaults to DEFAULT_MAX_WORKERS.
+            as_table (bool, optional): if a pyarrow Table with the columns of PATH_SCHEMA is returned instead of
+                a dataframe. Defaults to False.
 
         Returns:
-            pd.DataFrame: Returns a dataframe with the container name and the last date of modification.
+            DataFrame: dataframe with the permission, path, last modified data, owner and if it is a directory sorted
+                by path, or a pa.Table if as_table is True.
         """
-        containers = self.service_client.list_file_systems()
+        records = self.iterate_directory_tree(container, path, max_depth=max_depth, fan_out_depth=fan_out_depth,
+                                              pattern=pattern, regex=regex, include_directories=include_directories,
+                                              max_workers=max_workers)
+
+        with self._operation('list_directory_tree') as operation, operation.phase('serialization'):
+            table = path_records_to_table(operation.iterate(records, 'listing')).sort_by('path')
+
+            return table if as_table else table.select(DIRECTORY_COLUMNS).to_pandas()
+
+    def list_containers(self, as_table=False):
+        """list containers in the storage account.
+
+        Args:
+            as_table (bool, optional): if a pyarrow Table is returned instead of a dataframe. Defaults to False.
 
-        all_containers_dict = dict()
-        count=0
-        for container in containers:
-            containers_dict = dict()
-            containers_dict['container'] = container.name
-            containers_dict['last_modified'] = container.last_modified
-            all_containers_dict[count] = containers_dict.copy()
-            count+=1
+        Returns:
+            pd.DataFrame: Returns a dataframe with the container name and the last date of modification,
+                or a pa.Table if as_table is True.
+        """
+        with self._operation('list_containers') as operation, operation.phase('serialization'):
+            table = containers_to_table(operation.iterate(self.service_client.list_file_systems(), 'listing'))
 
-        return pd.DataFrame(all_containers_dict).T
+            return table if as_table else table.to_pandas()
 
     def create_container(self, container_name: str) -> None:
         """create a new container in the storage account.
@@ -80,6 +465,7 @@ class ConnectionAzureDataLake:
             container_name (str): container name.
         """
         self.service_client.create_file_system(file_system=container_name)
+        self.invalidate_listing_cache(container_name)
 
     def delete_container(self, container_name: str) -> None:
         """delete a container in the storage account.
@@ -88,6 +474,7 @@ class ConnectionAzureDataLake:
             container_name (str): container name to be delted.
         """
         self.service_client.delete_file_system(file_system=container_name)
+        self.invalidate_listing_cache(container_name)
 
     def create_directory(self, container: str, path: str):
         """create a directory in the container.
@@ -96,8 +483,9 @@ class ConnectionAzureDataLake:
             container (str): name of the container.
             path (str): path that will be created.
         """
-        file_system_client = self.service_client.get_file_system_client(file_system=container)
+        file_system_client = self.get_file_system_client(container)
         file_system_client.create_directory(path)
+        self.invalidate_listing_cache(container, path)
 
     def delete_directory(self, container: str, path: str):
         """delete directory in datalake.
@@ -106,9 +494,9 @@ class ConnectionAzureDataLake:
             container (str): name of the contaier
             path (str): path of the file to be deleted
         """
-        file_system_client = self.service_client.get_file_system_client(file_system=container)
-        directory_client = file_system_client.get_directory_client(path)
+        directory_client = self.get_directory_client(container, path)
         directory_client.delete_directory()
+        self.invalidate_listing_cache(container, path)
     
     def rename_directory(self, container: str, directory: str, new_directory_name: str):
         """rename directory in the datalake, it is the same of move a file.
@@ -118,22 +506,258 @@ class ConnectionAzureDataLake:
             directory (str): old directory name.
             new_directory_name (str): new directory name.
         """
-        file_system_client = self.service_client.get_file_system_client(file_system=container)
-        directory_client = file_system_client.get_directory_client(directory)
+        directory_client = self.get_directory_client(container, directory)
         new_dir_name = new_directory_name
         directory_client.rename_directory(directory_client.file_system_name + '/' + new_dir_name)
+        self.invalidate_listing_cache(container, directory)
+        self.invalidate_listing_cache(container, new_dir_name)
 
         return True
 
-    def check_if_path_exists(self, container, path, file_name):
-        paths_df = self.list_directory_contents(container=container, path=path)
+    def rename_file(self, container: str, path: str, new_path: str, create_parent=True):
+        """rename a file in the datalake, moving it to new_path in the same container.
 
-        if path=='/':
-            path=''
-        if len(paths_df)>0:
-            if (path + '/' + file_name) in paths_df.path.values:
-                return True
-        return False
+        The service does not create the missing parent directories of new_path on a rename, so the parent is
+        created first unless create_parent is False.
+
+        Args:
+            container (str): name of the container.
+            path (str): path of the file.
+            new_path (str): new path of the file.
+            create_parent (bool, optional): if the parent directory of new_path is created before the rename. Defaults to True.
+        """
+        new_parent = new_path.strip('/').rpartition('/')[0]
+        if create_parent and new_parent:
+            self.create_directory(container, new_parent)
+
+        file_client = self.get_file_system_client(container).get_file_client(path.strip('/'))
+        file_client.rename_file(container + '/' + new_path.strip('/'))
+        self.invalidate_listing_cache(container, path)
+        self.invalidate_listing_cache(container, new_path)
+
+    def delete_file(self, container: str, path: str, file_name: str):
+        """delete a file in datalake.
+
+        Args:
+            container (str): name of the container.
+            path (str): path of the file.
+            file_name (str): name of the file.
+        """
+        self.get_directory_client(container, path).get_file_client(file_name).delete_file()
+        self.invalidate_listing_cache(container, path + '/' + file_name)
+
+    def copy_file(self, source_container: str, source_path: str, sink_container: str, sink_path: str, overwrite=False,
+                  poll_interval: float=DEFAULT_COPY_POLL_INTERVAL) -> int:
+        """copy a file inside the storage account on the service side, the data is not downloaded by the client.
+
+        The copy is started with the copy from URL operation of the blob endpoint and the method waits until the
+        service finishes it, copies inside the same account are usually finished when they are started.
+
+        Args:
+            source_container (str): container of the file.
+            source_path (str): path of the file.
+            sink_container (str): container that will receive the copy, can be the same of the source.
+            sink_path (str): path of the copy.
+            overwrite (bool, optional): if the file will be overwriten or not. Defaults to False.
+            poll_interval (float, optional): seconds between checks of a copy that is pending. Defaults to DEFAULT_COPY_POLL_INTERVAL.
+
+        Raises:
+            Exception: if the file already exists and overwrite equals false it will be raise.
+            Exception: if the service fails or aborts the copy.
+
+        Returns:
+            int: size in bytes of the copied file.
+        """
+        sink_directory, _, sink_file_name = sink_path.strip('/').rpartition('/')
+        if overwrite==False:
+            resp = self.check_if_path_exists(sink_container, sink_directory or '/', sink_file_name)
+            if resp:
+                raise Exception(f"{sink_path} already exists, can be set overwrite=True to overwrite this file.")
+
+        source_blob_client = self.blob_service_client.get_blob_client(source_container, source_path.strip('/'))
+        sink_blob_client = self.blob_service_client.get_blob_client(sink_container, sink_path.strip('/'))
+
+        sink_blob_client.start_copy_from_url(source_blob_client.url)
+
+        properties = sink_blob_client.get_blob_properties()
+        while properties.copy.status == 'pending':
+            time.sleep(poll_interval)
+            properties = sink_blob_client.get_blob_properties()
+
+        self.invalidate_listing_cache(sink_container, sink_path)
+
+        if properties.copy.status != 'success':
+            raise Exception(f'copy of {source_container}/{source_path} to {sink_container}/{sink_path} finished with status '
+                            f'{properties.copy.status}: {properties.copy.status_description}')
+
+        return properties.size
+
+    def copy_directory(self, source_container: str, source_path: str, sink_container: str, sink_path: str, pattern: str=None,
+                       overwrite=True, max_workers: int=DEFAULT_MAX_WORKERS, max_retries: int=DEFAULT_MAX_RETRIES,
+                       poll_interval: float=DEFAULT_COPY_POLL_INTERVAL, progress_callback=None) -> TransferResult:
+        """copy all files of a directory inside the storage account on the service side in parallel.
+
+        Args:
+            source_container (str): container of the files.
+            source_path (str): path of the files that will be copied.
+            sink_container (str): container that will receive the copies, can be the same of the source.
+            sink_path (str): path that replaces source_path on the copies.
+            pattern (str, optional): glob pattern matched against the whole path of the files copied. Defaults to None.
+            overwrite (bool, optional): if existing files will be overwriten or not. Defaults to True.
+            max_workers (int, optional): number of files copied at the same time. Defaults to DEFAULT_MAX_WORKERS.
+            max_retries (int, optional): number of retries of each file. Defaults to DEFAULT_MAX_RETRIES.
+            poll_interval (float, optional): seconds between checks of a copy that is pending. Defaults to DEFAULT_COPY_POLL_INTERVAL.
+            progress_callback (callable, optional): called with the TransferResult after each file. Defaults to None.
+
+        Returns:
+            TransferResult: source paths copied, source paths that failed with their errors, bytes copied and time spent.
+        """
+        source_depth = len([part for part in source_path.split('/') if part != ''])
+
+        def copy_file(path):
+            new_path = '/'.join(part for part in [sink_path.strip('/')] + path.split('/')[source_depth:] if part)
+            return self.copy_file(source_container, path, sink_container, new_path, overwrite=overwrite,
+                                  poll_interval=poll_interval)
+
+        transfers = ((path, copy_file, (path,)) for path in self._select_files(source_container, source_path, pattern))
+
+        return _run_transfers(transfers, max_workers, max_retries=max_retries, progress_callback=progress_callback)
+
+    def _select_files(self, container: str, prefix: str, pattern: str):
+        for record in self.iterate_directory_contents(container, prefix):
+            if not record.is_directory and (pattern is None or fnmatch.fnmatchcase(record.path, pattern)):
+                yield record.path
+
+    def delete_files(self, container: str, paths=None, prefix: str='', pattern: str=None,
+                     max_workers: int=DEFAULT_MAX_WORKERS, max_retries: int=DEFAULT_MAX_RETRIES,
+                     progress_callback=None) -> TransferResult:
+        """delete many files concurrently.
+
+        The files are the paths given or the files listed under prefix whose path matches the glob pattern, the
+        listing is streamed so deletes start with the first page. Deletes are retried only when the service is
+        throttling the requests (HTTP 429 or 503).
+
+        Args:
+            container (str): name of the container.
+            paths (iterable, optional): paths of the files, filtered by pattern if it is set. Defaults to None.
+            prefix (str, optional): path listed to select the files when paths is None. Defaults to ''.
+            pattern (str, optional): glob pattern matched against the whole path of the files. Defaults to None.
+            max_workers (int, optional): number of files deleted at the same time. Defaults to DEFAULT_MAX_WORKERS.
+            max_retries (int, optional): number of retries of each throttled delete. Defaults to DEFAULT_MAX_RETRIES.
+            progress_callback (callable, optional): called with the TransferResult after each file. Defaults to None.
+
+        Raises:
+            Exception: if paths, prefix and pattern are not set, to not delete all files of the container by mistake.
+
+        Returns:
+            TransferResult: paths deleted, paths that failed with their errors and time spent.
+        """
+        if paths is None and prefix.strip('/') == '' and pattern is None:
+            raise Exception('paths, prefix or pattern must be set to delete files')
+
+        if paths is None:
+            paths = self._select_files(container, prefix, pattern)
+        elif pattern is not None:
+            paths = (path for path in paths if fnmatch.fnmatchcase(path, pattern))
+
+        def delete_file(path):
+            directory, _, file_name = path.strip('/').rpartition('/')
+            self.delete_file(container, directory or '/', file_name)
+            return 0
+
+        transfers = ((path, delete_file, (path,)) for path in paths)
+
+        return _run_transfers(transfers, max_workers, max_retries=max_retries, progress_callback=progress_callback,
+                              retry_function=call_with_throttling_retries)
+
+    def rename_paths(self, container: str, renames=None, prefix: str='', pattern: str=None, new_prefix: str=None,
+                     max_workers: int=DEFAULT_MAX_WORKERS, max_retries: int=DEFAULT_MAX_RETRIES,
+                     progress_callback=None) -> TransferResult:
+        """rename many files or directories concurrently in the same container.
+
+        The renames are the pairs of paths given or the files listed under prefix whose path matches the glob
+        pattern, moved to the same relative path under new_prefix. The parent directories of the new paths are created
+        once before the renames. Renames are retried only when the service is throttling the requests (HTTP 429 or 503).
+
+        Args:
+            container (str): name of the container.
+            renames (iterable, optional): tuples with the current and the new path. Defaults to None.
+            prefix (str, optional): path listed to select the files when renames is None. Defaults to ''.
+            pattern (str, optional): glob pattern matched against the whole path of the listed files. Defaults to None.
+            new_prefix (str, optional): path that replaces prefix on the selected files. Defaults to None.
+            max_workers (int, optional): number of paths renamed at the same time. Defaults to DEFAULT_MAX_WORKERS.
+            max_retries (int, optional): number of retries of each throttled rename. Defaults to DEFAULT_MAX_RETRIES.
+            progress_callback (callable, optional): called with the TransferResult after each path. Defaults to None.
+
+        Raises:
+            Exception: if renames is None and new_prefix is not set.
+
+        Returns:
+            TransferResult: current paths renamed, current paths that failed with their errors and time spent.
+        """
+        if renames is None:
+            if new_prefix is None:
+                raise Exception('new_prefix must be set to rename the files selected by prefix and pattern')
+
+            prefix_depth = len([part for part in prefix.split('/') if part != ''])
+            renames = ((path, '/'.join(part for part in [new_prefix.strip('/')] + path.split('/')[prefix_depth:] if part))
+                       for path in self._select_files(container, prefix, pattern))
+
+        renames = list(renames)
+        new_parents = sorted({new_path.strip('/').rpartition('/')[0] for _, new_path in renames} - {''})
+
+        with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+            list(executor.map(lambda new_parent: self.create_directory(container, new_parent), new_parents))
+
+        def rename_path(path, new_path):
+            self.rename_file(container, path, new_path, create_parent=False)
+            return 0
+
+        transfers = ((path, rename_path, (path, new_path)) for path, new_path in renames)
+
+        return _run_transfers(transfers, max_workers, max_retries=max_retries, progress_callback=progress_callback,
+                              retry_function=call_with_throttling_retries)
+
+    def get_path_properties(self, container: str, path: str, file_name: str):
+        """get the properties of a file or directory with a single request.
+
+        Args:
+            container (str): name of the container.
+            path (str): path of the file or directory.
+            file_name (str): name of the file or directory.
+
+        Returns:
+            FileProperties: properties of the path or None if it does not exist.
+        """
+        directory_client = self.get_directory_client(container, path)
+        file_client = directory_client.get_file_client(file_name)
+
+        try:
+            return file_client.get_file_properties()
+        except ResourceNotFoundError:
+            return None
+
+    def check_if_path_exists(self, container: str, path: str, file_name: str) -> bool:
+        """check if a file or directory exists without listing the parent directory.
+
+        If the listing cache has a listing of the parent directory the check is answered from it without requests.
+
+        Args:
+            container (str): name of the container.
+            path (str): path of the file or directory.
+            file_name (str): name of the file or directory.
+
+        Returns:
+            bool: True if the path exists.
+        """
+        if self.listing_cache is not None:
+            full_path = '/'.join(part for part in (path.strip('/'), file_name) if part)
+            for recursive in (False, True):
+                exists = self.listing_cache.contains_path(ListingCache.key(container, path, recursive), full_path)
+                if exists is not None:
+                    return exists
+
+        return self.get_path_properties(container, path, file_name) is not None
 
     def upload_file_to_directory(self, container: str, path: str, file_name: str, data: bytes, overwrite=False):
         """save a string to a file in datalake.
@@ -153,15 +777,17 @@ class ConnectionAzureDataLake:
             if resp:
                 raise Exception(f"{path + '/' + file_name} already exists, can be set overwrite=True to overwrite this file.")
 
-        file_system_client = self.service_client.get_file_system_client(file_system=container)
-        directory_client = file_system_client.get_directory_client(path)
-        file_client = directory_client.create_file(file_name)
+        with self._operation('upload_file_to_directory') as operation, operation.phase('network'):
+            directory_client = self.get_directory_client(container, path)
+            file_client = directory_client.create_file(file_name)
 
-        file_contents = data
+            file_contents = data
 
-        file_client.append_data(data=file_contents, offset=0, length=len(file_contents))
+            file_client.append_data(data=file_contents, offset=0, length=len(file_contents))
 
-        file_client.flush_data(len(file_contents))
+            file_client.flush_data(len(file_contents))
+            operation.add_bytes(len(file_contents))
+        self.invalidate_listing_cache(container, path + '/' + file_name)
 
     def upload_file_to_directory_bulk(self, container: str, path: str, file_name: str, data: bytes, overwrite=False):
         """Upload bigger files to data lake
@@ -178,37 +804,253 @@ class ConnectionAzureDataLake:
             if resp:
                 raise Exception(f"{path + '/' + file_name} already exists, can be set overwrite=True to overwrite this file.")
 
-        file_system_client = self.service_client.get_file_system_client(file_system=container)
+        with self._operation('upload_file_to_directory_bulk') as operation, operation.phase('network'):
+            directory_client = self.get_directory_client(container, path)
+
+            file_client = directory_client.create_file(file_name)
 
-        directory_client = file_system_client.get_directory_client(path)
-        
+            # overwrite must be set to True to end-point work
+            file_client.upload_data(data, overwrite=True)
+            operation.add_bytes(len(data))
+        self.invalidate_listing_cache(container, path + '/' + file_name)
+
+    def open_file_writer(self, container: str, path: str, file_name: str, overwrite=False, chunk_size: int=DEFAULT_CHUNK_SIZE,
+                         max_concurrency: int=DEFAULT_MAX_CONCURRENCY, max_retries: int=DEFAULT_MAX_RETRIES,
+                         compute_md5: bool=False) -> DataLakeFileWriter:
+        """create a file and open a writable stream that uploads to it in chunks appended in parallel.
+
+        The file is only committed when the stream is closed.
+
+        Args:
+            container (str): name of the container.
+            path (str): path were it will be save.
+            file_name (str): name of the file.
+            overwrite (bool, optional): if the file will be overwriten or not. Defaults to False.
+            chunk_size (int, optional): size in bytes of each appended chunk. Defaults to DEFAULT_CHUNK_SIZE.
+            max_concurrency (int, optional): number of chunks uploaded at the same time. Defaults to DEFAULT_MAX_CONCURRENCY.
+            max_retries (int, optional): number of retries of each chunk. Defaults to DEFAULT_MAX_RETRIES.
+            compute_md5 (bool, optional): if the Content-MD5 of the file is saved on the commit. Defaults to False.
+
+        Raises:
+            Exception: if the file already exists and overwrite equals false it will be raise.
+
+        Returns:
+            DataLakeFileWriter: writable stream of the file.
+        """
+        if overwrite==False:
+            resp = self.check_if_path_exists(container, path, file_name)
+            if resp:
+                raise Exception(f"{path + '/' + file_name} already exists, can be set overwrite=True to overwrite this file.")
+
+        directory_client = self.get_directory_client(container, path)
         file_client = directory_client.create_file(file_name)
+        self.invalidate_listing_cache(container, path + '/' + file_name)
+
+        return DataLakeFileWriter(file_client, chunk_size=chunk_size, max_concurrency=max_concurrency, max_retries=max_retries,
+                                  compute_md5=compute_md5,
+                                  on_commit=partial(self.invalidate_listing_cache, container, path + '/' + file_name))
+
+    def upload_file_to_directory_chunked(self, container: str, path: str, file_name: str, data, overwrite=False,
+                                         chunk_size: int=DEFAULT_CHUNK_SIZE, max_concurrency: int=DEFAULT_MAX_CONCURRENCY,
+                                         max_retries: int=DEFAULT_MAX_RETRIES, compute_md5: bool=False) -> int:
+        """Upload a file in chunks appended in parallel and committed with a single flush.
 
-        # overwrite must be set to True to end-point work
-        file_client.upload_data(data, overwrite=True)
+        At most max_concurrency chunks are held in memory at the same time.
 
-    def download_file_as_binary(self, container: str, path: str, file_name: str):
+        Args:
+            container (str): name of the container.
+            path (str): path were it will be save.
+            file_name (str): name of the file.
+            data (bytes or file-like): data that will be save, streams are read chunk by chunk.
+            overwrite (bool, optional): if the file will be overwriten or not. Defaults to False.
+            chunk_size (int, optional): size in bytes of each appended chunk. Defaults to DEFAULT_CHUNK_SIZE.
+            max_concurrency (int, optional): number of chunks uploaded at the same time. Defaults to DEFAULT_MAX_CONCURRENCY.
+            max_retries (int, optional): number of retries of each chunk. Defaults to DEFAULT_MAX_RETRIES.
+            compute_md5 (bool, optional): if the Content-MD5 of the file is saved on the commit. Defaults to False.
+
+        Raises:
+            Exception: if the file already exists and overwrite equals false it will be raise.
+
+        Returns:
+            int: number of bytes uploaded.
+        """
+        with self._operation('upload_file_to_directory_chunked') as operation, operation.phase('network'):
+            with self.open_file_writer(container, path, file_name, overwrite=overwrite, chunk_size=chunk_size,
+                                       max_concurrency=max_concurrency, max_retries=max_retries,
+                                       compute_md5=compute_md5) as writer:
+                for chunk in iterate_chunks(data, chunk_size):
+                    writer.write(chunk)
+
+            operation.add_bytes(writer.tell())
+
+        return writer.tell()
+
+    def iterate_file_chunks(self, container: str, path: str, file_name: str, chunk_size: int=DEFAULT_CHUNK_SIZE,
+                            max_concurrency: int=DEFAULT_MAX_CONCURRENCY, max_retries: int=DEFAULT_MAX_RETRIES):
+        """download a file in byte ranges fetched in parallel and yield them in order.
+
+        At most max_concurrency ranges are held in memory at the same time. Every range is requested with the ETag
+        of the file read before the first one, so if the file is overwritten during the download it fails with
+        ResourceModifiedError instead of yielding bytes of two versions.
+
+        Args:
+            container (str): name of the container.
+            path (str): path of the file.
+            file_name (str): file name.
+            chunk_size (int, optional): size in bytes of each range. Defaults to DEFAULT_CHUNK_SIZE.
+            max_concurrency (int, optional): number of ranges downloaded at the same time. Defaults to DEFAULT_MAX_CONCURRENCY.
+            max_retries (int, optional): number of retries of each range. Defaults to DEFAULT_MAX_RETRIES.
+
+        Yields:
+            bytes: next range of the file.
+        """
+        directory_client = self.get_directory_client(container, path)
+        file_client = directory_client.get_file_client(file_name)
+
+        yield from self._iterate_file_chunks(file_client, file_client.get_file_properties(), chunk_size, max_concurrency,
+                                             max_retries)
+
+    def _iterate_file_chunks(self, file_client, properties, chunk_size: int, max_concurrency: int, max_retries: int):
+        """yield the ranges of a file whose properties were already read, requested with the ETag of properties."""
+        size = properties.size
+
+        def download_range(offset, length):
+            return file_client.download_file(offset=offset, length=length, etag=properties.etag,
+                                             match_condition=MatchConditions.IfNotModified).readall()
+
+        pending = deque()
+        with concurrent.futures.ThreadPoolExecutor(max_workers=max_concurrency) as executor:
+            try:
+                for offset in range(0, size, chunk_size):
+                    length = min(chunk_size, size - offset)
+                    pending.append(executor.submit(contextvars.copy_context().run, call_with_retries, download_range,
+                                                   max_retries, offset, length))
+
+                    if len(pending) >= max_concurrency:
+                        yield pending.popleft().result()
+
+                while pending:
+                    yield pending.popleft().result()
+            finally:
+                for future in pending:
+                    future.cancel()
+
+    def open_file_reader(self, container: str, path: str, file_name: str, read_ahead: int=DEFAULT_CHUNK_SIZE,
+                         max_retries: int=DEFAULT_MAX_RETRIES) -> DataLakeFileReader:
+        """open a seekable readable stream of a file that downloads only the byte ranges that are read.
+
+        Args:
+            container (str): name of the container.
+            path (str): path of the file.
+            file_name (str): file name.
+            read_ahead (int, optional): minimum number of bytes downloaded by each read request. Defaults to DEFAULT_CHUNK_SIZE.
+            max_retries (int, optional): number of retries of each ranged request. Defaults to DEFAULT_MAX_RETRIES.
+
+        Returns:
+            DataLakeFileReader: readable stream of the file.
+        """
+        directory_client = self.get_directory_client(container, path)
+        file_client = directory_client.get_file_client(file_name)
+
+        properties = file_client.get_file_properties()
+
+        return DataLakeFileReader(file_client, properties.size, read_ahead=read_ahead, max_retries=max_retries,
+                                  etag=properties.etag)
+
+    def get_arrow_filesystem(self, read_ahead: int=DEFAULT_CHUNK_SIZE, chunk_size: int=DEFAULT_CHUNK_SIZE,
+                             max_concurrency: int=DEFAULT_MAX_CONCURRENCY):
+        """get a pyarrow filesystem that reads and writes on datalake with this connection.
+
+        The paths of the filesystem are in the format container/directory/file, so it can be used with
+        pyarrow.dataset, pyarrow.parquet.write_to_dataset or pd.read_parquet(path, filesystem=filesystem).
+
+        Args:
+            read_ahead (int, optional): minimum number of bytes downloaded by each read request. Defaults to DEFAULT_CHUNK_SIZE.
+            chunk_size (int, optional): size in bytes of each chunk appended by written files. Defaults to DEFAULT_CHUNK_SIZE.
+            max_concurrency (int, optional): number of chunks uploaded at the same time by each written file. Defaults to DEFAULT_MAX_CONCURRENCY.
+
+        Returns:
+            PyFileSystem: pyarrow filesystem of the storage account.
+        """
+        return create_filesystem(self, read_ahead=read_ahead, chunk_size=chunk_size, max_concurrency=max_concurrency)
+
+    def _download_cached(self, container: str, path: str, file_name: str, chunk_size: int, max_concurrency: int):
+        """return the file from the read cache, downloading it if it is missing or changed, and the number of bytes
+        downloaded, 0 when the cached file was used."""
+        key = f"{container}/{path.strip('/')}/{file_name}"
+        entry = self.read_cache.get(key)
+        if entry is not None and self.read_cache.is_fresh(entry):
+            return entry.data, 0
+
+        file_client = self.get_directory_client(container, path).get_file_client(file_name)
+
+        if chunk_size is not None:
+            properties = file_client.get_file_properties()
+            if entry is not None and properties.etag == entry.etag:
+                self.read_cache.touch(key)
+                return entry.data, 0
+
+            data = b''.join(self._iterate_file_chunks(file_client, properties, chunk_size, max_concurrency,
+                                                      DEFAULT_MAX_RETRIES))
+            self.read_cache.put(key, properties.etag, data)
+            return data, len(data)
+
+        if entry is None:
+            download = file_client.download_file(max_concurrency=max_concurrency)
+        else:
+            try:
+                download = file_client.download_file(etag=entry.etag, match_condition=MatchConditions.IfModified,
+                                                     max_concurrency=max_concurrency)
+            except ResourceNotModifiedError:
+                self.read_cache.touch(key)
+                return entry.data, 0
+
+        data = download.readall()
+        self.read_cache.put(key, download.properties.etag, data)
+
+        return data, len(data)
+
+    def download_file_as_binary(self, container: str, path: str, file_name: str, chunk_size: int=None,
+                                max_concurrency: int=DEFAULT_MAX_CONCURRENCY):
         """download file as binary.
 
+        If the read cache is enabled a cached file is returned without requests while it is fresh by the TTL,
+        otherwise it is validated with its ETag and only downloaded if it changed, in ranges if chunk_size is set.
+        Only the bytes downloaded are counted on the metrics, not the bytes read from the cache.
+
         Args:
             container (str): name of the container.
             path (str): path of the file.
             file_name (str): file name.
+            chunk_size (int, optional): if set the file is downloaded in ranges of this size in parallel. Defaults to None.
+            max_concurrency (int, optional): number of ranges downloaded at the same time. Defaults to DEFAULT_MAX_CONCURRENCY.
 
         Returns:
             Binary: file as binary
         """
-        file_system_client = self.service_client.get_file_system_client(file_system=container)
+        with self._operation('download_file_as_binary') as operation, operation.phase('network'):
+            if self.read_cache is not None:
+                data, downloaded = self._download_cached(container, path, file_name, chunk_size, max_concurrency)
+                operation.add_bytes(downloaded)
+            else:
+                if chunk_size is not None:
+                    data = b''.join(self.iterate_file_chunks(container, path, file_name, chunk_size=chunk_size,
+                                                             max_concurrency=max_concurrency))
+                else:
+                    directory_client = self.get_directory_client(container, path)
 
-        directory_client = file_system_client.get_directory_client(path)
+                    file_client = directory_client.get_file_client(file_name)
 
-        file_client = directory_client.get_file_client(file_name)
+                    download = file_client.download_file()
+
+                    data = download.readall()
 
-        download = file_client.download_file()
+                operation.add_bytes(len(data))
 
-        return download.readall()
+        return data
 
-    def download_file_as_string(self, container: str, path: str, file_name: str, encode='UTF-8'):
+    def download_file_as_string(self, container: str, path: str, file_name: str, encode='UTF-8', chunk_size: int=None,
+                                max_concurrency: int=DEFAULT_MAX_CONCURRENCY):
         """download file as string.
 
         Args:
@@ -216,21 +1058,36 @@ class ConnectionAzureDataLake:
             path (str): path of the file.
             file_name (str): file name.
             encode (str, optional): type of encode of the data. Defaults to 'UTF-8'.
+            chunk_size (int, optional): if set the file is downloaded in ranges of this size in parallel. Defaults to None.
+            max_concurrency (int, optional): number of ranges downloaded at the same time. Defaults to DEFAULT_MAX_CONCURRENCY.
 
         Returns:
             string: file as string
         """
-        downloaded_bytes = self.download_file_as_binary(container, path, file_name)
+        with self._operation('download_file_as_string') as operation:
+            with operation.phase('network'):
+                downloaded_bytes = self.download_file_as_binary(container, path, file_name, chunk_size=chunk_size,
+                                                                max_concurrency=max_concurrency)
+            operation.add_bytes(len(downloaded_bytes))
+
+            with operation.phase('serialization'):
+                return downloaded_bytes.decode(encode)
 
-        return downloaded_bytes.decode(encode)
+    def download_to_file(self, container: str, source_path: str, path_sink: str, chunk_size: int=DEFAULT_CHUNK_SIZE,
+                         max_concurrency: int=DEFAULT_MAX_CONCURRENCY, size: int=None) -> bool:
+        """download a file on datalake to a local file streaming the ranges directly to disk.
 
-    def download_to_file(self, container: str, source_path: str, path_sink: str) -> bool:
-        """download a file on datalake to a local file.
+        Only max_concurrency ranges are held in memory and path_sink is only replaced when the download is complete.
+        When the caller knows the size and it is at most chunk_size the file is downloaded with a single request,
+        without reading its properties first.
 
         Args:
             container (str): source container
             source_path (str): path of the file on the container
             path_sink (str): path that the file will be saved
+            chunk_size (int, optional): size in bytes of each downloaded range. Defaults to DEFAULT_CHUNK_SIZE.
+            max_concurrency (int, optional): number of ranges downloaded at the same time. Defaults to DEFAULT_MAX_CONCURRENCY.
+            size (int, optional): size in bytes of the file, as the content_length of a listing. Defaults to None, unknown.
 
         Returns:
             bool: True if the file was saved.
@@ -238,16 +1095,31 @@ class ConnectionAzureDataLake:
         file_name = source_path.split('/')[-1]
         source_directory = '/'.join(source_path.split('/')[:-1])
 
-        binary = self.download_file_as_binary(container, source_directory, file_name)
+        with self._operation('download_to_file') as operation, operation.phase('network'):
+            if size is not None and size <= chunk_size:
+                file_client = self.get_directory_client(container, source_directory).get_file_client(file_name)
+
+                def download(f):
+                    f.seek(0)
+                    f.truncate()
+                    return file_client.download_file().readinto(f)
+
+                operation.add_bytes(write_to_file(path_sink, partial(call_with_retries, download, DEFAULT_MAX_RETRIES)))
+            else:
+                chunks = self.iterate_file_chunks(container, source_directory, file_name, chunk_size=chunk_size,
+                                                  max_concurrency=max_concurrency)
 
-        write_file_as_bytes(path_sink, binary)
+                operation.add_bytes(write_chunks_to_file(path_sink, chunks))
 
         return True
 
-    def upload_directory_recursive(self, source_path: str, sink_container: str, sink_path: str) -> bool:
+    def upload_directory_recursive(self, source_path: str, sink_container: str, sink_path: str, chunk_size: int=DEFAULT_CHUNK_SIZE,
+                                   max_concurrency: int=DEFAULT_MAX_CONCURRENCY) -> bool:
         """
         move all files from a folder to datalake.
 
+        The files are streamed from disk in chunks, so only max_concurrency chunks of each file are held in memory.
+
         Parameters
         ----------
         source_path : str
@@ -256,6 +1128,10 @@ class ConnectionAzureDataLake:
             container that will be moved to
         sink_path: str
             path that the files will be moved
+        chunk_size: int
+            size in bytes of each uploaded chunk
+        max_concurrency: int
+            number of chunks of a file uploaded at the same time
         """
         directories = os.listdir(source_path)
 
@@ -264,53 +1140,286 @@ class ConnectionAzureDataLake:
 
             if os.path.isdir(local_path):
                 sink_path_added_folder = sink_path + '/' + directory
-                self.upload_directory_recursive(local_path, sink_container, sink_path_added_folder)
+                self.upload_directory_recursive(local_path, sink_container, sink_path_added_folder, chunk_size=chunk_size,
+                                                max_concurrency=max_concurrency)
 
             else:
-                file_content = read_file_as_bytes(local_path)
-                self.upload_file_to_directory_bulk(container=sink_container, path=sink_path, file_name=directory, data=file_content, overwrite=True)
+                with open(local_path, 'rb') as file_handle:
+                    self.upload_file_to_directory_chunked(container=sink_container, path=sink_path, file_name=directory,
+                                                          data=file_handle, overwrite=True, chunk_size=chunk_size,
+                                                          max_concurrency=max_concurrency)
                 print(f'{local_path} copied')
 
         return True
 
-    def download_directory(self, source_container: str, source_path: str, sink_path: str) -> bool:
-        """Download all files of a directory to a local folder.
+    def upload_directory(self, source_path: str, sink_container: str, sink_path: str, overwrite=True,
+                         max_workers: int=DEFAULT_MAX_WORKERS, chunk_size: int=DEFAULT_CHUNK_SIZE,
+                         max_concurrency: int=1, max_retries: int=0, progress_callback=None) -> TransferResult:
+        """upload all files of a local folder to datalake in parallel.
+
+        The local tree is walked once, every remote directory is created once and then the files are
+        streamed from disk by a pool of max_workers threads.
+
+        Args:
+            source_path (str): local folder that will be uploaded.
+            sink_container (str): container that will receive the files.
+            sink_path (str): path that the files will be saved.
+            overwrite (bool, optional): if existing files will be overwriten or not. Defaults to True.
+            max_workers (int, optional): number of files uploaded at the same time. Defaults to DEFAULT_MAX_WORKERS.
+            chunk_size (int, optional): size in bytes of each uploaded chunk. Defaults to DEFAULT_CHUNK_SIZE.
+            max_concurrency (int, optional): number of chunks of each file uploaded at the same time. Defaults to 1.
+            max_retries (int, optional): number of retries of each file. Defaults to 0.
+            progress_callback (callable, optional): called with the TransferResult after each file. Defaults to None.
+
+        Returns:
+            TransferResult: local paths uploaded, local paths that failed with their errors, bytes uploaded and time spent.
+        """
+        remote_folders = []
+        uploads = []
+        for folder, _, file_names in os.walk(source_path):
+            relative_folder = os.path.relpath(folder, source_path).replace(os.sep, '/')
+            remote_folder = sink_path if relative_folder == '.' else sink_path.rstrip('/') + '/' + relative_folder
+
+            if remote_folder.strip('/') != '':
+                remote_folders.append(remote_folder)
+
+            for file_name in file_names:
+                uploads.append((os.path.join(folder, file_name), remote_folder, file_name))
+
+        def upload_file(local_path, remote_folder, file_name):
+            with open(local_path, 'rb') as file_handle:
+                return self.upload_file_to_directory_chunked(container=sink_container, path=remote_folder, file_name=file_name,
+                                                             data=file_handle, overwrite=overwrite, chunk_size=chunk_size,
+                                                             max_concurrency=max_concurrency)
+
+        with self._operation('upload_directory') as operation, operation.phase('network'):
+            with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+                list(executor.map(lambda remote_folder: self.create_directory(sink_container, remote_folder), remote_folders))
+
+            transfers = ((upload[0], upload_file, upload) for upload in uploads)
+
+            result = _run_transfers(transfers, max_workers, max_retries=max_retries, progress_callback=progress_callback)
+            operation.add_bytes(result.bytes_transferred)
+
+        return result
+
+    def download_directory(self, source_container: str, source_path: str, sink_path: str, max_workers: int=DEFAULT_MAX_WORKERS,
+                           chunk_size: int=DEFAULT_CHUNK_SIZE, max_concurrency: int=1, max_retries: int=DEFAULT_MAX_RETRIES,
+                           progress_callback=None) -> TransferResult:
+        """Download all files of a directory to a local folder in parallel.
 
         Args:
             source_container (str): container that the data is.
-            source_path (str): path of the files that 
-            sink_path (str): _description_
+            source_path (str): path of the files that will be downloaded.
+            sink_path (str): local folder that will receive the files.
+            max_workers (int, optional): number of files downloaded at the same time. Defaults to DEFAULT_MAX_WORKERS.
+            chunk_size (int, optional): size in bytes of each downloaded range. Defaults to DEFAULT_CHUNK_SIZE.
+            max_concurrency (int, optional): number of ranges of each file downloaded at the same time. Defaults to 1.
+            max_retries (int, optional): number of retries of each file. Defaults to DEFAULT_MAX_RETRIES.
+            progress_callback (callable, optional): called with the TransferResult after each file. Defaults to None.
 
         Returns:
-            bool: _description_
+            TransferResult: remote paths downloaded, remote paths that failed with their errors, bytes downloaded and time spent.
         """
-        df_directory_list = self.list_directory_contents(source_container, source_path)
-        df_only_file_list = df_directory_list[df_directory_list.is_directory==False].copy()
+        source_depth = len([part for part in source_path.split('/') if part != ''])
+        sink_prefix = sink_path.rstrip('/')
 
-        source_path_list = source_path.split('/')
-        source_path_list_clean = list(filter(lambda a: a != '', source_path_list))
+        def download_file(remote_path, local_path, size):
+            self.download_to_file(source_container, remote_path, local_path, chunk_size=chunk_size,
+                                  max_concurrency=max_concurrency, size=size)
+            return size or 0
 
-        sink_path_list = sink_path.split('/')
-        sink_path_list_clean = list(filter(lambda a: a != '', sink_path_list))
+        def transfers(operation):
+            for record in operation.iterate(self.iterate_directory_contents(source_container, source_path), 'listing'):
+                if record.is_directory:
+                    continue
 
-        df_only_file_list['local_path'] = '/'.join(sink_path_list_clean) + '/' + df_only_file_list.path.str.split('/').apply(lambda x: '/'.join(x[len(source_path_list_clean):]))
+                local_path = sink_prefix + '/' + '/'.join(record.path.split('/')[source_depth:])
+                yield record.path, download_file, (record.path, local_path, record.content_length)
 
-        with concurrent.futures.ThreadPoolExecutor(max_workers=10) as executor:
-            for _, row in df_only_file_list.iterrows():
-                executor.submit(self.download_to_file, source_container, row['path'], row['local_path'])
-            
+        with self._operation('download_directory') as operation, operation.phase('network'):
+            result = _run_transfers(transfers(operation), max_workers, max_retries=max_retries,
+                                    progress_callback=progress_callback)
+            operation.add_bytes(result.bytes_transferred)
 
-        return True
+        return result
+
+    def _list_sync_files(self, container: str, path: str) -> dict:
+        try:
+            return list_remote_files(self.iterate_directory_contents(container, path), path)
+        except ResourceNotFoundError:
+            return dict()
+
+    def _get_content_md5(self, container: str, path: str, file_name: str):
+        properties = self.get_path_properties(container, path, file_name)
+        content_md5 = None if properties is None else properties.content_settings.content_md5
+
+        return bytes(content_md5) if content_md5 else None
+
+    def sync_directory_to_lake(self, source_path: str, sink_container: str, sink_path: str, compare: str='size_mtime',
+                               delete: bool=False, dry_run: bool=False, max_workers: int=DEFAULT_MAX_WORKERS,
+                               chunk_size: int=DEFAULT_CHUNK_SIZE, max_concurrency: int=1, max_retries: int=0,
+                               progress_callback=None) -> SyncPlan:
+        """upload only the files of a local folder that are new or changed on datalake.
+
+        The local folder is walked and the remote path is listed once. With compare='size_mtime' a file is uploaded
+        if it is missing, has other size or was modified after the remote file. With compare='checksum' the files with
+        the same size are compared by the MD5 of the local file and the Content-MD5 of the remote file, falling back
+        to the modification time if the remote file has no Content-MD5, and the uploaded files save their Content-MD5.
+
+        Args:
+            source_path (str): local folder that will be synced.
+            sink_container (str): container that will receive the files.
+            sink_path (str): path that the files will be saved.
+            compare (str, optional): 'size_mtime' or 'checksum'. Defaults to 'size_mtime'.
+            delete (bool, optional): if the remote files that are not on the local folder are deleted. Defaults to False.
+            dry_run (bool, optional): if only the plan is returned without transferring or deleting files. Defaults to False.
+            max_workers (int, optional): number of files compared and uploaded at the same time. Defaults to DEFAULT_MAX_WORKERS.
+            chunk_size (int, optional): size in bytes of each uploaded chunk. Defaults to DEFAULT_CHUNK_SIZE.
+            max_concurrency (int, optional): number of chunks of each file uploaded at the same time. Defaults to 1.
+            max_retries (int, optional): number of retries of each file. Defaults to 0.
+            progress_callback (callable, optional): called with the TransferResult after each file. Defaults to None.
+
+        Raises:
+            Exception: if compare is not a valid mode.
+
+        Returns:
+            SyncPlan: relative paths uploaded, deleted and unchanged with the TransferResult, without result on dry run.
+        """
+        if compare not in SYNC_COMPARE_MODES:
+            raise Exception(f'compare must be one of {SYNC_COMPARE_MODES}, received {compare}')
+
+        def remote_location(relative_path):
+            directory, _, file_name = '/'.join(part for part in (sink_path.strip('/'), relative_path) if part).rpartition('/')
+            return directory or '/', file_name
+
+        def changed(relative_path, source, sink):
+            if compare == 'checksum' and sink is not None and source.size == sink.size:
+                remote_md5 = self._get_content_md5(sink_container, *remote_location(relative_path))
+                if remote_md5 is not None:
+                    return file_md5(os.path.join(source_path, relative_path)) != remote_md5
+
+            return is_changed(source, sink)
 
-    def upload_dataframe_as_parquet(self, df: pd.DataFrame, container: str, sink_path: str, file_name: str, to_parquet_options_dict: dict={}) -> bool:
+        with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+            plan = build_sync_plan(list_local_files(source_path), self._list_sync_files(sink_container, sink_path),
+                                   changed, delete=delete, map_function=executor.map)
+
+        if dry_run:
+            return plan
+
+        def upload_file(relative_path):
+            directory, file_name = remote_location(relative_path)
+            with open(os.path.join(source_path, relative_path), 'rb') as file_handle:
+                return self.upload_file_to_directory_chunked(container=sink_container, path=directory, file_name=file_name,
+                                                             data=file_handle, overwrite=True, chunk_size=chunk_size,
+                                                             max_concurrency=max_concurrency, compute_md5=compare == 'checksum')
+
+        def delete_file(relative_path):
+            directory, file_name = remote_location(relative_path)
+            self.delete_file(sink_container, directory, file_name)
+            return 0
+
+        transfers = [(path, upload_file, (path,)) for path in plan.transfer] + [(path, delete_file, (path,)) for path in plan.delete]
+        plan.result = _run_transfers(transfers, max_workers, max_retries=max_retries, progress_callback=progress_callback)
+
+        return plan
+
+    def sync_lake_to_directory(self, source_container: str, source_path: str, sink_path: str, compare: str='size_mtime',
+                               delete: bool=False, dry_run: bool=False, max_workers: int=DEFAULT_MAX_WORKERS,
+                               chunk_size: int=DEFAULT_CHUNK_SIZE, max_concurrency: int=1,
+                               max_retries: int=DEFAULT_MAX_RETRIES, progress_callback=None) -> SyncPlan:
+        """download only the files of a datalake directory that are new or changed on a local folder.
+
+        The remote path is listed once and the local folder is walked. With compare='size_mtime' a file is downloaded
+        if it is missing, has other size or was modified on datalake after the local file, the downloaded files get
+        the modification time of the remote file. With compare='checksum' the files with the same size are compared by
+        the Content-MD5 of the remote file and the MD5 of the local file, falling back to the modification time if the
+        remote file has no Content-MD5.
+
+        Args:
+            source_container (str): container that the data is.
+            source_path (str): path of the files that will be synced.
+            sink_path (str): local folder that will receive the files.
+            compare (str, optional): 'size_mtime' or 'checksum'. Defaults to 'size_mtime'.
+            delete (bool, optional): if the local files that are not on datalake are deleted. Defaults to False.
+            dry_run (bool, optional): if only the plan is returned without transferring or deleting files. Defaults to False.
+            max_workers (int, optional): number of files compared and downloaded at the same time. Defaults to DEFAULT_MAX_WORKERS.
+            chunk_size (int, optional): size in bytes of each downloaded range. Defaults to DEFAULT_CHUNK_SIZE.
+            max_concurrency (int, optional): number of ranges of each file downloaded at the same time. Defaults to 1.
+            max_retries (int, optional): number of retries of each file. Defaults to DEFAULT_MAX_RETRIES.
+            progress_callback (callable, optional): called with the TransferResult after each file. Defaults to None.
+
+        Raises:
+            Exception: if compare is not a valid mode.
+
+        Returns:
+            SyncPlan: relative paths downloaded, deleted and unchanged with the TransferResult, without result on dry run.
+        """
+        if compare not in SYNC_COMPARE_MODES:
+            raise Exception(f'compare must be one of {SYNC_COMPARE_MODES}, received {compare}')
+
+        def remote_path(relative_path):
+            return '/'.join(part for part in (source_path.strip('/'), relative_path) if part)
+
+        def remote_location(relative_path):
+            directory, _, file_name = remote_path(relative_path).rpartition('/')
+            return directory or '/', file_name
+
+        def local_path(relative_path):
+            return os.path.join(sink_path, *relative_path.split('/'))
+
+        def changed(relative_path, source, sink):
+            if compare == 'checksum' and sink is not None and source.size == sink.size:
+                remote_md5 = self._get_content_md5(source_container, *remote_location(relative_path))
+                if remote_md5 is not None:
+                    return file_md5(local_path(relative_path)) != remote_md5
+
+            return is_changed(source, sink)
+
+        remote_files = self._list_sync_files(source_container, source_path)
+        local_files = list_local_files(sink_path) if os.path.isdir(sink_path) else dict()
+
+        with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+            plan = build_sync_plan(remote_files, local_files, changed, delete=delete, map_function=executor.map)
+
+        if dry_run:
+            return plan
+
+        def download_file(relative_path):
+            remote_file = remote_files[relative_path]
+            self.download_to_file(source_container, remote_path(relative_path), local_path(relative_path),
+                                  chunk_size=chunk_size, max_concurrency=max_concurrency, size=remote_file.size)
+            os.utime(local_path(relative_path), (remote_file.mtime, remote_file.mtime))
+            return remote_file.size
+
+        def delete_file(relative_path):
+            os.remove(local_path(relative_path))
+            return 0
+
+        transfers = [(path, download_file, (path,)) for path in plan.transfer] + [(path, delete_file, (path,)) for path in plan.delete]
+        plan.result = _run_transfers(transfers, max_workers, max_retries=max_retries, progress_callback=progress_callback)
+
+        return plan
+
+    def upload_dataframe_as_parquet(self, df: pd.DataFrame, container: str, sink_path: str, file_name: str, to_parquet_options_dict: dict={},
+                                    row_group_size: int=None, chunk_size: int=DEFAULT_CHUNK_SIZE,
+                                    max_concurrency: int=DEFAULT_MAX_CONCURRENCY) -> bool:
         """upload DataFrame to datalake as parquet.
 
+        If row_group_size is set the dataframe is written row group by row group with pyarrow.parquet.ParquetWriter
+        to a stream that uploads each chunk while the next row groups are serialized, so the whole parquet binary is
+        never held in memory. In this mode the index is not saved and to_parquet_options_dict is sent to ParquetWriter.
+
         Args:
             df (pd.DataFrame): dataframe to be uploaded
             container (str): sink container
             sink_path (str): sink path
             file_name (str): name of the file that will be saved
             to_parquet_options_dict (str): options to transform the dataframe in parquet
+            row_group_size (int, optional): number of rows of each row group written in streaming. Defaults to None.
+            chunk_size (int, optional): size in bytes of each appended chunk on streaming. Defaults to DEFAULT_CHUNK_SIZE.
+            max_concurrency (int, optional): number of chunks uploaded at the same time on streaming. Defaults to DEFAULT_MAX_CONCURRENCY.
 
         Raises:
             Exception: the upload will fail if the path arg on to_parquet_options_dict
@@ -321,26 +1430,235 @@ class ConnectionAzureDataLake:
         if 'path' in to_parquet_options_dict.keys():
             raise Exception('The dataframe will not be saved in datalake if path is sended on kwargs')
 
-        binary = df.to_parquet(**to_parquet_options_dict)
+        with self._operation('upload_dataframe_as_parquet') as operation:
+            if row_group_size is not None:
+                schema = pa.Schema.from_pandas(df, preserve_index=False)
+
+                with operation.phase('network'):
+                    with self.open_file_writer(container, sink_path, file_name, chunk_size=chunk_size,
+                                               max_concurrency=max_concurrency) as sink:
+                        with operation.phase('serialization'):
+                            with pq.ParquetWriter(sink, schema, **to_parquet_options_dict) as parquet_writer:
+                                for start in range(0, len(df), row_group_size):
+                                    row_group = pa.Table.from_pandas(df.iloc[start:start + row_group_size], schema=schema,
+                                                                     preserve_index=False)
+                                    parquet_writer.write_table(row_group)
+
+                operation.add_bytes(sink.tell())
+
+                return True
+
+            with operation.phase('serialization'):
+                binary = df.to_parquet(**to_parquet_options_dict)
 
-        self.upload_file_to_directory_bulk(container=container, path=sink_path, file_name=file_name, data=binary)
+            with operation.phase('network'):
+                self.upload_file_to_directory_bulk(container=container, path=sink_path, file_name=file_name, data=binary)
 
         return True
 
-    def download_parquet_as_dataframe(self, container:str, source_path: str, file_name: str, read_parquet_options_dict:dict = {})-> pd.DataFrame:
+    def upload_partitioned_dataframe(self, df: pd.DataFrame, container: str, sink_path: str, partition_cols: list,
+                                     target_file_size: int=DEFAULT_TARGET_FILE_SIZE, to_parquet_options_dict: dict={},
+                                     max_workers: int=DEFAULT_MAX_WORKERS, max_processes: int=None,
+                                     max_retries: int=0, overwrite=False) -> list:
+        """upload DataFrame to datalake as a hive partitioned folder of parquet files.
+
+        The rows of each partition are saved on sink_path/key=value/part-NNNNN.parquet, split evenly in files of about
+        target_file_size bytes, estimated by serializing the first SIZE_SAMPLE_ROWS rows with the same options. The
+        files are serialized in a pool of max_processes processes while the serialized files are uploaded by
+        max_workers threads.
+
+        Args:
+            df (pd.DataFrame): dataframe to be uploaded
+            container (str): sink container
+            sink_path (str): path of the dataset folder
+            partition_cols (list): columns used as partitions
+            target_file_size (int, optional): approximate size in bytes of each parquet file. Defaults to DEFAULT_TARGET_FILE_SIZE.
+            to_parquet_options_dict (dict, optional): options to transform the dataframe in parquet, index=False if not set. Defaults to {}.
+            max_workers (int, optional): number of files uploaded at the same time. Defaults to DEFAULT_MAX_WORKERS.
+            max_processes (int, optional): number of processes serializing files, 0 serializes on the upload threads.
+                Defaults to None, the number of CPUs.
+            max_retries (int, optional): number of retries of each upload. Defaults to 0.
+            overwrite (bool, optional): if existing files with the same names are overwritten, without checking
+                if each one exists. Defaults to False.
+
+        Raises:
+            Exception: the upload will fail if the path arg on to_parquet_options_dict
+            Exception: if any file fails to be written
+
+        Returns:
+            list: WrittenFile with the path, partitions, number of rows and size of each file sorted by path.
+        """
+        if 'path' in to_parquet_options_dict.keys():
+            raise Exception('The dataframe will not be saved in datalake if path is sended on kwargs')
+
+        options = {'index': False, **to_parquet_options_dict}
+        max_rows = rows_per_file(df.iloc[:SIZE_SAMPLE_ROWS].drop(columns=partition_cols), target_file_size, options)
+        manifest = []
+
+        def upload(directory, file_name, partitions, num_rows, serialize):
+            data = serialize()
+            self.upload_file_to_directory_bulk(container=container, path=directory, file_name=file_name, data=data,
+                                               overwrite=overwrite)
+            manifest.append(WrittenFile(directory + '/' + file_name, partitions, num_rows, len(data)))
+
+            return len(data)
+
+        def transfers(executor):
+            for index, (partitions, frame) in enumerate(split_partitions(df, partition_cols, max_rows)):
+                directory = '/'.join(part for part in (sink_path.strip('/'), partition_path(partitions)) if part)
+                file_name = f'part-{index:05d}.parquet'
+
+                if executor is None:
+                    serialize = partial(serialize_dataframe_as_parquet, frame, options)
+                else:
+                    serialize = executor.submit(serialize_dataframe_as_parquet, frame, options).result
+
+                yield directory + '/' + file_name, upload, (directory, file_name, partitions, len(frame), serialize)
+
+        if max_processes == 0:
+            result = _run_transfers(transfers(None), max_workers, max_retries)
+        else:
+            with concurrent.futures.ProcessPoolExecutor(max_workers=max_processes) as executor:
+                result = _run_transfers(transfers(executor), max_workers, max_retries)
+
+        if not result.ok:
+            path, error = next(iter(result.failed.items()))
+            raise Exception(f'{len(result.failed)} files failed to be written, first failure on {path}') from error
+
+        return sorted(manifest, key=lambda written_file: written_file.path)
+
+    def download_parquet_as_dataframe(self, container:str, source_path: str, file_name: str, read_parquet_options_dict:dict = {},
+                                      columns: list=None, filters: list=None, max_concurrency: int=DEFAULT_MAX_CONCURRENCY)-> pd.DataFrame:
         """download parquet binary as dataframe
 
+        If columns or filters are set only the footer and the column chunks of the row groups that may match the
+        filters are downloaded, with ranged requests made in parallel. In this mode read_parquet_options_dict is not used.
+        If the read cache is enabled the whole file is read through the cache and the columns and filters are applied
+        on the cached file.
+
         Args:
             container (str): source container
             source_path (str): source path
             file_name (str): file name
             read_parquet_options_dict (dict): options to read parquet binary as dataframe
+            columns (list, optional): columns that will be read. Defaults to None.
+            filters (list, optional): filters in the format of pd.read_parquet, used to skip row groups and rows. Defaults to None.
+            max_concurrency (int, optional): number of ranges downloaded at the same time. Defaults to DEFAULT_MAX_CONCURRENCY.
 
         Returns:
             pd.DataFrame: dataframe object generate from binary on datalake
         """
+        with self._operation('download_parquet_as_dataframe') as operation:
+            if self.read_cache is not None and (columns is not None or filters is not None):
+                with operation.phase('network'):
+                    df_binary = self.download_file_as_binary(container=container, path=source_path, file_name=file_name,
+                                                             max_concurrency=max_concurrency)
+                operation.add_bytes(len(df_binary))
+
+                with operation.phase('serialization'):
+                    return pq.read_table(BytesIO(df_binary), columns=columns, filters=filters).to_pandas()
+
+            if columns is not None or filters is not None:
+                with operation.phase('network'):
+                    reader = self.open_file_reader(container, source_path, file_name, read_ahead=RANGE_READ_AHEAD)
+
+                    table = read_parquet_projection(reader, columns=columns, filters=filters,
+                                                    max_concurrency=max_concurrency, chunk_size=DEFAULT_CHUNK_SIZE)
+                operation.add_bytes(reader.bytes_downloaded)
+
+                with operation.phase('serialization'):
+                    return table.to_pandas()
+
+            with operation.phase('network'):
+                df_binary = self.download_file_as_binary(container=container, path=source_path, file_name=file_name)
+            operation.add_bytes(len(df_binary))
+
+            with operation.phase('serialization'):
+                pq_file = BytesIO(df_binary)
+
+                return pd.read_parquet(pq_file, **read_parquet_options_dict)
+
+    def iterate_parquet_dataset(self, container: str, path: str, columns: list=None, filters: list=None,
+                                max_workers: int=DEFAULT_MAX_WORKERS, max_concurrency: int=1):
+        """read a hive partitioned folder of parquet files yielding one table per file in order.
+
+        The folder is listed once, the files whose key=value partitions can not match the filters are skipped and
+        the other files are downloaded and decoded by max_workers threads, reading only the needed columns and row
+        groups. At most max_workers tables are held in memory at the same time.
+
+        Args:
+            container (str): source container
+            path (str): path of the dataset folder
+            columns (list, optional): columns that will be read, partition keys included. Defaults to None.
+            filters (list, optional): filters in the format of pd.read_parquet on partitions and columns. Defaults to None.
+            max_workers (int, optional): number of files read at the same time. Defaults to DEFAULT_MAX_WORKERS.
+            max_concurrency (int, optional): number of ranges of each file downloaded at the same time. Defaults to 1.
+
+        Yields:
+            pa.Table: rows of each file with the partition keys as string columns.
+        """
+        prefix_depth = len([part for part in path.split('/') if part != ''])
+
+        def read_file(record, partitions, file_filters):
+            directory, _, file_name = record.path.rpartition('/')
+            file_columns = None if columns is None else [column for column in columns if column not in partitions]
+
+            reader = self.open_file_reader(container, directory or '/', file_name, read_ahead=RANGE_READ_AHEAD)
+            table = read_parquet_projection(reader, columns=file_columns, filters=file_filters,
+                                            max_concurrency=max_concurrency, chunk_size=DEFAULT_CHUNK_SIZE)
+
+            return add_partition_columns(table.replace_schema_metadata(None), partitions, columns)
+
+        pending = deque()
+        with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+            try:
+                for record in self.iterate_directory_contents(container, path):
+                    relative_path = '/'.join(record.path.split('/')[prefix_depth:])
+                    if record.is_directory or relative_path.split('/')[-1][:1] in ('_', '.'):
+                        continue
+
+                    partitions = parse_partitions(relative_path)
+                    may_match, file_filters = prune_partition_filters(filters, partitions)
+                    if not may_match:
+                        continue
+
+                    pending.append(executor.submit(contextvars.copy_context().run, read_file, record, partitions, file_filters))
+
+                    if len(pending) >= max_workers:
+                        yield pending.popleft().result()
+
+                while pending:
+                    yield pending.popleft().result()
+            finally:
+                for future in pending:
+                    future.cancel()
+
+    def read_parquet_dataset(self, container: str, path: str, columns: list=None, filters: list=None,
+                             max_workers: int=DEFAULT_MAX_WORKERS, max_concurrency: int=1, as_table=False):
+        """read a hive partitioned folder of parquet files as a single dataframe.
+
+        Args:
+            container (str): source container
+            path (str): path of the dataset folder
+            columns (list, optional): columns that will be read, partition keys included. Defaults to None.
+            filters (list, optional): filters in the format of pd.read_parquet on partitions and columns. Defaults to None.
+            max_workers (int, optional): number of files read at the same time. Defaults to DEFAULT_MAX_WORKERS.
+            max_concurrency (int, optional): number of ranges of each file downloaded at the same time. Defaults to 1.
+            as_table (bool, optional): if a pyarrow Table is returned instead of a dataframe. Defaults to False.
+
+        Returns:
+            pd.DataFrame: rows of all files that match the filters, or a pa.Table if as_table is True.
+        """
+        with self._operation('read_parquet_dataset') as operation:
+            with operation.phase('network'):
+                tables = list(self.iterate_parquet_dataset(container, path, columns=columns, filters=filters,
+                                                           max_workers=max_workers, max_concurrency=max_concurrency))
+
+            with operation.phase('serialization'):
+                if len(tables) == 0:
+                    table = pa.table({column: pa.array([], pa.null()) for column in columns or []})
+                else:
+                    table = pa.concat_tables(tables, promote_options='permissive')
 
-        df_binary = self.download_file_as_binary(container=container, path=source_path, file_name=file_name)
-        pq_file = BytesIO(df_binary)
+                return table if as_table else table.to_pandas()
 
-        return pd.read_parquet(pq_file, **read_parquet_options_dict)
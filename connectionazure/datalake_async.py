@@ -0,0 +1,672 @@
+import os
+import asyncio
+import time
+from azure.storage.filedatalake.aio import DataLakeServiceClient
+from azure.core.exceptions import ResourceNotFoundError
+from azure.core import MatchConditions
+from azure.core.pipeline.transport import AioHttpTransport
+from azure.identity.aio import ClientSecretCredential
+import pandas as pd
+import pyarrow as pa
+from connectionazure.utils import iterate_chunks
+from connectionazure.results import PathRecord, TransferResult, DIRECTORY_COLUMNS, PATH_SCHEMA, CONTAINER_SCHEMA, \
+    path_records_to_batch, containers_to_batch
+from connectionazure.datalake import DEFAULT_CHUNK_SIZE, DEFAULT_MAX_CONCURRENCY, DEFAULT_MAX_RETRIES, DEFAULT_MAX_WORKERS, \
+    CONNECTION_TIMEOUT, READ_TIMEOUT, DATA_BLOCK_SIZE
+from connectionazure.retry import call_with_retries_async, TokenBucket, AsyncAdaptiveConcurrencyLimiter, \
+    AsyncThrottledTransport, DEFAULT_MAX_CONCURRENT_REQUESTS
+from io import BytesIO
+from functools import partial
+
+
+async def _iterate_chunks(data, chunk_size: int):
+    """yield the chunks of iterate_chunks reading streams on the default executor, so a disk read does not block
+    the event loop."""
+    chunks = iterate_chunks(data, chunk_size)
+    if isinstance(data, (bytes, bytearray, memoryview)):
+        for chunk in chunks:
+            yield chunk
+        return
+
+    loop = asyncio.get_running_loop()
+    while True:
+        chunk = await loop.run_in_executor(None, next, chunks, None)
+        if chunk is None:
+            break
+        yield chunk
+
+
+def _remove_if_exists(path: str) -> None:
+    """remove a file if it exists, used to drop the temporary file of a failed download."""
+    if os.path.exists(path):
+        os.remove(path)
+
+
+async def _run_transfers(transfers, max_workers: int, max_retries: int=0, progress_callback=None) -> TransferResult:
+    """run transfers as tasks keeping at most max_workers of them running.
+
+    Args:
+        transfers (async iterable): tuples with the path reported on the result, the coroutine function that transfers it
+            returning the number of bytes transferred and the args of the function.
+        max_workers (int): number of transfers running at the same time.
+        max_retries (int, optional): number of retries of each transfer. Defaults to 0.
+        progress_callback (callable, optional): called with the TransferResult after each transfer. Defaults to None.
+
+    Returns:
+        TransferResult: paths transferred, paths that failed with their errors, bytes transferred and time spent.
+    """
+    result = TransferResult()
+    start = time.perf_counter()
+    semaphore = asyncio.Semaphore(max_workers)
+    tasks = []
+
+    async def run(path, function, args):
+        try:
+            result.bytes_transferred += await call_with_retries_async(function, max_retries, *args)
+            result.succeeded.append(path)
+        except Exception as error:
+            result.failed[path] = error
+        finally:
+            semaphore.release()
+
+        result.elapsed_seconds = time.perf_counter() - start
+        if progress_callback is not None:
+            progress_callback(result)
+
+    async for path, function, args in transfers:
+        await semaphore.acquire()
+        tasks.append(asyncio.ensure_future(run(path, function, args)))
+
+    await asyncio.gather(*tasks)
+
+    result.elapsed_seconds = time.perf_counter() - start
+
+    return result
+
+
+class AsyncConnectionAzureDataLake:
+    """asyncio version of ConnectionAzureDataLake built on the aio clients of the sdk.
+
+    All methods share the connection pool of a single service client, so it must be closed with close()
+    or used as an async context manager.
+    """
+    def __init__(self, max_requests_per_second: float=None,
+                 max_concurrent_requests: int=DEFAULT_MAX_CONCURRENT_REQUESTS):
+        """
+        Args:
+            max_requests_per_second (float, optional): requests per second sent by all tasks of the connection,
+                unlimited if None. With many processes each one should receive its share of the account limit. Defaults to None.
+            max_concurrent_requests (int, optional): maximum requests in flight of the connection, the limit is halved when
+                the service throttles the requests and raised again when the latency recovers.
+                Defaults to DEFAULT_MAX_CONCURRENT_REQUESTS.
+        """
+        self.rate_limiter = None if max_requests_per_second is None else TokenBucket(max_requests_per_second)
+        self.concurrency_limiter = AsyncAdaptiveConcurrencyLimiter(max_concurrent_requests)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        await self.close()
+
+    def initialize_storage_account_ad_env_variable(self) -> None:
+        """get cliend id, client secrect, tenant id and the storage account name from the enviroment variables and authenticat.
+        """
+        client_id = os.environ['client_id']
+        client_secret = os.environ['client_secret']
+        tenant_id = os.environ['tenant_id']
+        storage_account_name = os.environ['storage_account_name']
+
+        self.credential = ClientSecretCredential(tenant_id, client_id, client_secret)
+
+        self.service_client = DataLakeServiceClient(account_url="{}://{}.dfs.core.windows.net".format(
+            "https", storage_account_name), credential=self.credential, transport=self._create_transport())
+
+    def _create_transport(self) -> AsyncThrottledTransport:
+        transport = AioHttpTransport(connection_timeout=CONNECTION_TIMEOUT, read_timeout=READ_TIMEOUT,
+                                     connection_data_block_size=DATA_BLOCK_SIZE)
+        return AsyncThrottledTransport(transport, self.concurrency_limiter, self.rate_limiter)
+
+    async def close(self) -> None:
+        """close the service client and the credential releasing the connection pool.
+        """
+        await self.service_client.close()
+
+        if getattr(self, 'credential', None) is not None:
+            await self.credential.close()
+
+    async def iterate_directory_pages(self, container: str, path='', recursive=True, max_results: int=None,
+                                      continuation_token: str=None):
+        """iterate over the pages of a directory listing, allowing to resume it from a continuation token.
+
+        Args:
+            container (str): container name.
+            path (str, optional): path to that will be list content. Defaults to ''.
+            recursive (bool, optional): if the content of the subdirectories will be listed. Defaults to True.
+            max_results (int, optional): maximum number of paths of each page. Defaults to None, the service limit.
+            continuation_token (str, optional): token returned with a previous page to resume the listing. Defaults to None.
+
+        Yields:
+            tuple: list of PathRecord of the page and the continuation token of the next page, None on the last page.
+        """
+        file_system_client = self.service_client.get_file_system_client(file_system=container)
+
+        pages = file_system_client.get_paths(path=path, recursive=recursive, max_results=max_results).by_page(
+            continuation_token=continuation_token)
+
+        async for page in pages:
+            records = [PathRecord(path_properties.permissions, path_properties.name, path_properties.last_modified,
+                                  path_properties.owner, path_properties.is_directory, path_properties.content_length,
+                                  path_properties.etag) async for path_properties in page]
+
+            yield records, pages.continuation_token
+
+    async def iterate_directory_contents(self, container: str, path='', recursive=True, max_results: int=None,
+                                         continuation_token: str=None):
+        """iterate over all directory content page by page without loading it in memory.
+
+        Args:
+            container (str): container name.
+            path (str, optional): path to that will be list content. Defaults to ''.
+            recursive (bool, optional): if the content of the subdirectories will be listed. Defaults to True.
+            max_results (int, optional): maximum number of paths of each page. Defaults to None, the service limit.
+            continuation_token (str, optional): token returned with a previous page to resume the listing. Defaults to None.
+
+        Yields:
+            PathRecord: permission, path, last modified data, owner, if it is a directory, size and etag of each path.
+        """
+        async for records, _ in self.iterate_directory_pages(container, path, recursive=recursive, max_results=max_results,
+                                                             continuation_token=continuation_token):
+            for record in records:
+                yield record
+
+    async def list_directory_contents(self, container: str, path='', as_table=False):
+        """list all directory content.
+
+        The listing is built as an arrow table with one record batch per page, so only the paths of one page are
+        kept as objects.
+
+        Args:
+            container (str): container name.
+            path (str, optional): path to that will be list content. Defaults to ''.
+            as_table (bool, optional): if a pyarrow Table with the columns of PATH_SCHEMA, size and etag included,
+                is returned instead of a dataframe. Defaults to False.
+
+        Returns:
+            DataFrame: return a dataframe with the permission, path, last modified data, owner and the name of the directory,
+                or a pa.Table if as_table is True.
+        """
+        batches = [path_records_to_batch(records) async for records, _ in self.iterate_directory_pages(container, path)]
+        table = pa.Table.from_batches(batches, schema=PATH_SCHEMA)
+
+        return table if as_table else table.select(DIRECTORY_COLUMNS).to_pandas()
+
+    async def list_containers(self, as_table=False):
+        """list containers in the storage account.
+
+        Args:
+            as_table (bool, optional): if a pyarrow Table is returned instead of a dataframe. Defaults to False.
+
+        Returns:
+            pd.DataFrame: Returns a dataframe with the container name and the last date of modification,
+                or a pa.Table if as_table is True.
+        """
+        batches = [containers_to_batch([container async for container in page])
+                   async for page in self.service_client.list_file_systems().by_page()]
+        table = pa.Table.from_batches(batches, schema=CONTAINER_SCHEMA)
+
+        return table if as_table else table.to_pandas()
+
+    async def create_container(self, container_name: str) -> None:
+        """create a new container in the storage account.
+
+        Args:
+            container_name (str): container name.
+        """
+        await self.service_client.create_file_system(file_system=container_name)
+
+    async def delete_container(self, container_name: str) -> None:
+        """delete a container in the storage account.
+
+        Args:
+            container_name (str): container name to be delted.
+        """
+        await self.service_client.delete_file_system(file_system=container_name)
+
+    async def create_directory(self, container: str, path: str):
+        """create a directory in the container.
+
+        Args:
+            container (str): name of the container.
+            path (str): path that will be created.
+        """
+        file_system_client = self.service_client.get_file_system_client(file_system=container)
+        await file_system_client.create_directory(path)
+
+    async def delete_directory(self, container: str, path: str):
+        """delete directory in datalake.
+
+        Args:
+            container (str): name of the contaier
+            path (str): path of the file to be deleted
+        """
+        file_system_client = self.service_client.get_file_system_client(file_system=container)
+        directory_client = file_system_client.get_directory_client(path)
+        await directory_client.delete_directory()
+
+    async def rename_directory(self, container: str, directory: str, new_directory_name: str):
+        """rename directory in the datalake, it is the same of move a file.
+
+        Args:
+            container (str): name of the container.
+            directory (str): old directory name.
+            new_directory_name (str): new directory name.
+        """
+        file_system_client = self.service_client.get_file_system_client(file_system=container)
+        directory_client = file_system_client.get_directory_client(directory)
+        await directory_client.rename_directory(directory_client.file_system_name + '/' + new_directory_name)
+
+        return True
+
+    async def get_path_properties(self, container: str, path: str, file_name: str):
+        """get the properties of a file or directory with a single request.
+
+        Args:
+            container (str): name of the container.
+            path (str): path of the file or directory.
+            file_name (str): name of the file or directory.
+
+        Returns:
+            FileProperties: properties of the path or None if it does not exist.
+        """
+        file_system_client = self.service_client.get_file_system_client(file_system=container)
+        directory_client = file_system_client.get_directory_client(path)
+        file_client = directory_client.get_file_client(file_name)
+
+        try:
+            return await file_client.get_file_properties()
+        except ResourceNotFoundError:
+            return None
+
+    async def check_if_path_exists(self, container: str, path: str, file_name: str) -> bool:
+        """check if a file or directory exists without listing the parent directory.
+
+        Args:
+            container (str): name of the container.
+            path (str): path of the file or directory.
+            file_name (str): name of the file or directory.
+
+        Returns:
+            bool: True if the path exists.
+        """
+        return await self.get_path_properties(container, path, file_name) is not None
+
+    async def _create_file(self, container: str, path: str, file_name: str, overwrite: bool):
+        if overwrite==False:
+            resp = await self.check_if_path_exists(container, path, file_name)
+            if resp:
+                raise Exception(f"{path + '/' + file_name} already exists, can be set overwrite=True to overwrite this file.")
+
+        file_system_client = self.service_client.get_file_system_client(file_system=container)
+        directory_client = file_system_client.get_directory_client(path)
+
+        return await directory_client.create_file(file_name)
+
+    async def upload_file_to_directory(self, container: str, path: str, file_name: str, data: bytes, overwrite=False):
+        """save a string to a file in datalake.
+
+        Args:
+            container (str): name of the container.
+            path (str): path were it will be save.
+            file_name (str): name of the file.
+            data (bytes): data that will be save as binary.
+            overwrite (bool, optional): if the file will be overwriten or not. Defaults to False.
+
+        Raises:
+            Exception: if the file already exists and overwrite equals false it will be raise.
+        """
+        file_client = await self._create_file(container, path, file_name, overwrite)
+
+        await file_client.append_data(data=data, offset=0, length=len(data))
+        await file_client.flush_data(len(data))
+
+    async def upload_file_to_directory_bulk(self, container: str, path: str, file_name: str, data: bytes, overwrite=False):
+        """Upload bigger files to data lake
+
+        Args:
+            container (str): name of the container.
+            path (str): path were it will be save.
+            file_name (str): name of the file.
+            data (bytes): data that will be save as binary.
+            overwrite (bool, optional): if the file will be overwriten or not. Defaults to False.
+        """
+        file_client = await self._create_file(container, path, file_name, overwrite)
+
+        # overwrite must be set to True to end-point work
+        await file_client.upload_data(data, overwrite=True)
+
+    async def upload_file_to_directory_chunked(self, container: str, path: str, file_name: str, data, overwrite=False,
+                                               chunk_size: int=DEFAULT_CHUNK_SIZE, max_concurrency: int=DEFAULT_MAX_CONCURRENCY,
+                                               max_retries: int=DEFAULT_MAX_RETRIES) -> int:
+        """Upload a file in chunks appended concurrently and committed with a single flush.
+
+        At most max_concurrency chunks are held in memory at the same time.
+
+        Args:
+            container (str): name of the container.
+            path (str): path were it will be save.
+            file_name (str): name of the file.
+            data (bytes or file-like): data that will be save, streams are read chunk by chunk.
+            overwrite (bool, optional): if the file will be overwriten or not. Defaults to False.
+            chunk_size (int, optional): size in bytes of each appended chunk. Defaults to DEFAULT_CHUNK_SIZE.
+            max_concurrency (int, optional): number of chunks uploaded at the same time. Defaults to DEFAULT_MAX_CONCURRENCY.
+            max_retries (int, optional): number of retries of each chunk. Defaults to DEFAULT_MAX_RETRIES.
+
+        Raises:
+            Exception: if the file already exists and overwrite equals false it will be raise.
+
+        Returns:
+            int: number of bytes uploaded.
+        """
+        file_client = await self._create_file(container, path, file_name, overwrite)
+
+        offset = 0
+        pending = set()
+        try:
+            async for chunk in _iterate_chunks(data, chunk_size):
+                if len(pending) >= max_concurrency:
+                    done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                    for task in done:
+                        task.result()
+
+                pending.add(asyncio.ensure_future(call_with_retries_async(file_client.append_data, max_retries,
+                                                                     data=chunk, offset=offset, length=len(chunk))))
+                offset += len(chunk)
+
+            if pending:
+                await asyncio.gather(*pending)
+        except BaseException:
+            for task in pending:
+                task.cancel()
+            raise
+
+        await file_client.flush_data(offset)
+
+        return offset
+
+    async def iterate_file_chunks(self, container: str, path: str, file_name: str, chunk_size: int=DEFAULT_CHUNK_SIZE,
+                                  max_concurrency: int=DEFAULT_MAX_CONCURRENCY, max_retries: int=DEFAULT_MAX_RETRIES):
+        """download a file in byte ranges fetched concurrently and yield them in order.
+
+        At most max_concurrency ranges are held in memory at the same time. Every range is requested with the ETag
+        of the file read before the first one, so if the file is overwritten during the download it fails with
+        ResourceModifiedError instead of yielding bytes of two versions.
+
+        Args:
+            container (str): name of the container.
+            path (str): path of the file.
+            file_name (str): file name.
+            chunk_size (int, optional): size in bytes of each range. Defaults to DEFAULT_CHUNK_SIZE.
+            max_concurrency (int, optional): number of ranges downloaded at the same time. Defaults to DEFAULT_MAX_CONCURRENCY.
+            max_retries (int, optional): number of retries of each range. Defaults to DEFAULT_MAX_RETRIES.
+
+        Yields:
+            bytes: next range of the file.
+        """
+        file_system_client = self.service_client.get_file_system_client(file_system=container)
+        directory_client = file_system_client.get_directory_client(path)
+        file_client = directory_client.get_file_client(file_name)
+
+        properties = await file_client.get_file_properties()
+        size = properties.size
+
+        async def download_range(offset, length):
+            download = await file_client.download_file(offset=offset, length=length, etag=properties.etag,
+                                                       match_condition=MatchConditions.IfNotModified)
+            return await download.readall()
+
+        pending = []
+        try:
+            for offset in range(0, size, chunk_size):
+                length = min(chunk_size, size - offset)
+                pending.append(asyncio.ensure_future(call_with_retries_async(download_range, max_retries, offset, length)))
+
+                if len(pending) >= max_concurrency:
+                    yield await pending.pop(0)
+
+            while pending:
+                yield await pending.pop(0)
+        finally:
+            for task in pending:
+                task.cancel()
+
+    async def download_file_as_binary(self, container: str, path: str, file_name: str, chunk_size: int=None,
+                                      max_concurrency: int=DEFAULT_MAX_CONCURRENCY):
+        """download file as binary.
+
+        Args:
+            container (str): name of the container.
+            path (str): path of the file.
+            file_name (str): file name.
+            chunk_size (int, optional): if set the file is downloaded in ranges of this size concurrently. Defaults to None.
+            max_concurrency (int, optional): number of ranges downloaded at the same time. Defaults to DEFAULT_MAX_CONCURRENCY.
+
+        Returns:
+            Binary: file as binary
+        """
+        if chunk_size is not None:
+            return b''.join([chunk async for chunk in self.iterate_file_chunks(container, path, file_name, chunk_size=chunk_size,
+                                                                               max_concurrency=max_concurrency)])
+
+        file_system_client = self.service_client.get_file_system_client(file_system=container)
+        directory_client = file_system_client.get_directory_client(path)
+        file_client = directory_client.get_file_client(file_name)
+
+        download = await file_client.download_file()
+
+        return await download.readall()
+
+    async def download_file_as_string(self, container: str, path: str, file_name: str, encode='UTF-8', chunk_size: int=None,
+                                      max_concurrency: int=DEFAULT_MAX_CONCURRENCY):
+        """download file as string.
+
+        Args:
+            container (str): name of the container.
+            path (str): path of the file.
+            file_name (str): file name.
+            encode (str, optional): type of encode of the data. Defaults to 'UTF-8'.
+            chunk_size (int, optional): if set the file is downloaded in ranges of this size concurrently. Defaults to None.
+            max_concurrency (int, optional): number of ranges downloaded at the same time. Defaults to DEFAULT_MAX_CONCURRENCY.
+
+        Returns:
+            string: file as string
+        """
+        downloaded_bytes = await self.download_file_as_binary(container, path, file_name, chunk_size=chunk_size,
+                                                              max_concurrency=max_concurrency)
+
+        return downloaded_bytes.decode(encode)
+
+    async def download_to_file(self, container: str, source_path: str, path_sink: str, chunk_size: int=DEFAULT_CHUNK_SIZE,
+                               max_concurrency: int=DEFAULT_MAX_CONCURRENCY) -> bool:
+        """download a file on datalake to a local file streaming the ranges directly to disk.
+
+        Only max_concurrency ranges are held in memory and path_sink is only replaced when the download is complete.
+
+        Args:
+            container (str): source container
+            source_path (str): path of the file on the container
+            path_sink (str): path that the file will be saved
+            chunk_size (int, optional): size in bytes of each downloaded range. Defaults to DEFAULT_CHUNK_SIZE.
+            max_concurrency (int, optional): number of ranges downloaded at the same time. Defaults to DEFAULT_MAX_CONCURRENCY.
+
+        Returns:
+            bool: True if the file was saved.
+        """
+        file_name = source_path.split('/')[-1]
+        source_directory = '/'.join(source_path.split('/')[:-1])
+
+        loop = asyncio.get_running_loop()
+        path_folder = os.path.dirname(path_sink)
+        if path_folder:
+            await loop.run_in_executor(None, partial(os.makedirs, path_folder, exist_ok=True))
+
+        temp_path = f'{path_sink}.{os.getpid()}.{id(asyncio.current_task())}.part'
+        try:
+            f = await loop.run_in_executor(None, open, temp_path, 'wb')
+            try:
+                async for chunk in self.iterate_file_chunks(container, source_directory, file_name, chunk_size=chunk_size,
+                                                            max_concurrency=max_concurrency):
+                    await loop.run_in_executor(None, f.write, chunk)
+            finally:
+                await loop.run_in_executor(None, f.close)
+
+            await loop.run_in_executor(None, os.replace, temp_path, path_sink)
+        except BaseException:
+            await loop.run_in_executor(None, _remove_if_exists, temp_path)
+            raise
+
+        return True
+
+    async def upload_directory(self, source_path: str, sink_container: str, sink_path: str, overwrite=True,
+                               max_workers: int=DEFAULT_MAX_WORKERS, chunk_size: int=DEFAULT_CHUNK_SIZE,
+                               max_concurrency: int=1, max_retries: int=0, progress_callback=None) -> TransferResult:
+        """upload all files of a local folder to datalake concurrently.
+
+        The local tree is walked once, every remote directory is created once and then the files are
+        streamed from disk by at most max_workers tasks.
+
+        Args:
+            source_path (str): local folder that will be uploaded.
+            sink_container (str): container that will receive the files.
+            sink_path (str): path that the files will be saved.
+            overwrite (bool, optional): if existing files will be overwriten or not. Defaults to True.
+            max_workers (int, optional): number of files uploaded at the same time. Defaults to DEFAULT_MAX_WORKERS.
+            chunk_size (int, optional): size in bytes of each uploaded chunk. Defaults to DEFAULT_CHUNK_SIZE.
+            max_concurrency (int, optional): number of chunks of each file uploaded at the same time. Defaults to 1.
+            max_retries (int, optional): number of retries of each file. Defaults to 0.
+            progress_callback (callable, optional): called with the TransferResult after each file. Defaults to None.
+
+        Returns:
+            TransferResult: local paths uploaded, local paths that failed with their errors, bytes uploaded and time spent.
+        """
+        def walk():
+            remote_folders = []
+            uploads = []
+            for folder, _, file_names in os.walk(source_path):
+                relative_folder = os.path.relpath(folder, source_path).replace(os.sep, '/')
+                remote_folder = sink_path if relative_folder == '.' else sink_path.rstrip('/') + '/' + relative_folder
+
+                if remote_folder.strip('/') != '':
+                    remote_folders.append(remote_folder)
+
+                for file_name in file_names:
+                    uploads.append((os.path.join(folder, file_name), remote_folder, file_name))
+
+            return remote_folders, uploads
+
+        loop = asyncio.get_running_loop()
+        remote_folders, uploads = await loop.run_in_executor(None, walk)
+
+        async def upload_file(local_path, remote_folder, file_name):
+            file_handle = await loop.run_in_executor(None, open, local_path, 'rb')
+            try:
+                return await self.upload_file_to_directory_chunked(container=sink_container, path=remote_folder,
+                                                                   file_name=file_name, data=file_handle, overwrite=overwrite,
+                                                                   chunk_size=chunk_size, max_concurrency=max_concurrency)
+            finally:
+                await loop.run_in_executor(None, file_handle.close)
+
+        semaphore = asyncio.Semaphore(max_workers)
+
+        async def create_directory(remote_folder):
+            async with semaphore:
+                await self.create_directory(sink_container, remote_folder)
+
+        await asyncio.gather(*[create_directory(remote_folder) for remote_folder in remote_folders])
+
+        async def transfers():
+            for upload in uploads:
+                yield upload[0], upload_file, upload
+
+        return await _run_transfers(transfers(), max_workers, max_retries=max_retries, progress_callback=progress_callback)
+
+    async def download_directory(self, source_container: str, source_path: str, sink_path: str,
+                                 max_workers: int=DEFAULT_MAX_WORKERS, chunk_size: int=DEFAULT_CHUNK_SIZE,
+                                 max_concurrency: int=1, max_retries: int=DEFAULT_MAX_RETRIES,
+                                 progress_callback=None) -> TransferResult:
+        """Download all files of a directory to a local folder concurrently.
+
+        Args:
+            source_container (str): container that the data is.
+            source_path (str): path of the files that will be downloaded.
+            sink_path (str): local folder that will receive the files.
+            max_workers (int, optional): number of files downloaded at the same time. Defaults to DEFAULT_MAX_WORKERS.
+            chunk_size (int, optional): size in bytes of each downloaded range. Defaults to DEFAULT_CHUNK_SIZE.
+            max_concurrency (int, optional): number of ranges of each file downloaded at the same time. Defaults to 1.
+            max_retries (int, optional): number of retries of each file. Defaults to DEFAULT_MAX_RETRIES.
+            progress_callback (callable, optional): called with the TransferResult after each file. Defaults to None.
+
+        Returns:
+            TransferResult: remote paths downloaded, remote paths that failed with their errors, bytes downloaded and time spent.
+        """
+        source_depth = len([part for part in source_path.split('/') if part != ''])
+        sink_prefix = sink_path.rstrip('/')
+
+        async def download_file(remote_path, local_path, size):
+            await self.download_to_file(source_container, remote_path, local_path, chunk_size=chunk_size,
+                                        max_concurrency=max_concurrency)
+            return size
+
+        async def transfers():
+            async for record in self.iterate_directory_contents(source_container, source_path):
+                if record.is_directory:
+                    continue
+
+                local_path = sink_prefix + '/' + '/'.join(record.path.split('/')[source_depth:])
+                yield record.path, download_file, (record.path, local_path, record.content_length or 0)
+
+        return await _run_transfers(transfers(), max_workers, max_retries=max_retries, progress_callback=progress_callback)
+
+    async def upload_dataframe_as_parquet(self, df: pd.DataFrame, container: str, sink_path: str, file_name: str,
+                                          to_parquet_options_dict: dict={}) -> bool:
+        """upload DataFrame to datalake as parquet.
+
+        Args:
+            df (pd.DataFrame): dataframe to be uploaded
+            container (str): sink container
+            sink_path (str): sink path
+            file_name (str): name of the file that will be saved
+            to_parquet_options_dict (str): options to transform the dataframe in parquet
+
+        Raises:
+            Exception: the upload will fail if the path arg on to_parquet_options_dict
+
+        Returns:
+            bool: True if the file was upload with success
+        """
+        if 'path' in to_parquet_options_dict.keys():
+            raise Exception('The dataframe will not be saved in datalake if path is sended on kwargs')
+
+        binary = await asyncio.get_running_loop().run_in_executor(None, partial(df.to_parquet, **to_parquet_options_dict))
+
+        await self.upload_file_to_directory_bulk(container=container, path=sink_path, file_name=file_name, data=binary)
+
+        return True
+
+    async def download_parquet_as_dataframe(self, container: str, source_path: str, file_name: str,
+                                            read_parquet_options_dict: dict={}) -> pd.DataFrame:
+        """download parquet binary as dataframe
+
+        Args:
+            container (str): source container
+            source_path (str): source path
+            file_name (str): file name
+            read_parquet_options_dict (dict): options to read parquet binary as dataframe
+
+        Returns:
+            pd.DataFrame: dataframe object generate from binary on datalake
+        """
+        df_binary = await self.download_file_as_binary(container=container, path=source_path, file_name=file_name)
+
+        return await asyncio.get_running_loop().run_in_executor(None, partial(pd.read_parquet, BytesIO(df_binary),
+                                                                               **read_parquet_options_dict))
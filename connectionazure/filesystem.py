@@ -0,0 +1,157 @@
+import shutil
+import pyarrow as pa
+from pyarrow.fs import FileInfo, FileSelector, FileSystemHandler, FileType, PyFileSystem
+from azure.core.exceptions import ResourceNotFoundError
+
+
+def split_path(path: str):
+    """split a filesystem path in container, directory and name.
+
+    Args:
+        path (str): path in the format container/directory/name.
+
+    Returns:
+        tuple: container, directory ('/' for the root of the container) and name of the path.
+    """
+    container, _, container_path = path.strip('/').partition('/')
+    directory, _, name = container_path.rpartition('/')
+
+    return container, directory or '/', name
+
+
+class DataLakeFileSystemHandler(FileSystemHandler):
+    """pyarrow filesystem handler backed by an authenticated ConnectionAzureDataLake.
+
+    Paths are in the format container/directory/file. Input files are DataLakeFileReader streams that download
+    only the ranges that are read, with read-ahead buffering, and output files are DataLakeFileWriter streams that
+    upload chunks in parallel while they are written.
+
+    Args:
+        connection (ConnectionAzureDataLake): connection used for all requests.
+        read_ahead (int): minimum number of bytes downloaded by each read request.
+        chunk_size (int): size in bytes of each chunk appended by output streams.
+        max_concurrency (int): number of chunks uploaded at the same time by each output stream.
+    """
+    def __init__(self, connection, read_ahead: int, chunk_size: int, max_concurrency: int):
+        self.connection = connection
+        self.read_ahead = read_ahead
+        self.chunk_size = chunk_size
+        self.max_concurrency = max_concurrency
+
+    def __eq__(self, other):
+        return isinstance(other, DataLakeFileSystemHandler) and self.connection is other.connection
+
+    def __ne__(self, other):
+        return not self == other
+
+    def get_type_name(self) -> str:
+        return 'azure-datalake'
+
+    def normalize_path(self, path: str) -> str:
+        return path.strip('/')
+
+    def get_file_info(self, paths) -> list:
+        infos = []
+        for path in paths:
+            container, directory, name = split_path(path)
+            if name == '':
+                infos.append(FileInfo(container, FileType.Directory))
+                continue
+
+            properties = self.connection.get_path_properties(container, directory, name)
+            if properties is None:
+                infos.append(FileInfo(path, FileType.NotFound))
+            elif (properties.metadata or {}).get('hdi_isfolder') == 'true':
+                infos.append(FileInfo(path, FileType.Directory, mtime=properties.last_modified))
+            else:
+                infos.append(FileInfo(path, FileType.File, mtime=properties.last_modified, size=properties.size))
+
+        return infos
+
+    def get_file_info_selector(self, selector: FileSelector) -> list:
+        container, _, base_path = selector.base_dir.strip('/').partition('/')
+
+        try:
+            return [FileInfo(container + '/' + record.path,
+                             FileType.Directory if record.is_directory else FileType.File,
+                             mtime=record.last_modified,
+                             size=None if record.is_directory else record.content_length)
+                    for record in self.connection.iterate_directory_contents(container, base_path,
+                                                                             recursive=selector.recursive)]
+        except ResourceNotFoundError:
+            if selector.allow_not_found:
+                return []
+            raise FileNotFoundError(selector.base_dir)
+
+    def create_dir(self, path: str, recursive: bool) -> None:
+        container, _, directory = path.strip('/').partition('/')
+        if directory:
+            self.connection.create_directory(container, directory)
+
+    def delete_dir(self, path: str) -> None:
+        container, _, directory = path.strip('/').partition('/')
+        self.connection.delete_directory(container, directory)
+
+    def delete_dir_contents(self, path: str, missing_dir_ok: bool=False) -> None:
+        selector = FileSelector(path, allow_not_found=missing_dir_ok, recursive=False)
+        for info in self.get_file_info_selector(selector):
+            if info.type == FileType.Directory:
+                self.delete_dir(info.path)
+            else:
+                self.delete_file(info.path)
+
+    def delete_root_dir_contents(self) -> None:
+        raise NotImplementedError('deleting all containers of the storage account is not supported')
+
+    def delete_file(self, path: str) -> None:
+        container, directory, name = split_path(path)
+        self.connection.delete_file(container, directory, name)
+
+    def move(self, src: str, dest: str) -> None:
+        container, _, source_path = src.strip('/').partition('/')
+        dest_container, _, dest_path = dest.strip('/').partition('/')
+        self.connection.get_directory_client(container, source_path).rename_directory(dest.strip('/'))
+        self.connection.invalidate_listing_cache(container, source_path)
+        self.connection.invalidate_listing_cache(dest_container, dest_path)
+
+    def copy_file(self, src: str, dest: str) -> None:
+        with self.open_input_stream(src) as source, self.open_output_stream(dest, None) as sink:
+            shutil.copyfileobj(source, sink, self.chunk_size)
+
+    def open_input_stream(self, path: str):
+        return self.open_input_file(path)
+
+    def open_input_file(self, path: str):
+        container, directory, name = split_path(path)
+        try:
+            reader = self.connection.open_file_reader(container, directory, name, read_ahead=self.read_ahead)
+        except ResourceNotFoundError:
+            raise FileNotFoundError(path)
+
+        return pa.PythonFile(reader, mode='r')
+
+    def open_output_stream(self, path: str, metadata):
+        container, directory, name = split_path(path)
+        writer = self.connection.open_file_writer(container, directory, name, overwrite=True, chunk_size=self.chunk_size,
+                                                  max_concurrency=self.max_concurrency)
+
+        return pa.PythonFile(writer, mode='w')
+
+    def open_append_stream(self, path: str, metadata):
+        raise NotImplementedError('append streams are not supported')
+
+
+def create_filesystem(connection, read_ahead: int, chunk_size: int, max_concurrency: int) -> PyFileSystem:
+    """create a pyarrow filesystem backed by a ConnectionAzureDataLake.
+
+    Args:
+        connection (ConnectionAzureDataLake): connection used for all requests.
+        read_ahead (int): minimum number of bytes downloaded by each read request.
+        chunk_size (int): size in bytes of each chunk appended by output streams.
+        max_concurrency (int): number of chunks uploaded at the same time by each output stream.
+
+    Returns:
+        PyFileSystem: filesystem that can be used by pyarrow.dataset, pyarrow.parquet and pd.read_parquet.
+    """
+    return PyFileSystem(DataLakeFileSystemHandler(connection, read_ahead=read_ahead, chunk_size=chunk_size,
+                                                  max_concurrency=max_concurrency))
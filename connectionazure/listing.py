@@ -0,0 +1,75 @@
+import fnmatch
+import re
+
+ANY_DEPTH = '**'
+
+
+def compile_path_pattern(pattern: str, regex=False) -> list:
+    """split a pattern of paths in one matcher of names per level.
+
+    Args:
+        pattern (str): levels separated by '/', each one a glob, or a regular expression if regex is True, matched
+            against the whole name of the path on that level. A level '**' matches any number of levels.
+        regex (bool, optional): if the levels are regular expressions instead of globs. Defaults to False.
+
+    Returns:
+        list: function that matches a name for each level, None for the levels '**'.
+    """
+    matchers = []
+    for segment in pattern.strip('/').split('/'):
+        if segment == ANY_DEPTH:
+            matchers.append(None)
+        elif regex:
+            matchers.append(re.compile(segment).fullmatch)
+        else:
+            matchers.append(re.compile(fnmatch.translate(segment)).match)
+
+    return matchers
+
+
+def pattern_depth(matchers: list):
+    """return the number of levels matched by a pattern, None if it has a level '**'."""
+    return None if None in matchers else len(matchers)
+
+
+def match_path(names: list, matchers: list) -> bool:
+    """check if the names of the levels of a path match all levels of a pattern.
+
+    Args:
+        names (list): name of each level of the path.
+        matchers (list): matchers returned by compile_path_pattern.
+
+    Returns:
+        bool: True if the path matches the pattern.
+    """
+    def match(name_index, matcher_index):
+        if matcher_index == len(matchers):
+            return name_index == len(names)
+        if matchers[matcher_index] is None:
+            return match(name_index, matcher_index + 1) or (name_index < len(names) and match(name_index + 1, matcher_index))
+        if name_index == len(names):
+            return False
+        return bool(matchers[matcher_index](names[name_index])) and match(name_index + 1, matcher_index + 1)
+
+    return match(0, 0)
+
+
+def may_contain_matches(names: list, matchers: list) -> bool:
+    """check if a directory may have paths below it that match a pattern, so its subtree can be skipped if not.
+
+    Args:
+        names (list): name of each level of the path of the directory.
+        matchers (list): matchers returned by compile_path_pattern.
+
+    Returns:
+        bool: False if no path below the directory can match the pattern.
+    """
+    for index, name in enumerate(names):
+        if index == len(matchers):
+            return False
+        if matchers[index] is None:
+            return True
+        if not matchers[index](name):
+            return False
+
+    return len(names) < len(matchers)
@@ -0,0 +1,353 @@
+import bisect
+import contextvars
+import threading
+import time
+from collections import namedtuple
+
+DEFAULT_LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+DEFAULT_SIZE_BUCKETS = tuple(4 ** exponent for exponent in range(5, 16))
+
+OperationRecord = namedtuple('OperationRecord', ['operation', 'seconds', 'phases', 'bytes_transferred', 'requests',
+                                                 'throttled', 'retries', 'error'])
+OperationRecord.__doc__ = """measures of one call of an instrumented method, phases maps each phase to its seconds."""
+
+_current_operation = contextvars.ContextVar('connectionazure_operation', default=None)
+
+
+class Histogram:
+    """thread safe histogram with fixed buckets, count, sum, min and max of the observed values.
+
+    Args:
+        buckets (tuple): sorted upper bounds of the buckets, values above the last bound are counted on an overflow bucket.
+    """
+    def __init__(self, buckets: tuple=DEFAULT_LATENCY_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.min = None
+        self.max = None
+        self._lock = threading.Lock()
+
+    def observe(self, value: float) -> None:
+        """add a value to the histogram."""
+        with self._lock:
+            self.counts[bisect.bisect_left(self.buckets, value)] += 1
+            self.count += 1
+            self.sum += value
+            self.min = value if self.min is None else min(self.min, value)
+            self.max = value if self.max is None else max(self.max, value)
+
+    def quantile(self, q: float) -> float:
+        """estimate a quantile as the upper bound of the bucket that contains it, max for the overflow bucket.
+
+        Args:
+            q (float): quantile between 0 and 1.
+
+        Returns:
+            float: estimated value of the quantile, None if there are no values.
+        """
+        with self._lock:
+            if self.count == 0:
+                return None
+
+            rank = q * self.count
+            seen = 0
+            for index, count in enumerate(self.counts):
+                seen += count
+                if count and seen >= rank:
+                    return min(self.buckets[index], self.max) if index < len(self.buckets) else self.max
+
+            return self.max
+
+    def to_dict(self) -> dict:
+        """return the count, sum, mean, min, max, p50, p90 and p99 of the histogram."""
+        return {'count': self.count, 'sum': self.sum, 'mean': self.sum / self.count if self.count else None,
+                'min': self.min, 'max': self.max, 'p50': self.quantile(0.5), 'p90': self.quantile(0.9),
+                'p99': self.quantile(0.99)}
+
+
+class Operation:
+    """measures of one call of an instrumented method, used as a context manager.
+
+    Requests and retries made by the thread of the operation, or by threads started with its context, are counted
+    on it while it is the current operation.
+
+    Args:
+        recorder (MetricsRecorder): recorder that receives the measures when the operation ends.
+        name (str): name of the instrumented method.
+    """
+    def __init__(self, recorder, name: str):
+        self.recorder = recorder
+        self.name = name
+        self.phases = dict()
+        self.bytes_transferred = 0
+        self.requests = 0
+        self.throttled = 0
+        self.retries = 0
+        self.seconds = None
+        self.span = None
+        self._lock = threading.Lock()
+        self._active_phase = threading.local()
+        self._start = None
+        self._token = None
+
+    def __enter__(self):
+        self._token = _current_operation.set(self)
+        self.recorder.on_start(self)
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, error_type, error, traceback):
+        self.seconds = time.perf_counter() - self._start
+        _current_operation.reset(self._token)
+        self.recorder.on_end(self, error)
+
+    def phase(self, name: str) -> 'Phase':
+        """return a context manager that adds its wall time to a phase of the operation.
+
+        Phases are exclusive in a thread, the time of a phase entered inside another is not added to the outer one.
+        """
+        return Phase(self, name)
+
+    def iterate(self, iterable, name: str):
+        """iterate over an iterable adding the time spent waiting for each item to a phase."""
+        iterator = iter(iterable)
+        while True:
+            with Phase(self, name):
+                try:
+                    item = next(iterator)
+                except StopIteration:
+                    return
+            yield item
+
+    def add_phase_seconds(self, name: str, seconds: float) -> None:
+        with self._lock:
+            self.phases[name] = self.phases.get(name, 0.0) + seconds
+
+    def add_bytes(self, size: int) -> None:
+        with self._lock:
+            self.bytes_transferred += size
+
+    def add_request(self, throttled: bool) -> None:
+        with self._lock:
+            self.requests += 1
+            if throttled:
+                self.throttled += 1
+
+    def add_retry(self) -> None:
+        with self._lock:
+            self.retries += 1
+
+    def to_record(self, error=None) -> OperationRecord:
+        return OperationRecord(self.name, self.seconds, dict(self.phases), self.bytes_transferred, self.requests,
+                               self.throttled, self.retries, None if error is None else type(error).__name__)
+
+
+class Phase:
+    """context manager that adds its wall time to a phase of an operation, pausing the phase it is nested in."""
+    def __init__(self, operation: Operation, name: str):
+        self.operation = operation
+        self.name = name
+        self._parent = None
+        self._start = None
+
+    def __enter__(self):
+        now = time.perf_counter()
+        self._parent = getattr(self.operation._active_phase, 'phase', None)
+        if self._parent is not None:
+            self._parent._pause(now)
+
+        self.operation._active_phase.phase = self
+        self._start = now
+        return self
+
+    def __exit__(self, *args):
+        now = time.perf_counter()
+        self._pause(now)
+
+        self.operation._active_phase.phase = self._parent
+        if self._parent is not None:
+            self._parent._start = now
+
+    def _pause(self, now: float) -> None:
+        self.operation.add_phase_seconds(self.name, now - self._start)
+
+
+class _NullOperation:
+    """operation returned when metrics are disabled, every method does nothing."""
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        pass
+
+    def phase(self, name: str):
+        return self
+
+    def iterate(self, iterable, name: str):
+        return iterable
+
+    def add_phase_seconds(self, name: str, seconds: float) -> None:
+        pass
+
+    def add_bytes(self, size: int) -> None:
+        pass
+
+
+NULL_OPERATION = _NullOperation()
+
+
+def record_request(throttled: bool) -> None:
+    """count a request sent by the transport on the current operation, if there is one."""
+    operation = _current_operation.get()
+    if operation is not None:
+        operation.add_request(throttled)
+
+
+def record_retry() -> None:
+    """count a retry on the current operation, if there is one."""
+    operation = _current_operation.get()
+    if operation is not None:
+        operation.add_retry()
+
+
+class MetricsRecorder:
+    """in-process recorder of the operations and requests of a connection.
+
+    Keeps a histogram of the wall time of each operation and of each of its phases, of the bytes transferred and
+    the throughput in bytes per second of each operation and of the latency of each http request, besides counters
+    of calls, errors, requests, throttled requests and retries. Subclass it and override on_start and on_end to
+    export the measures to other systems.
+
+    Args:
+        keep_records (int, optional): number of the last OperationRecord kept on records. Defaults to 0.
+    """
+    def __init__(self, keep_records: int=0):
+        self.keep_records = keep_records
+        self.histograms = dict()
+        self.counters = dict()
+        self.records = []
+        self._lock = threading.Lock()
+
+    def operation(self, name: str) -> Operation:
+        """return the context manager that measures a call of an instrumented method."""
+        return Operation(self, name)
+
+    def histogram(self, name: str, buckets: tuple=DEFAULT_LATENCY_BUCKETS) -> Histogram:
+        """get a histogram by name creating it with the buckets if it does not exist."""
+        with self._lock:
+            if name not in self.histograms:
+                self.histograms[name] = Histogram(buckets)
+            return self.histograms[name]
+
+    def increment(self, name: str, value: int=1) -> None:
+        """add a value to a counter."""
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def on_start(self, operation: Operation) -> None:
+        """called when an operation starts."""
+
+    def on_end(self, operation: Operation, error: Exception=None) -> None:
+        """called when an operation ends, records its measures on the histograms and counters.
+
+        Args:
+            operation (Operation): operation that ended.
+            error (Exception, optional): error raised by the operation. Defaults to None.
+        """
+        name = operation.name
+        self.histogram(f'{name}.seconds').observe(operation.seconds)
+        for phase, seconds in operation.phases.items():
+            self.histogram(f'{name}.{phase}.seconds').observe(seconds)
+
+        if operation.bytes_transferred:
+            self.histogram(f'{name}.bytes', DEFAULT_SIZE_BUCKETS).observe(operation.bytes_transferred)
+            if operation.seconds > 0:
+                self.histogram(f'{name}.bytes_per_second', DEFAULT_SIZE_BUCKETS).observe(
+                    operation.bytes_transferred / operation.seconds)
+
+        self.increment(f'{name}.calls')
+        self.increment(f'{name}.requests', operation.requests)
+        self.increment(f'{name}.throttled', operation.throttled)
+        self.increment(f'{name}.retries', operation.retries)
+        if error is not None:
+            self.increment(f'{name}.errors')
+
+        if self.keep_records:
+            with self._lock:
+                self.records.append(operation.to_record(error))
+                del self.records[:-self.keep_records]
+
+    def on_request(self, method: str, seconds: float, throttled: bool) -> None:
+        """called by the transport after each http request, retries of the SDK included.
+
+        Args:
+            method (str): http method of the request.
+            seconds (float): time until the response headers were received.
+            throttled (bool): if the service throttled the request.
+        """
+        record_request(throttled)
+        self.histogram(f'http.{method}.seconds').observe(seconds)
+        self.increment('http.requests')
+        if throttled:
+            self.increment('http.throttled')
+
+    def snapshot(self) -> dict:
+        """return the counters and the summary of each histogram.
+
+        Returns:
+            dict: counters on the key 'counters' and the dict of each histogram on the key 'histograms'.
+        """
+        with self._lock:
+            histograms = dict(self.histograms)
+            counters = dict(self.counters)
+
+        return {'counters': counters, 'histograms': {name: histogram.to_dict() for name, histogram in histograms.items()}}
+
+    def reset(self) -> None:
+        """remove all histograms, counters and records."""
+        with self._lock:
+            self.histograms = dict()
+            self.counters = dict()
+            self.records = []
+
+
+class OpenTelemetryRecorder(MetricsRecorder):
+    """recorder that also exports each operation as an OpenTelemetry span.
+
+    The span of an operation is the parent of the spans of the requests created by the SDK when its
+    tracing is enabled. Requires the opentelemetry-api package.
+
+    Args:
+        tracer (Tracer, optional): tracer that creates the spans. Defaults to None, the tracer 'connectionazure'
+            of the global tracer provider.
+        keep_records (int, optional): number of the last OperationRecord kept on records. Defaults to 0.
+    """
+    def __init__(self, tracer=None, keep_records: int=0):
+        super().__init__(keep_records=keep_records)
+        if tracer is None:
+            from opentelemetry import trace
+            tracer = trace.get_tracer('connectionazure')
+
+        self.tracer = tracer
+
+    def on_start(self, operation: Operation) -> None:
+        span_context = self.tracer.start_as_current_span(f'ConnectionAzureDataLake.{operation.name}')
+        operation.span = (span_context, span_context.__enter__())
+
+    def on_end(self, operation: Operation, error: Exception=None) -> None:
+        super().on_end(operation, error)
+
+        span_context, span = operation.span
+        span.set_attribute('connectionazure.bytes_transferred', operation.bytes_transferred)
+        span.set_attribute('connectionazure.requests', operation.requests)
+        span.set_attribute('connectionazure.throttled', operation.throttled)
+        span.set_attribute('connectionazure.retries', operation.retries)
+        for phase, seconds in operation.phases.items():
+            span.set_attribute(f'connectionazure.phase.{phase}.seconds', seconds)
+
+        if error is None:
+            span_context.__exit__(None, None, None)
+        else:
+            span_context.__exit__(type(error), error, error.__traceback__)
@@ -0,0 +1,304 @@
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+RANGE_HOLE_SIZE_LIMIT = 8 * 1024
+SIZE_SAMPLE_ROWS = 10000
+HIVE_DEFAULT_PARTITION = '__HIVE_DEFAULT_PARTITION__'
+
+_COMPARISONS = {
+    '=': lambda minimum, maximum, value: minimum <= value <= maximum,
+    '==': lambda minimum, maximum, value: minimum <= value <= maximum,
+    '!=': lambda minimum, maximum, value: not (minimum == maximum == value),
+    '<': lambda minimum, maximum, value: minimum < value,
+    '<=': lambda minimum, maximum, value: minimum <= value,
+    '>': lambda minimum, maximum, value: maximum > value,
+    '>=': lambda minimum, maximum, value: maximum >= value,
+    'in': lambda minimum, maximum, values: any(minimum <= value <= maximum for value in values),
+    'not in': lambda minimum, maximum, values: not (minimum == maximum and minimum in values),
+}
+
+
+def normalize_filters(filters) -> list:
+    """return filters in disjunctive normal form, a list of lists of (column, op, value) tuples.
+
+    Args:
+        filters (list): list of tuples combined with AND or list of lists of tuples combined with OR, as in pd.read_parquet.
+
+    Returns:
+        list: list of conjunctions.
+    """
+    if not filters:
+        return []
+    if isinstance(filters[0], tuple):
+        return [filters]
+    return [list(conjunction) for conjunction in filters]
+
+
+def filter_columns(filters) -> list:
+    """return the columns used by the filters in the order they appear."""
+    columns = []
+    for conjunction in normalize_filters(filters):
+        for column, _, _ in conjunction:
+            if column not in columns:
+                columns.append(column)
+    return columns
+
+
+def _predicate_may_match(statistics, op: str, value) -> bool:
+    if statistics is None or not statistics.has_min_max or op not in _COMPARISONS:
+        return True
+
+    try:
+        return _COMPARISONS[op](statistics.min, statistics.max, value)
+    except TypeError:
+        return True
+
+
+def select_row_groups(metadata, filters=None) -> list:
+    """select the row groups that may have rows matching the filters using the column statistics.
+
+    Args:
+        metadata (FileMetaData): metadata of the parquet file.
+        filters (list, optional): filters in the format of pd.read_parquet. Defaults to None.
+
+    Returns:
+        list: index of the row groups that can not be skipped.
+    """
+    conjunctions = normalize_filters(filters)
+    if not conjunctions:
+        return list(range(metadata.num_row_groups))
+
+    row_groups = []
+    for index in range(metadata.num_row_groups):
+        row_group = metadata.row_group(index)
+        statistics = {row_group.column(column).path_in_schema: row_group.column(column).statistics
+                      for column in range(row_group.num_columns)}
+
+        if any(all(_predicate_may_match(statistics.get(column), op, value) for column, op, value in conjunction)
+               for conjunction in conjunctions):
+            row_groups.append(index)
+
+    return row_groups
+
+
+def column_chunk_ranges(metadata, row_groups, columns=None) -> list:
+    """return the byte ranges of the column chunks of the row groups, merging ranges that are close.
+
+    Args:
+        metadata (FileMetaData): metadata of the parquet file.
+        row_groups (list): index of the row groups.
+        columns (list, optional): top level columns, all columns if None. Defaults to None.
+
+    Returns:
+        list: tuples with offset and length of each range sorted by offset.
+    """
+    ranges = []
+    for index in row_groups:
+        row_group = metadata.row_group(index)
+        for column in range(row_group.num_columns):
+            column_chunk = row_group.column(column)
+            if columns is not None and column_chunk.path_in_schema.split('.')[0] not in columns:
+                continue
+
+            start = column_chunk.data_page_offset
+            if column_chunk.has_dictionary_page and 0 < column_chunk.dictionary_page_offset < start:
+                start = column_chunk.dictionary_page_offset
+
+            ranges.append((start, column_chunk.total_compressed_size))
+
+    merged = []
+    for offset, length in sorted(ranges):
+        if merged and offset <= merged[-1][0] + merged[-1][1] + RANGE_HOLE_SIZE_LIMIT:
+            last_offset, last_length = merged[-1]
+            merged[-1] = (last_offset, max(last_length, offset + length - last_offset))
+        else:
+            merged.append((offset, length))
+
+    return merged
+
+
+def split_ranges(ranges, chunk_size: int) -> list:
+    """split byte ranges in ranges of at most chunk_size bytes so they can be downloaded in parallel."""
+    return [(start, min(chunk_size, offset + length - start))
+            for offset, length in ranges
+            for start in range(offset, offset + length, chunk_size)]
+
+
+def read_parquet_projection(reader, columns=None, filters=None, max_concurrency: int=8,
+                            chunk_size: int=8 * 1024 * 1024) -> pa.Table:
+    """read only the columns and row groups of a parquet file needed by the columns and filters.
+
+    The footer is read first, the row groups are pruned with the statistics of the filters and only the byte
+    ranges of the needed column chunks are downloaded in parallel before the table is decoded.
+
+    Args:
+        reader (DataLakeFileReader): seekable stream of the parquet file.
+        columns (list, optional): columns that will be returned, all columns if None. Defaults to None.
+        filters (list, optional): filters in the format of pd.read_parquet applied to the rows. Defaults to None.
+        max_concurrency (int, optional): number of ranges downloaded at the same time. Defaults to 8.
+        chunk_size (int, optional): maximum size in bytes of each downloaded range. Defaults to 8 MiB.
+
+    Returns:
+        pa.Table: table with the selected columns and the rows matching the filters.
+    """
+    metadata = pq.read_metadata(reader)
+
+    extra_columns = [] if columns is None else [column for column in filter_columns(filters) if column not in columns]
+    read_columns = None if columns is None else list(columns) + extra_columns
+
+    row_groups = select_row_groups(metadata, filters)
+    reader.prefetch(split_ranges(column_chunk_ranges(metadata, row_groups, read_columns), chunk_size), max_concurrency)
+
+    parquet_file = pq.ParquetFile(reader, metadata=metadata, pre_buffer=False)
+    table = parquet_file.read_row_groups(row_groups, columns=read_columns, use_pandas_metadata=True)
+
+    if filters:
+        table = table.filter(pq.filters_to_expression(filters))
+
+    if extra_columns:
+        table = table.select([name for name in table.column_names if name not in extra_columns])
+
+    return table
+
+
+def parse_partitions(relative_path: str) -> dict:
+    """return the hive partitions of a path, the segments in the format key=value.
+
+    Args:
+        relative_path (str): path of the file relative to the root of the dataset.
+
+    Returns:
+        dict: value of each partition key as string.
+    """
+    partitions = dict()
+    for segment in relative_path.split('/')[:-1]:
+        key, separator, value = segment.partition('=')
+        if separator:
+            partitions[key] = value
+    return partitions
+
+
+def _partition_predicate(partition_value: str, op: str, value) -> bool:
+    sample = value[0] if op in ('in', 'not in') and len(value) > 0 else value
+    try:
+        partition_value = partition_value if isinstance(sample, str) else type(sample)(partition_value)
+        return _COMPARISONS[op](partition_value, partition_value, value) if op in _COMPARISONS else True
+    except (TypeError, ValueError):
+        return True
+
+
+def prune_partition_filters(filters, partitions: dict):
+    """evaluate the filters on the partitions of a file.
+
+    Args:
+        filters (list): filters in the format of pd.read_parquet.
+        partitions (dict): value of each partition key of the file.
+
+    Returns:
+        tuple: if the file may have matching rows and the filters left to apply on its columns,
+            None if all rows of the file match.
+    """
+    conjunctions = normalize_filters(filters)
+    if not conjunctions:
+        return True, None
+
+    remaining = []
+    for conjunction in conjunctions:
+        if not all(_partition_predicate(partitions[column], op, value)
+                   for column, op, value in conjunction if column in partitions):
+            continue
+
+        column_predicates = [(column, op, value) for column, op, value in conjunction if column not in partitions]
+        if not column_predicates:
+            return True, None
+        remaining.append(column_predicates)
+
+    if not remaining:
+        return False, None
+
+    return True, remaining
+
+
+def add_partition_columns(table: pa.Table, partitions: dict, columns=None) -> pa.Table:
+    """append the partitions of a file as string columns with the same value in all rows.
+
+    Args:
+        table (pa.Table): table read from the file.
+        partitions (dict): value of each partition key of the file.
+        columns (list, optional): columns that will be returned, all partitions are added if None. Defaults to None.
+
+    Returns:
+        pa.Table: table with the partition columns.
+    """
+    for key, value in partitions.items():
+        if (columns is None or key in columns) and key not in table.column_names:
+            table = table.append_column(key, pa.array([value] * table.num_rows, pa.string()))
+    return table
+
+
+def partition_path(partitions: dict) -> str:
+    """return the hive path of the partitions, the segments in the format key=value."""
+    return '/'.join(f'{key}={HIVE_DEFAULT_PARTITION if pd.isna(value) else value}' for key, value in partitions.items())
+
+
+def rows_per_file(sample: pd.DataFrame, target_file_size: int, to_parquet_options_dict: dict) -> int:
+    """estimate the number of rows of a parquet file with target_file_size bytes.
+
+    The sample is serialized with the same options of the files, the bytes per row are the size of the sample
+    minus the size of an empty file, so the footer and the schema are not counted for each row.
+
+    Args:
+        sample (pd.DataFrame): first rows of the data saved on the files, with the columns of the files.
+        target_file_size (int): approximate size in bytes of each file.
+        to_parquet_options_dict (dict): options used to serialize the files.
+
+    Returns:
+        int: number of rows of each file, at least 1.
+    """
+    if len(sample) == 0:
+        return 1
+
+    overhead = len(serialize_dataframe_as_parquet(sample.iloc[:0], to_parquet_options_dict))
+    bytes_per_row = (len(serialize_dataframe_as_parquet(sample, to_parquet_options_dict)) - overhead) / len(sample)
+
+    return max(1, int((target_file_size - overhead) // max(bytes_per_row, 1)))
+
+
+def split_partitions(df: pd.DataFrame, partition_cols: list, max_rows: int):
+    """split a dataframe in the rows of each partition with at most max_rows rows each.
+
+    A partition of n rows is split in ceil(n / max_rows) frames of even size, instead of full frames and a small tail.
+    The rows are grouped by the indices of df.groupby, the partitions with contiguous rows are returned as slices
+    of df without copying the data.
+
+    Args:
+        df (pd.DataFrame): dataframe to be split.
+        partition_cols (list): columns used as partitions, they are removed from the returned frames.
+        max_rows (int): maximum number of rows of each frame.
+
+    Yields:
+        tuple: dict with the value of each partition column and the frame with the rows of the partition.
+    """
+    data = df.drop(columns=partition_cols)
+    indices = df.groupby(partition_cols, sort=False, observed=True, dropna=False).indices
+
+    for key, positions in indices.items():
+        values = key if isinstance(key, tuple) else (key,)
+        partitions = dict(zip(partition_cols, values))
+
+        contiguous = positions[-1] - positions[0] + 1 == len(positions)
+        num_files = -(-len(positions) // max_rows)
+        for index in range(num_files):
+            start = index * len(positions) // num_files
+            end = (index + 1) * len(positions) // num_files
+            if contiguous:
+                yield partitions, data.iloc[positions[0] + start:positions[0] + end]
+            else:
+                yield partitions, data.iloc[positions[start:end]]
+
+
+def serialize_dataframe_as_parquet(df: pd.DataFrame, to_parquet_options_dict: dict) -> bytes:
+    """serialize a dataframe as parquet, defined on module level so it can run in a process pool."""
+    return df.to_parquet(**to_parquet_options_dict)
+
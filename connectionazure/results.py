@@ -0,0 +1,151 @@
+from collections import namedtuple
+from dataclasses import dataclass, field
+import pandas as pd
+import pyarrow as pa
+
+
+PathRecord = namedtuple('PathRecord', ['permissions', 'path', 'last_modified', 'owner', 'is_directory', 'content_length', 'etag'])
+PathRecord.__doc__ = """lightweight record of a file or directory listed on datalake."""
+
+WrittenFile = namedtuple('WrittenFile', ['path', 'partitions', 'num_rows', 'size'])
+WrittenFile.__doc__ = """file written to datalake by a partitioned writer with its partition values, rows and size in bytes."""
+
+DIRECTORY_COLUMNS = ['permissions', 'path', 'last_modified', 'owner', 'is_directory']
+LISTING_BATCH_SIZE = 5000
+
+TIMESTAMP_TYPE = pa.timestamp('us', tz='UTC')
+PATH_SCHEMA = pa.schema([
+    ('permissions', pa.dictionary(pa.int32(), pa.string())),
+    ('path', pa.string()),
+    ('last_modified', TIMESTAMP_TYPE),
+    ('owner', pa.dictionary(pa.int32(), pa.string())),
+    ('is_directory', pa.bool_()),
+    ('content_length', pa.int64()),
+    ('etag', pa.string()),
+])
+CONTAINER_SCHEMA = pa.schema([('container', pa.string()), ('last_modified', TIMESTAMP_TYPE)])
+
+
+def timestamp_array(values: list) -> pa.Array:
+    """convert datetimes to an arrow timestamp array in UTC, naive datetimes are taken as UTC.
+
+    Values that are not datetimes, as strings, are parsed by pd.to_datetime.
+    """
+    try:
+        return pa.array(values, TIMESTAMP_TYPE)
+    except (pa.ArrowTypeError, pa.ArrowInvalid):
+        return pa.array(pd.to_datetime(pd.Series(values, dtype=object), utc=True)).cast(TIMESTAMP_TYPE)
+
+
+def path_records_to_batch(records: list) -> pa.RecordBatch:
+    """build a record batch with the columns of PATH_SCHEMA from a list of path records, as the paths of a page."""
+    return pa.record_batch([
+        pa.array([record.permissions for record in records], pa.string()).dictionary_encode(),
+        pa.array([record.path for record in records], pa.string()),
+        timestamp_array([record.last_modified for record in records]),
+        pa.array([record.owner for record in records], pa.string()).dictionary_encode(),
+        pa.array([record.is_directory for record in records], pa.bool_()),
+        pa.array([record.content_length for record in records], pa.int64()),
+        pa.array([record.etag for record in records], pa.string()),
+    ], schema=PATH_SCHEMA)
+
+
+def containers_to_batch(containers: list) -> pa.RecordBatch:
+    """build a record batch with the columns of CONTAINER_SCHEMA from a list of containers, as the containers of a page."""
+    return pa.record_batch([
+        pa.array([container.name for container in containers], pa.string()),
+        timestamp_array([container.last_modified for container in containers]),
+    ], schema=CONTAINER_SCHEMA)
+
+
+def _build_table(items, to_batch, schema: pa.Schema, batch_size: int) -> pa.Table:
+    batches = []
+    batch = []
+    for item in items:
+        batch.append(item)
+        if len(batch) >= batch_size:
+            batches.append(to_batch(batch))
+            batch = []
+
+    if batch or not batches:
+        batches.append(to_batch(batch))
+
+    return pa.Table.from_batches(batches, schema=schema)
+
+
+def path_records_to_table(records, batch_size: int=LISTING_BATCH_SIZE) -> pa.Table:
+    """build an arrow table from path records one batch at a time, so only batch_size records are kept as objects.
+
+    Args:
+        records (iterable): PathRecord of each path.
+        batch_size (int, optional): number of records of each record batch. Defaults to LISTING_BATCH_SIZE, the size
+            of a listing page.
+
+    Returns:
+        pa.Table: table with the columns of PATH_SCHEMA, permissions and owner dictionary encoded.
+    """
+    return _build_table(records, path_records_to_batch, PATH_SCHEMA, batch_size)
+
+
+def containers_to_table(containers, batch_size: int=LISTING_BATCH_SIZE) -> pa.Table:
+    """build an arrow table with the name and the last modified date of containers one batch at a time.
+
+    Args:
+        containers (iterable): FileSystemProperties of each container.
+        batch_size (int, optional): number of containers of each record batch. Defaults to LISTING_BATCH_SIZE.
+
+    Returns:
+        pa.Table: table with the columns of CONTAINER_SCHEMA.
+    """
+    return _build_table(containers, containers_to_batch, CONTAINER_SCHEMA, batch_size)
+
+
+@dataclass
+class TransferResult:
+    """result of a transfer of many files.
+
+    Args:
+        succeeded (list): paths of the files transferred with success.
+        failed (dict): paths of the files that failed with the error raised.
+        bytes_transferred (int): number of bytes transferred by the files that succeeded.
+        elapsed_seconds (float): time spent since the transfer started.
+    """
+    succeeded: list = field(default_factory=list)
+    failed: dict = field(default_factory=dict)
+    bytes_transferred: int = 0
+    elapsed_seconds: float = 0.0
+
+    @property
+    def ok(self) -> bool:
+        """True if no file failed."""
+        return len(self.failed) == 0
+
+    @property
+    def files_per_second(self) -> float:
+        """number of files transferred with success per second."""
+        if self.elapsed_seconds == 0:
+            return 0.0
+        return len(self.succeeded) / self.elapsed_seconds
+
+    @property
+    def megabytes_per_second(self) -> float:
+        """megabytes transferred per second."""
+        if self.elapsed_seconds == 0:
+            return 0.0
+        return self.bytes_transferred / (1024 * 1024) / self.elapsed_seconds
+
+
+@dataclass
+class SyncPlan:
+    """files that a sync transfers, deletes and keeps, with the result of the transfer when it was executed.
+
+    Args:
+        transfer (list): relative paths of the files that are new or changed on the source.
+        delete (list): relative paths of the files that are only on the sink and will be deleted.
+        unchanged (list): relative paths of the files that are equal on the source and on the sink.
+        result (TransferResult): result of the transfers and deletions, None on a dry run.
+    """
+    transfer: list = field(default_factory=list)
+    delete: list = field(default_factory=list)
+    unchanged: list = field(default_factory=list)
+    result: TransferResult = None
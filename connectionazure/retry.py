@@ -0,0 +1,354 @@
+from azure.core.exceptions import AzureError, HttpResponseError, ServiceRequestError, ServiceResponseError
+from azure.core.pipeline.transport import HttpTransport, AsyncHttpTransport
+from connectionazure.metrics import record_retry
+import asyncio
+import threading
+import random
+import time
+
+THROTTLING_STATUS_CODES = (429, 503)
+TRANSIENT_STATUS_CODES = (408, 429)
+BACKOFF_BASE = 0.5
+BACKOFF_CAP = 30.0
+DEFAULT_MAX_CONCURRENT_REQUESTS = 64
+LATENCY_TOLERANCE = 2.0
+DECREASE_COOLDOWN = 1.0
+
+
+def backoff_delay(attempt: int) -> float:
+    """return the seconds to wait before the next attempt, exponential with full jitter so that clients that
+    failed at the same time do not retry at the same time.
+
+    Args:
+        attempt (int): number of the attempt that failed, starting at 0.
+
+    Returns:
+        float: random delay between 0 and min(BACKOFF_CAP, BACKOFF_BASE * 2 ** attempt).
+    """
+    return random.uniform(0, min(BACKOFF_CAP, BACKOFF_BASE * 2 ** attempt))
+
+
+def is_transient_error(error: Exception) -> bool:
+    """True if a retry could succeed: a connection error or timeout, or a response with HTTP 408, 429 or 5xx.
+
+    Errors such as not found, already exists, forbidden or a failed precondition are permanent and are not retried.
+    """
+    if isinstance(error, (ServiceRequestError, ServiceResponseError)):
+        return True
+
+    if isinstance(error, HttpResponseError) and error.status_code is not None:
+        return error.status_code in TRANSIENT_STATUS_CODES or 500 <= error.status_code < 600
+
+    return False
+
+
+def call_with_retries(function, max_retries: int, *args, **kwargs):
+    """call a function retrying it when the error is transient, waiting backoff_delay between attempts.
+
+    Args:
+        function (callable): function that will be called.
+        max_retries (int): number of retries before the error is raised.
+
+    Returns:
+        the value returned by the function.
+    """
+    for attempt in range(max_retries + 1):
+        try:
+            return function(*args, **kwargs)
+        except AzureError as error:
+            if attempt == max_retries or not is_transient_error(error):
+                raise
+            record_retry()
+            time.sleep(backoff_delay(attempt))
+
+
+async def call_with_retries_async(function, max_retries: int, *args, **kwargs):
+    """await a coroutine function retrying it when the error is transient, waiting backoff_delay between attempts.
+
+    Args:
+        function (callable): coroutine function that will be awaited.
+        max_retries (int): number of retries before the error is raised.
+
+    Returns:
+        the value returned by the function.
+    """
+    for attempt in range(max_retries + 1):
+        try:
+            return await function(*args, **kwargs)
+        except AzureError as error:
+            if attempt == max_retries or not is_transient_error(error):
+                raise
+            record_retry()
+            await asyncio.sleep(backoff_delay(attempt))
+
+
+def is_throttling_error(error: Exception) -> bool:
+    """True if the error is a response of the service asking to slow down, HTTP 429 or 503."""
+    return isinstance(error, HttpResponseError) and error.status_code in THROTTLING_STATUS_CODES
+
+
+def call_with_throttling_retries(function, max_retries: int, *args, **kwargs):
+    """call a function retrying it only when the service is throttling, waiting backoff_delay between attempts.
+
+    Used by operations that are not idempotent, as renames and deletes, where a retry after a timeout could fail
+    because the first request was applied. Throttled requests were not applied, so they are safe to retry.
+
+    Args:
+        function (callable): function that will be called.
+        max_retries (int): number of retries before the error is raised.
+
+    Returns:
+        the value returned by the function.
+    """
+    for attempt in range(max_retries + 1):
+        try:
+            return function(*args, **kwargs)
+        except HttpResponseError as error:
+            if attempt == max_retries or not is_throttling_error(error):
+                raise
+            record_retry()
+            time.sleep(backoff_delay(attempt))
+
+
+class TokenBucket:
+    """thread safe rate limiter that allows rate requests per second with bursts of up to burst requests.
+
+    Args:
+        rate (float): requests allowed per second.
+        burst (int, optional): maximum number of requests made at once after an idle period. Defaults to None, max(1, rate).
+    """
+    def __init__(self, rate: float, burst: int=None):
+        self.rate = rate
+        self.capacity = burst if burst is not None else max(1, rate)
+        self._tokens = self.capacity
+        self._updated_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _take(self, tokens: int) -> float:
+        """take tokens if they are available and return 0, otherwise return the seconds until they are."""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated_at) * self.rate)
+            self._updated_at = now
+
+            if self._tokens >= tokens:
+                self._tokens -= tokens
+                return 0
+
+            return (tokens - self._tokens) / self.rate
+
+    def acquire(self, tokens: int=1) -> None:
+        """block until tokens requests are allowed."""
+        wait = self._take(tokens)
+        while wait > 0:
+            time.sleep(wait)
+            wait = self._take(tokens)
+
+    async def acquire_async(self, tokens: int=1) -> None:
+        """wait without blocking the event loop until tokens requests are allowed."""
+        wait = self._take(tokens)
+        while wait > 0:
+            await asyncio.sleep(wait)
+            wait = self._take(tokens)
+
+
+class AdaptiveConcurrencyLimiter:
+    """thread safe limit of requests in flight that adapts to the service with additive increase and
+    multiplicative decrease.
+
+    The limit is halved when the service throttles a request, at most once each DECREASE_COOLDOWN seconds so a burst
+    of throttled responses counts once, and grows by about one request per window of successful requests while
+    their latency is at most LATENCY_TOLERANCE times the moving average of the latency.
+
+    Args:
+        max_concurrency (int, optional): maximum and initial number of requests in flight. Defaults to DEFAULT_MAX_CONCURRENT_REQUESTS.
+        min_concurrency (int, optional): minimum number of requests in flight. Defaults to 1.
+    """
+    def __init__(self, max_concurrency: int=DEFAULT_MAX_CONCURRENT_REQUESTS, min_concurrency: int=1):
+        self.max_concurrency = max_concurrency
+        self.min_concurrency = min_concurrency
+        self.limit = float(max_concurrency)
+        self.average_latency = None
+        self._in_flight = 0
+        self._last_decrease = None
+        self._condition = threading.Condition()
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    def acquire(self) -> None:
+        """block until a request can be sent."""
+        with self._condition:
+            while self._in_flight >= max(self.min_concurrency, int(self.limit)):
+                self._condition.wait()
+            self._in_flight += 1
+
+    def release(self) -> None:
+        """mark a request as finished."""
+        with self._condition:
+            self._in_flight -= 1
+            self._condition.notify()
+
+    def on_throttle(self) -> None:
+        """halve the limit after the service throttled a request."""
+        with self._condition:
+            now = time.monotonic()
+            if self._last_decrease is not None and now - self._last_decrease < DECREASE_COOLDOWN:
+                return
+
+            self._last_decrease = now
+            self.limit = max(self.min_concurrency, self.limit / 2)
+
+    def on_success(self, latency: float) -> None:
+        """raise the limit after a request that was not throttled if its latency is close to the average."""
+        with self._condition:
+            recovered = self.average_latency is None or latency <= self.average_latency * LATENCY_TOLERANCE
+            self.average_latency = latency if self.average_latency is None else 0.9 * self.average_latency + 0.1 * latency
+
+            if recovered and self.limit < self.max_concurrency:
+                self.limit = min(self.max_concurrency, self.limit + 1 / self.limit)
+                self._condition.notify_all()
+
+
+class AsyncAdaptiveConcurrencyLimiter(AdaptiveConcurrencyLimiter):
+    """AdaptiveConcurrencyLimiter for the tasks of an event loop, acquire and release are coroutines that wait
+    without blocking the loop.
+
+    Args:
+        max_concurrency (int, optional): maximum and initial number of requests in flight. Defaults to DEFAULT_MAX_CONCURRENT_REQUESTS.
+        min_concurrency (int, optional): minimum number of requests in flight. Defaults to 1.
+    """
+    def __init__(self, max_concurrency: int=DEFAULT_MAX_CONCURRENT_REQUESTS, min_concurrency: int=1):
+        super().__init__(max_concurrency, min_concurrency)
+        self._waiters = None
+
+    def _get_waiters(self) -> asyncio.Condition:
+        # created on first use so it belongs to the running event loop
+        if self._waiters is None:
+            self._waiters = asyncio.Condition()
+        return self._waiters
+
+    async def acquire(self) -> None:
+        """wait until a request can be sent."""
+        waiters = self._get_waiters()
+        async with waiters:
+            await waiters.wait_for(lambda: self._in_flight < max(self.min_concurrency, int(self.limit)))
+            self._in_flight += 1
+
+    async def release(self) -> None:
+        """mark a request as finished and wake the requests allowed by the current limit."""
+        waiters = self._get_waiters()
+        async with waiters:
+            self._in_flight -= 1
+            waiters.notify(max(1, max(self.min_concurrency, int(self.limit)) - self._in_flight))
+
+
+class ThrottledTransport(HttpTransport):
+    """http transport that sends each request, retries included, through a rate limiter and an adaptive limit
+    of requests in flight shared by all clients of a connection.
+
+    Args:
+        transport (HttpTransport): transport that sends the requests.
+        concurrency_limiter (AdaptiveConcurrencyLimiter): limit of requests in flight, updated with each response.
+        rate_limiter (TokenBucket, optional): limit of requests per second. Defaults to None.
+        metrics (MetricsRecorder, optional): recorder of the latency of each request. Defaults to None.
+    """
+    def __init__(self, transport: HttpTransport, concurrency_limiter: AdaptiveConcurrencyLimiter,
+                 rate_limiter: TokenBucket=None, metrics=None):
+        self.transport = transport
+        self.concurrency_limiter = concurrency_limiter
+        self.rate_limiter = rate_limiter
+        self.metrics = metrics
+
+    def send(self, request, **kwargs):
+        if self.rate_limiter is not None:
+            self.rate_limiter.acquire()
+
+        self.concurrency_limiter.acquire()
+        start = time.monotonic()
+        try:
+            response = self.transport.send(request, **kwargs)
+        finally:
+            self.concurrency_limiter.release()
+
+        latency = time.monotonic() - start
+        throttled = response.status_code in THROTTLING_STATUS_CODES
+        if throttled:
+            self.concurrency_limiter.on_throttle()
+        else:
+            self.concurrency_limiter.on_success(latency)
+
+        if self.metrics is not None:
+            self.metrics.on_request(request.method, latency, throttled)
+
+        return response
+
+    def open(self):
+        self.transport.open()
+
+    def close(self):
+        self.transport.close()
+
+    def __enter__(self):
+        self.transport.__enter__()
+        return self
+
+    def __exit__(self, *args):
+        self.transport.__exit__(*args)
+
+
+
+class AsyncThrottledTransport(AsyncHttpTransport):
+    """async version of ThrottledTransport for the aio clients, the limits wait without blocking the event loop.
+
+    Args:
+        transport (AsyncHttpTransport): transport that sends the requests.
+        concurrency_limiter (AsyncAdaptiveConcurrencyLimiter): limit of requests in flight, updated with each response.
+        rate_limiter (TokenBucket, optional): limit of requests per second. Defaults to None.
+        metrics (MetricsRecorder, optional): recorder of the latency of each request. Defaults to None.
+    """
+    def __init__(self, transport: AsyncHttpTransport, concurrency_limiter: AsyncAdaptiveConcurrencyLimiter,
+                 rate_limiter: TokenBucket=None, metrics=None):
+        self.transport = transport
+        self.concurrency_limiter = concurrency_limiter
+        self.rate_limiter = rate_limiter
+        self.metrics = metrics
+
+    async def send(self, request, **kwargs):
+        if self.rate_limiter is not None:
+            await self.rate_limiter.acquire_async()
+
+        await self.concurrency_limiter.acquire()
+        start = time.monotonic()
+        try:
+            response = await self.transport.send(request, **kwargs)
+        except BaseException:
+            await self.concurrency_limiter.release()
+            raise
+
+        latency = time.monotonic() - start
+        throttled = response.status_code in THROTTLING_STATUS_CODES
+        if throttled:
+            self.concurrency_limiter.on_throttle()
+        else:
+            self.concurrency_limiter.on_success(latency)
+        await self.concurrency_limiter.release()
+
+        if self.metrics is not None:
+            self.metrics.on_request(request.method, latency, throttled)
+
+        return response
+
+    async def open(self):
+        await self.transport.open()
+
+    async def close(self):
+        await self.transport.close()
+
+    async def __aenter__(self):
+        await self.transport.__aenter__()
+        return self
+
+    async def __aexit__(self, *args):
+        await self.transport.__aexit__(*args)
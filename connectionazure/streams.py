@@ -0,0 +1,262 @@
+import io
+import bisect
+import hashlib
+import contextvars
+import concurrent.futures
+from azure.storage.filedatalake import ContentSettings
+from azure.core import MatchConditions
+from connectionazure.retry import call_with_retries
+
+
+class DataLakeFileWriter(io.RawIOBase):
+    """writable stream that uploads to a datalake file appending chunks in parallel.
+
+    The data written is split in chunks of chunk_size bytes that are appended at their offsets by a pool of
+    max_concurrency threads while the caller keeps writing, so at most max_concurrency chunks are held in memory.
+    The file is committed with a single flush when the stream is closed. The file is not committed and the pending
+    chunks are dropped if the stream is used as a context manager and the block raises, if a write failed before
+    the stream is closed, or if the stream is garbage collected without being closed.
+
+    Args:
+        file_client (DataLakeFileClient): client of the file created on datalake.
+        chunk_size (int): size in bytes of each appended chunk.
+        max_concurrency (int): number of chunks uploaded at the same time.
+        max_retries (int): number of retries of each chunk.
+        compute_md5 (bool, optional): if the MD5 of the data is computed while it is written and saved as the
+            Content-MD5 of the file on the flush. Defaults to False.
+        on_commit (callable, optional): called without args after the file is committed. Defaults to None.
+    """
+    def __init__(self, file_client, chunk_size: int, max_concurrency: int, max_retries: int, compute_md5: bool=False,
+                 on_commit=None):
+        super().__init__()
+        self.file_client = file_client
+        self.chunk_size = chunk_size
+        self.max_concurrency = max_concurrency
+        self.max_retries = max_retries
+        self._md5 = hashlib.md5() if compute_md5 else None
+        self._on_commit = on_commit
+        self._buffer = bytearray()
+        self._offset = 0
+        self._pending = set()
+        self._failed = False
+        self._executor = concurrent.futures.ThreadPoolExecutor(max_workers=max_concurrency)
+
+    def writable(self) -> bool:
+        return True
+
+    def tell(self) -> int:
+        return self._offset + len(self._buffer)
+
+    def write(self, data) -> int:
+        if self.closed:
+            raise ValueError('write to closed file')
+
+        try:
+            return self._write(data)
+        except BaseException:
+            self._failed = True
+            raise
+
+    def _write(self, data) -> int:
+        view = memoryview(data).cast('B')
+        size = len(view)
+
+        if self._md5 is not None:
+            self._md5.update(view)
+
+        if not self._buffer:
+            while len(view) >= self.chunk_size:
+                self._submit(bytes(view[:self.chunk_size]))
+                view = view[self.chunk_size:]
+
+        self._buffer += view
+        while len(self._buffer) >= self.chunk_size:
+            self._submit(bytes(self._buffer[:self.chunk_size]))
+            del self._buffer[:self.chunk_size]
+
+        return size
+
+    def _submit(self, chunk: bytes) -> None:
+        if len(self._pending) >= self.max_concurrency:
+            done, self._pending = concurrent.futures.wait(self._pending, return_when=concurrent.futures.FIRST_COMPLETED)
+            for future in done:
+                future.result()
+
+        self._pending.add(self._executor.submit(contextvars.copy_context().run, call_with_retries,
+                                                self.file_client.append_data, self.max_retries,
+                                                data=chunk, offset=self._offset, length=len(chunk)))
+        self._offset += len(chunk)
+
+    def close(self) -> None:
+        """upload the buffered data, wait for all chunks and commit the file, or abort if a write failed."""
+        if self.closed:
+            return
+
+        if self._failed:
+            self.abort()
+            return
+
+        try:
+            if self._buffer:
+                self._submit(bytes(self._buffer))
+                self._buffer.clear()
+
+            for future in concurrent.futures.as_completed(self._pending):
+                future.result()
+
+            if self._md5 is None:
+                self.file_client.flush_data(self._offset)
+            else:
+                self.file_client.flush_data(self._offset,
+                                            content_settings=ContentSettings(content_md5=bytearray(self._md5.digest())))
+
+            if self._on_commit is not None:
+                self._on_commit()
+        except BaseException:
+            self.abort()
+            raise
+        finally:
+            self._executor.shutdown()
+            super().close()
+
+    def abort(self) -> None:
+        """drop the buffered data and the pending chunks without committing the file."""
+        self._buffer.clear()
+        for future in self._pending:
+            future.cancel()
+        self._executor.shutdown()
+        super().close()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is not None:
+            self.abort()
+        else:
+            self.close()
+
+    def __del__(self):
+        # io.IOBase.__del__ would close, and commit, a stream dropped after an error
+        if not self.closed:
+            self.abort()
+
+
+class DataLakeFileReader(io.RawIOBase):
+    """seekable readable stream over a datalake file that downloads byte ranges on demand.
+
+    Reads are served from the ranges loaded with prefetch or from a read-ahead buffer, a read outside of them
+    downloads at least read_ahead bytes from the current position with a single ranged request. The number of
+    bytes downloaded is kept on bytes_downloaded. If etag is set every range is requested only if the file still
+    has it, so a file overwritten while it is read fails with ResourceModifiedError instead of mixing versions.
+
+    Args:
+        file_client (DataLakeFileClient): client of the file on datalake.
+        size (int): size in bytes of the file.
+        read_ahead (int): minimum number of bytes downloaded by each request made by read.
+        max_retries (int): number of retries of each ranged request.
+        etag (str, optional): ETag of the file when size was read. Defaults to None, ranges are not conditional.
+    """
+    def __init__(self, file_client, size: int, read_ahead: int, max_retries: int, etag: str=None):
+        super().__init__()
+        self.file_client = file_client
+        self.size = size
+        self.read_ahead = read_ahead
+        self.max_retries = max_retries
+        self.etag = etag
+        self._conditions = dict() if etag is None else dict(etag=etag, match_condition=MatchConditions.IfNotModified)
+        self._position = 0
+        self._range_offsets = []
+        self._ranges = dict()
+        self._buffer_offset = 0
+        self._buffer = b''
+        self.bytes_downloaded = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def tell(self) -> int:
+        return self._position
+
+    def seek(self, offset: int, whence: int=io.SEEK_SET) -> int:
+        if whence == io.SEEK_SET:
+            self._position = offset
+        elif whence == io.SEEK_CUR:
+            self._position += offset
+        elif whence == io.SEEK_END:
+            self._position = self.size + offset
+        else:
+            raise ValueError(f'invalid whence {whence}')
+
+        return self._position
+
+    def _download(self, offset: int, length: int) -> bytes:
+        return call_with_retries(lambda: self.file_client.download_file(offset=offset, length=length,
+                                                                        **self._conditions).readall(),
+                                 self.max_retries)
+
+    def prefetch(self, ranges, max_concurrency: int) -> None:
+        """download byte ranges in parallel and keep them to serve the next reads.
+
+        Args:
+            ranges (iterable): tuples with the offset and the length of each range.
+            max_concurrency (int): number of ranges downloaded at the same time.
+        """
+        ranges = [(offset, length) for offset, length in ranges if length > 0]
+
+        with concurrent.futures.ThreadPoolExecutor(max_workers=max_concurrency) as executor:
+            downloads = [executor.submit(contextvars.copy_context().run, self._download, offset, length)
+                         for offset, length in ranges]
+
+            for (offset, _), download in zip(ranges, downloads):
+                data = download.result()
+                self.bytes_downloaded += len(data)
+                if offset not in self._ranges:
+                    bisect.insort(self._range_offsets, offset)
+                self._ranges[offset] = data
+
+    def _read_cached(self, position: int, size: int):
+        if self._buffer_offset <= position < self._buffer_offset + len(self._buffer):
+            start = position - self._buffer_offset
+            return self._buffer[start:start + size]
+
+        index = bisect.bisect_right(self._range_offsets, position) - 1
+        if index >= 0:
+            offset = self._range_offsets[index]
+            data = self._ranges[offset]
+            if position < offset + len(data):
+                start = position - offset
+                return data[start:start + size]
+
+        return None
+
+    def read(self, size: int=-1) -> bytes:
+        if self.closed:
+            raise ValueError('read from closed file')
+
+        if size is None or size < 0:
+            size = self.size - self._position
+        size = max(0, min(size, self.size - self._position))
+
+        parts = []
+        while size > 0:
+            part = self._read_cached(self._position, size)
+            if part is None:
+                self._buffer_offset = self._position
+                self._buffer = self._download(self._position, min(max(size, self.read_ahead), self.size - self._position))
+                self.bytes_downloaded += len(self._buffer)
+                part = self._buffer[:size]
+
+            parts.append(part)
+            self._position += len(part)
+            size -= len(part)
+
+        return b''.join(parts)
+
+    def readinto(self, buffer) -> int:
+        data = self.read(len(buffer))
+        memoryview(buffer).cast('B')[:len(data)] = data
+        return len(data)
+
+    def readall(self) -> bytes:
+        return self.read()
@@ -0,0 +1,89 @@
+import os
+import hashlib
+from collections import namedtuple
+from connectionazure.results import SyncPlan
+
+SYNC_COMPARE_MODES = ('size_mtime', 'checksum')
+HASH_CHUNK_SIZE = 1024 * 1024
+
+FileState = namedtuple('FileState', ['size', 'mtime'])
+FileState.__doc__ = """size in bytes and modification time as a POSIX timestamp of a file compared by a sync."""
+
+
+def list_local_files(root: str) -> dict:
+    """return the state of all files of a local folder.
+
+    Args:
+        root (str): local folder.
+
+    Returns:
+        dict: FileState of each file by its path relative to root with '/' as separator.
+    """
+    files = dict()
+    for folder, _, file_names in os.walk(root):
+        for file_name in file_names:
+            local_path = os.path.join(folder, file_name)
+            stat = os.stat(local_path)
+            files[os.path.relpath(local_path, root).replace(os.sep, '/')] = FileState(stat.st_size, stat.st_mtime)
+
+    return files
+
+
+def list_remote_files(records, root: str) -> dict:
+    """return the state of the files of a datalake listing.
+
+    Args:
+        records (iterable): PathRecord of the paths listed under root.
+        root (str): path that was listed.
+
+    Returns:
+        dict: FileState of each file by its path relative to root.
+    """
+    depth = len([part for part in root.split('/') if part != ''])
+
+    return {'/'.join(record.path.split('/')[depth:]): FileState(record.content_length or 0, record.last_modified.timestamp())
+            for record in records if not record.is_directory}
+
+
+def file_md5(local_path: str) -> bytes:
+    """return the MD5 digest of a local file reading it in chunks."""
+    md5 = hashlib.md5()
+    with open(local_path, 'rb') as file_handle:
+        for chunk in iter(lambda: file_handle.read(HASH_CHUNK_SIZE), b''):
+            md5.update(chunk)
+
+    return md5.digest()
+
+
+def is_changed(source: FileState, sink: FileState) -> bool:
+    """True if the file is missing on the sink, has other size or was modified on the source after the sink."""
+    return sink is None or source.size != sink.size or source.mtime > sink.mtime
+
+
+def build_sync_plan(source: dict, sink: dict, changed, delete: bool=False, map_function=map) -> SyncPlan:
+    """compare the files of the source with the files of the sink.
+
+    Args:
+        source (dict): FileState of each file of the source by relative path.
+        sink (dict): FileState of each file of the sink by relative path.
+        changed (callable): called with the relative path, the source and the sink FileState (None if missing),
+            returns True if the file must be transferred.
+        delete (bool, optional): if the files that are only on the sink are deleted. Defaults to False.
+        map_function (callable, optional): map used to call changed, can be the map of an executor. Defaults to map.
+
+    Returns:
+        SyncPlan: files that will be transferred, deleted and kept.
+    """
+    paths = sorted(source)
+    plan = SyncPlan()
+
+    for relative_path, transfer in zip(paths, map_function(lambda path: changed(path, source[path], sink.get(path)), paths)):
+        if transfer:
+            plan.transfer.append(relative_path)
+        else:
+            plan.unchanged.append(relative_path)
+
+    if delete:
+        plan.delete = sorted(set(sink) - set(source))
+
+    return plan
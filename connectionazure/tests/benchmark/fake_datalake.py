@@ -0,0 +1,349 @@
+import hashlib
+import threading
+import time
+from datetime import datetime, timezone
+from azure.core import MatchConditions
+from azure.core.exceptions import ResourceExistsError, ResourceNotFoundError, ResourceNotModifiedError, ResourceModifiedError
+
+DEFAULT_PAGE_SIZE = 5000
+
+
+class NetworkModel:
+    """simulated network between the client and the service, each request sleeps its latency plus the time to
+    send its payload at the bandwidth of one connection.
+
+    Args:
+        latency (float, optional): seconds of each request. Defaults to 0.
+        bandwidth (float, optional): bytes per second of each connection, unlimited if None. Defaults to None.
+    """
+    def __init__(self, latency: float=0.0, bandwidth: float=None):
+        self.latency = latency
+        self.bandwidth = bandwidth
+        self.requests = 0
+        self.bytes_transferred = 0
+        self._lock = threading.Lock()
+
+    def request(self, size: int=0) -> None:
+        """count a request with a payload of size bytes and wait the time it takes on the network."""
+        with self._lock:
+            self.requests += 1
+            self.bytes_transferred += size
+
+        seconds = self.latency + (size / self.bandwidth if self.bandwidth else 0)
+        if seconds > 0:
+            time.sleep(seconds)
+
+
+class FakePath:
+    """file or directory kept in memory, the attributes have the names of PathProperties and FileProperties."""
+    def __init__(self, name: str, is_directory: bool, data: bytes=b''):
+        self.name = name
+        self.is_directory = is_directory
+        self.data = data
+        self.uncommitted = dict()
+        self.permissions = 'rwxr-x---'
+        self.owner = '$superuser'
+        self.content_md5 = None
+        self.touch()
+
+    def touch(self) -> None:
+        self.last_modified = datetime.now(timezone.utc)
+        self.etag = '"0x' + hashlib.md5(f'{self.name}{time.perf_counter_ns()}'.encode()).hexdigest()[:16].upper() + '"'
+
+    @property
+    def content_length(self) -> int:
+        return None if self.is_directory else len(self.data)
+
+    @property
+    def size(self) -> int:
+        return 0 if self.is_directory else len(self.data)
+
+    @property
+    def metadata(self) -> dict:
+        return {'hdi_isfolder': 'true'} if self.is_directory else {}
+
+    @property
+    def content_settings(self):
+        return _Properties(content_md5=self.content_md5)
+
+
+class _Properties:
+    def __init__(self, **attributes):
+        self.__dict__.update(attributes)
+
+
+class FakeDataLakeStore:
+    """thread safe in-memory storage account with the containers and paths of the fake clients."""
+    def __init__(self):
+        self.containers = dict()
+        self.lock = threading.RLock()
+
+    def container(self, name: str) -> dict:
+        if name not in self.containers:
+            raise ResourceNotFoundError(f'container {name} not found')
+        return self.containers[name]
+
+    def get(self, container: str, path: str) -> FakePath:
+        with self.lock:
+            paths = self.container(container)
+            if path not in paths:
+                raise ResourceNotFoundError(f'{container}/{path} not found')
+            return paths[path]
+
+    def create(self, container: str, path: str, is_directory: bool, data: bytes=b'') -> FakePath:
+        """create a path and its missing parent directories, replacing a file that exists."""
+        with self.lock:
+            paths = self.container(container)
+            parts = path.split('/')
+            for depth in range(1, len(parts)):
+                parent = '/'.join(parts[:depth])
+                if parent not in paths:
+                    paths[parent] = FakePath(parent, True)
+
+            if not (is_directory and path in paths):
+                paths[path] = FakePath(path, is_directory, data)
+            return paths[path]
+
+    def delete(self, container: str, path: str) -> None:
+        with self.lock:
+            paths = self.container(container)
+            self.get(container, path)
+            for name in [name for name in paths if name == path or name.startswith(path + '/')]:
+                del paths[name]
+
+    def rename(self, container: str, path: str, new_container: str, new_path: str) -> None:
+        with self.lock:
+            paths = self.container(container)
+            self.get(container, path)
+            new_parent = new_path.rpartition('/')[0]
+            new_paths = self.container(new_container)
+            if new_parent and (new_parent not in new_paths or not new_paths[new_parent].is_directory):
+                # as the service, RenameDestinationParentPathNotFound
+                raise ResourceNotFoundError(f'{new_container}/{new_parent} not found')
+
+            for name in sorted(name for name in paths if name == path or name.startswith(path + '/')):
+                moved = paths.pop(name)
+                moved.name = new_path + name[len(path):]
+                self.containers[new_container][moved.name] = moved
+
+    def list(self, container: str, path: str, recursive: bool) -> list:
+        with self.lock:
+            paths = self.container(container)
+            prefix = path.strip('/')
+            if prefix and (prefix not in paths or not paths[prefix].is_directory):
+                raise ResourceNotFoundError(f'{container}/{prefix} not found')
+
+            start = prefix + '/' if prefix else ''
+            return sorted((fake_path for name, fake_path in paths.items()
+                           if name.startswith(start) and (recursive or '/' not in name[len(start):])),
+                          key=lambda fake_path: fake_path.name)
+
+
+class FakeItemPaged:
+    def __init__(self, paths: list, page_size: int, network: NetworkModel):
+        self.paths = paths
+        self.page_size = page_size
+        self.network = network
+
+    def __iter__(self):
+        for page in self.by_page():
+            yield from page
+
+    def by_page(self, continuation_token: str=None):
+        return FakePageIterator(self, int(continuation_token) if continuation_token else 0)
+
+
+class FakePageIterator:
+    def __init__(self, item_paged: FakeItemPaged, start: int):
+        self.item_paged = item_paged
+        self.start = start
+        self.continuation_token = None
+
+    def __iter__(self):
+        paths, page_size = self.item_paged.paths, self.item_paged.page_size
+        for start in range(self.start, max(len(paths), 1), page_size):
+            self.item_paged.network.request()
+            self.continuation_token = str(start + page_size) if start + page_size < len(paths) else None
+            yield iter(paths[start:start + page_size])
+
+
+class FakeDownloader:
+    def __init__(self, data: bytes, fake_path: FakePath):
+        self.data = data
+        self.properties = _Properties(etag=fake_path.etag, size=fake_path.size, last_modified=fake_path.last_modified)
+
+    def readall(self) -> bytes:
+        return self.data
+
+    def readinto(self, stream) -> int:
+        stream.write(self.data)
+        return len(self.data)
+
+
+class FakeFileClient:
+    """in-memory DataLakeFileClient with the methods used by ConnectionAzureDataLake."""
+    def __init__(self, service, file_system_name: str, path: str):
+        self.service = service
+        self.file_system_name = file_system_name
+        self.path_name = path.strip('/')
+
+    def _get(self) -> FakePath:
+        return self.service.store.get(self.file_system_name, self.path_name)
+
+    def create_file(self) -> 'FakeFileClient':
+        self.service.network.request()
+        self.service.store.create(self.file_system_name, self.path_name, False)
+        return self
+
+    def append_data(self, data, offset: int, length: int=None, **kwargs) -> None:
+        data = bytes(data)
+        self.service.network.request(len(data))
+        with self.service.store.lock:
+            self._get().uncommitted[offset] = data
+
+    def flush_data(self, offset: int, content_settings=None, **kwargs) -> None:
+        self.service.network.request()
+        with self.service.store.lock:
+            fake_path = self._get()
+            data = bytearray(fake_path.data)
+            for chunk_offset in sorted(fake_path.uncommitted):
+                chunk = fake_path.uncommitted[chunk_offset]
+                data[chunk_offset:chunk_offset + len(chunk)] = chunk
+
+            fake_path.data = bytes(data[:offset])
+            fake_path.uncommitted = dict()
+            fake_path.content_md5 = None if content_settings is None else content_settings.content_md5
+            fake_path.touch()
+
+    def upload_data(self, data, overwrite: bool=False, **kwargs) -> None:
+        data = data if isinstance(data, bytes) else data.read()
+        self.service.network.request(len(data))
+        with self.service.store.lock:
+            if not overwrite and self.path_name in self.service.store.container(self.file_system_name):
+                raise ResourceExistsError(f'{self.file_system_name}/{self.path_name} already exists')
+            self.service.store.create(self.file_system_name, self.path_name, False, data)
+
+    def download_file(self, offset: int=None, length: int=None, etag: str=None, match_condition=None,
+                      **kwargs) -> FakeDownloader:
+        with self.service.store.lock:
+            fake_path = self._get()
+            if match_condition == MatchConditions.IfModified and etag == fake_path.etag:
+                self.service.network.request()
+                raise ResourceNotModifiedError('not modified')
+            if match_condition == MatchConditions.IfNotModified and etag != fake_path.etag:
+                self.service.network.request()
+                raise ResourceModifiedError('the condition specified using HTTP conditional header(s) is not met')
+
+            start = offset or 0
+            data = fake_path.data[start:] if length is None else fake_path.data[start:start + length]
+
+        self.service.network.request(len(data))
+        return FakeDownloader(data, fake_path)
+
+    def get_file_properties(self, **kwargs) -> FakePath:
+        self.service.network.request()
+        return self._get()
+
+    def delete_file(self, **kwargs) -> None:
+        self.service.network.request()
+        self.service.store.delete(self.file_system_name, self.path_name)
+
+    def rename_file(self, new_name: str, **kwargs) -> 'FakeFileClient':
+        self.service.network.request()
+        new_container, _, new_path = new_name.partition('/')
+        self.service.store.rename(self.file_system_name, self.path_name, new_container, new_path)
+        return FakeFileClient(self.service, new_container, new_path)
+
+
+class FakeDirectoryClient:
+    """in-memory DataLakeDirectoryClient with the methods used by ConnectionAzureDataLake."""
+    def __init__(self, service, file_system_name: str, path: str):
+        self.service = service
+        self.file_system_name = file_system_name
+        self.path_name = path.strip('/')
+
+    def _child(self, name: str) -> str:
+        return '/'.join(part for part in (self.path_name, name.strip('/')) if part)
+
+    def get_file_client(self, file_name: str) -> FakeFileClient:
+        return FakeFileClient(self.service, self.file_system_name, self._child(file_name))
+
+    def create_file(self, file_name: str, **kwargs) -> FakeFileClient:
+        return self.get_file_client(file_name).create_file()
+
+    def delete_directory(self, **kwargs) -> None:
+        self.service.network.request()
+        self.service.store.delete(self.file_system_name, self.path_name)
+
+    def rename_directory(self, new_name: str, **kwargs) -> 'FakeDirectoryClient':
+        self.service.network.request()
+        new_container, _, new_path = new_name.partition('/')
+        self.service.store.rename(self.file_system_name, self.path_name, new_container, new_path)
+        return FakeDirectoryClient(self.service, new_container, new_path)
+
+
+class FakeFileSystemClient:
+    """in-memory FileSystemClient with the methods used by ConnectionAzureDataLake."""
+    def __init__(self, service, file_system_name: str):
+        self.service = service
+        self.file_system_name = file_system_name
+
+    def get_paths(self, path: str=None, recursive: bool=True, max_results: int=None, **kwargs) -> FakeItemPaged:
+        paths = self.service.store.list(self.file_system_name, path or '', recursive)
+        return FakeItemPaged(paths, max_results or self.service.page_size, self.service.network)
+
+    def get_directory_client(self, directory: str) -> FakeDirectoryClient:
+        return FakeDirectoryClient(self.service, self.file_system_name, directory)
+
+    def get_file_client(self, file_path: str) -> FakeFileClient:
+        return FakeFileClient(self.service, self.file_system_name, file_path)
+
+    def create_directory(self, directory: str, **kwargs) -> FakeDirectoryClient:
+        self.service.network.request()
+        self.service.store.create(self.file_system_name, directory.strip('/'), True)
+        return self.get_directory_client(directory)
+
+
+class FakeDataLakeServiceClient:
+    """in-memory DataLakeServiceClient with the surface used by ConnectionAzureDataLake.
+
+    Every request waits the time given by the network model, so the same code paths that run against a storage
+    account can be measured offline. Paths are created with their parent directories as in an account with
+    hierarchical namespace.
+
+    Args:
+        latency (float, optional): seconds of each request. Defaults to 0.
+        bandwidth (float, optional): bytes per second of each connection, unlimited if None. Defaults to None.
+        page_size (int, optional): number of paths of each listing page. Defaults to DEFAULT_PAGE_SIZE.
+        store (FakeDataLakeStore, optional): storage shared with other clients, a new one if None. Defaults to None.
+    """
+    def __init__(self, latency: float=0.0, bandwidth: float=None, page_size: int=DEFAULT_PAGE_SIZE,
+                 store: FakeDataLakeStore=None):
+        self.network = NetworkModel(latency, bandwidth)
+        self.page_size = page_size
+        self.store = FakeDataLakeStore() if store is None else store
+        self.credential = None
+        self.primary_endpoint = 'https://fake.dfs.core.windows.net/'
+
+    def get_file_system_client(self, file_system: str) -> FakeFileSystemClient:
+        return FakeFileSystemClient(self, file_system)
+
+    def create_file_system(self, file_system: str, **kwargs) -> FakeFileSystemClient:
+        self.network.request()
+        with self.store.lock:
+            if file_system in self.store.containers:
+                raise ResourceExistsError(f'container {file_system} already exists')
+            self.store.containers[file_system] = dict()
+        return self.get_file_system_client(file_system)
+
+    def delete_file_system(self, file_system: str, **kwargs) -> None:
+        self.network.request()
+        with self.store.lock:
+            self.store.container(file_system)
+            del self.store.containers[file_system]
+
+    def list_file_systems(self, **kwargs) -> FakeItemPaged:
+        with self.store.lock:
+            containers = [_Properties(name=name, last_modified=datetime.now(timezone.utc))
+                          for name in sorted(self.store.containers)]
+        return FakeItemPaged(containers, self.page_size, self.network)
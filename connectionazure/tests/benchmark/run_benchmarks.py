@@ -0,0 +1,295 @@
+"""offline benchmarks of ConnectionAzureDataLake against the in-memory FakeDataLakeServiceClient.
+
+Run with python -m connectionazure.tests.benchmark.run_benchmarks --help
+"""
+import argparse
+import json
+import os
+import statistics
+import tempfile
+import time
+from collections import namedtuple
+from dataclasses import dataclass, asdict
+import numpy as np
+import pandas as pd
+from connectionazure.datalake import ConnectionAzureDataLake
+from connectionazure.tests.benchmark.fake_datalake import FakeDataLakeServiceClient
+
+CONTAINER = 'benchmark'
+MIB = 1024 * 1024
+
+BenchmarkResult = namedtuple('BenchmarkResult', ['name', 'operations', 'bytes_transferred', 'seconds', 'requests'])
+BenchmarkResult.__doc__ = """median time of the repetitions of a benchmark with the operations and bytes of one repetition."""
+
+
+@dataclass
+class BenchmarkConfig:
+    """size of the workloads and model of the network used by the benchmarks.
+
+    Args:
+        latency (float): seconds of each request.
+        bandwidth (float): bytes per second of each connection, unlimited if None.
+        repeat (int): number of repetitions of each benchmark, the median is reported.
+        seed (int): seed of the generated data.
+        small_files (int): number of files of the fan-out upload and of the directory download.
+        small_file_size (int): size in bytes of each small file.
+        large_file_size (int): size in bytes of the single file transfers.
+        chunk_size (int): size in bytes of each chunk or range of the large transfers.
+        max_concurrency (int): number of chunks of a file transferred at the same time.
+        max_workers (int): number of files transferred at the same time.
+        listing_depth (int): depth of the directory tree listed.
+        listing_fanout (int): subdirectories of each directory of the tree listed.
+        listing_files (int): files on each leaf directory of the tree listed.
+        parquet_rows (int): rows of the dataframe of the parquet round-trips.
+    """
+    latency: float = 0.005
+    bandwidth: float = 100 * MIB
+    repeat: int = 3
+    seed: int = 0
+    small_files: int = 1000
+    small_file_size: int = 4 * 1024
+    large_file_size: int = 64 * MIB
+    chunk_size: int = 8 * MIB
+    max_concurrency: int = 8
+    max_workers: int = 16
+    listing_depth: int = 3
+    listing_fanout: int = 8
+    listing_files: int = 20
+    parquet_rows: int = 500000
+
+    def scaled(self, scale: float) -> 'BenchmarkConfig':
+        """return a copy with the number of files, bytes and rows multiplied by scale."""
+        sizes = ('small_files', 'large_file_size', 'listing_files', 'parquet_rows')
+        return BenchmarkConfig(**{**asdict(self), **{name: max(1, int(getattr(self, name) * scale)) for name in sizes}})
+
+
+class BenchmarkContext:
+    """connection backed by a new fake service and data generated with the seed of the config."""
+    def __init__(self, config: BenchmarkConfig):
+        self.config = config
+        self.service = FakeDataLakeServiceClient(latency=config.latency, bandwidth=config.bandwidth)
+        self.store = self.service.store
+        self.connection = ConnectionAzureDataLake()
+        self.connection.service_client = self.service
+        self.generator = np.random.default_rng(config.seed)
+        self.store.containers[CONTAINER] = dict()
+
+    def random_bytes(self, size: int) -> bytes:
+        return self.generator.bytes(size)
+
+    def dataframe(self) -> pd.DataFrame:
+        rows = self.config.parquet_rows
+        generator = np.random.default_rng(self.config.seed)
+        return pd.DataFrame({'id': np.arange(rows),
+                             'value': generator.random(rows),
+                             'category': generator.choice(['a', 'b', 'c', 'd'], rows),
+                             'amount': generator.integers(0, 1000, rows)})
+
+
+def _files_per_folder(count: int, folder_size: int=100):
+    for index in range(count):
+        yield f'folder-{index // folder_size:04d}', f'file-{index:06d}.bin'
+
+
+def small_file_upload(context: BenchmarkContext):
+    """upload a local folder of many small files with upload_directory."""
+    config = context.config
+    local = tempfile.TemporaryDirectory()
+    for folder, file_name in _files_per_folder(config.small_files):
+        os.makedirs(os.path.join(local.name, folder), exist_ok=True)
+        with open(os.path.join(local.name, folder, file_name), 'wb') as file_handle:
+            file_handle.write(context.random_bytes(config.small_file_size))
+
+    def run():
+        result = context.connection.upload_directory(local.name, CONTAINER, 'small', max_workers=config.max_workers,
+                                                     chunk_size=config.chunk_size)
+        return len(result.succeeded), result.bytes_transferred
+
+    return run, local.cleanup
+
+
+def large_file_upload(context: BenchmarkContext):
+    """upload a single large file in chunks appended in parallel."""
+    config = context.config
+    data = context.random_bytes(config.large_file_size)
+
+    def run():
+        size = context.connection.upload_file_to_directory_chunked(CONTAINER, 'large', 'file.bin', data, overwrite=True,
+                                                                   chunk_size=config.chunk_size,
+                                                                   max_concurrency=config.max_concurrency)
+        return 1, size
+
+    return run, None
+
+
+def large_file_download(context: BenchmarkContext):
+    """download a single large file in ranges fetched in parallel."""
+    config = context.config
+    context.store.create(CONTAINER, 'large/file.bin', False, context.random_bytes(config.large_file_size))
+
+    def run():
+        data = context.connection.download_file_as_binary(CONTAINER, 'large', 'file.bin', chunk_size=config.chunk_size,
+                                                          max_concurrency=config.max_concurrency)
+        return 1, len(data)
+
+    return run, None
+
+
+def deep_listing(context: BenchmarkContext):
+    """list recursively a tree of directories as a dataframe."""
+    config = context.config
+    leaves = ['deep']
+    for _ in range(config.listing_depth):
+        leaves = [f'{leaf}/dir-{index:03d}' for leaf in leaves for index in range(config.listing_fanout)]
+    for leaf in leaves:
+        for index in range(config.listing_files):
+            context.store.create(CONTAINER, f'{leaf}/file-{index:05d}.bin', False)
+
+    def run():
+        df = context.connection.list_directory_contents(CONTAINER, 'deep')
+        return len(df), 0
+
+    return run, None
+
+
+def directory_download(context: BenchmarkContext):
+    """download a folder of many small files with download_directory."""
+    config = context.config
+    for folder, file_name in _files_per_folder(config.small_files):
+        context.store.create(CONTAINER, f'small/{folder}/{file_name}', False, context.random_bytes(config.small_file_size))
+    local = tempfile.TemporaryDirectory()
+
+    def run():
+        result = context.connection.download_directory(CONTAINER, 'small', local.name, max_workers=config.max_workers,
+                                                       chunk_size=config.chunk_size)
+        return len(result.succeeded), result.bytes_transferred
+
+    return run, local.cleanup
+
+
+def parquet_roundtrip(context: BenchmarkContext):
+    """upload a dataframe as parquet and download it back."""
+    df = context.dataframe()
+
+    def run():
+        context.connection.upload_dataframe_as_parquet(df, CONTAINER, 'parquet', 'roundtrip.parquet', {})
+        size = context.store.get(CONTAINER, 'parquet/roundtrip.parquet').size
+        context.connection.download_parquet_as_dataframe(CONTAINER, 'parquet', 'roundtrip.parquet')
+        context.store.delete(CONTAINER, 'parquet/roundtrip.parquet')
+        return 2, 2 * size
+
+    return run, None
+
+
+def parquet_projection(context: BenchmarkContext):
+    """read two columns of the rows of a parquet file that match a filter."""
+    df = context.dataframe()
+    row_group_size = max(1, context.config.parquet_rows // 10)
+    context.store.create(CONTAINER, 'parquet/projection.parquet', False,
+                         df.to_parquet(index=False, row_group_size=row_group_size))
+
+    def run():
+        reader_bytes = context.service.network.bytes_transferred
+        context.connection.download_parquet_as_dataframe(CONTAINER, 'parquet', 'projection.parquet',
+                                                         columns=['id', 'value'], filters=[('id', '<', row_group_size)])
+        return 1, context.service.network.bytes_transferred - reader_bytes
+
+    return run, None
+
+
+BENCHMARKS = {
+    'small_file_upload': small_file_upload,
+    'large_file_upload': large_file_upload,
+    'large_file_download': large_file_download,
+    'deep_listing': deep_listing,
+    'directory_download': directory_download,
+    'parquet_roundtrip': parquet_roundtrip,
+    'parquet_projection': parquet_projection,
+}
+
+
+def run_benchmark(name: str, config: BenchmarkConfig) -> BenchmarkResult:
+    """run a benchmark config.repeat times on a new fake service and return the median time.
+
+    Args:
+        name (str): name of the benchmark on BENCHMARKS.
+        config (BenchmarkConfig): size of the workload and model of the network.
+
+    Returns:
+        BenchmarkResult: operations, bytes and requests of one repetition and the median seconds.
+    """
+    context = BenchmarkContext(config)
+    run, cleanup = BENCHMARKS[name](context)
+
+    try:
+        timings = []
+        for _ in range(config.repeat):
+            requests = context.service.network.requests
+            start = time.perf_counter()
+            operations, bytes_transferred = run()
+            timings.append(time.perf_counter() - start)
+            requests = context.service.network.requests - requests
+    finally:
+        if cleanup is not None:
+            cleanup()
+
+    return BenchmarkResult(name, operations, bytes_transferred, statistics.median(timings), requests)
+
+
+def run_benchmarks(config: BenchmarkConfig, names=None) -> list:
+    """run the benchmarks in the order of BENCHMARKS.
+
+    Args:
+        config (BenchmarkConfig): size of the workloads and model of the network.
+        names (list, optional): names of the benchmarks that will run, all if None. Defaults to None.
+
+    Raises:
+        Exception: if a name is not on BENCHMARKS.
+
+    Returns:
+        list: BenchmarkResult of each benchmark.
+    """
+    names = list(BENCHMARKS) if not names else names
+    unknown = [name for name in names if name not in BENCHMARKS]
+    if unknown:
+        raise Exception(f'unknown benchmarks {unknown}, the benchmarks are {list(BENCHMARKS)}')
+
+    return [run_benchmark(name, config) for name in names]
+
+
+def format_results(results: list) -> str:
+    """format the results as a table with ops/s and MB/s."""
+    lines = [f'{"benchmark":<22}{"ops":>10}{"MB":>10}{"seconds":>10}{"ops/s":>12}{"MB/s":>10}{"requests":>10}']
+    for result in results:
+        megabytes = result.bytes_transferred / MIB
+        lines.append(f'{result.name:<22}{result.operations:>10}{megabytes:>10.1f}{result.seconds:>10.3f}'
+                     f'{result.operations / result.seconds:>12.1f}{megabytes / result.seconds:>10.1f}{result.requests:>10}')
+    return '\n'.join(lines)
+
+
+def main(args=None) -> list:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('benchmarks', nargs='*', help=f'benchmarks to run, all if empty: {", ".join(BENCHMARKS)}')
+    parser.add_argument('--latency-ms', type=float, default=BenchmarkConfig.latency * 1000, help='latency of each request')
+    parser.add_argument('--bandwidth-mbps', type=float, default=BenchmarkConfig.bandwidth / MIB,
+                        help='MiB per second of each connection, 0 for unlimited')
+    parser.add_argument('--scale', type=float, default=1.0, help='multiplier of the number of files, bytes and rows')
+    parser.add_argument('--repeat', type=int, default=BenchmarkConfig.repeat, help='repetitions, the median is reported')
+    parser.add_argument('--seed', type=int, default=BenchmarkConfig.seed, help='seed of the generated data')
+    parser.add_argument('--json', help='file where the results are saved as json')
+    options = parser.parse_args(args)
+
+    config = BenchmarkConfig(latency=options.latency_ms / 1000, bandwidth=options.bandwidth_mbps * MIB or None,
+                             repeat=options.repeat, seed=options.seed).scaled(options.scale)
+    results = run_benchmarks(config, options.benchmarks)
+    print(format_results(results))
+
+    if options.json:
+        with open(options.json, 'w') as file_handle:
+            json.dump({'config': asdict(config), 'results': [result._asdict() for result in results]}, file_handle, indent=2)
+
+    return results
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,152 @@
+from connectionazure.tests.unit.unit_base_test import UnitBaseTest
+from unittest.mock import patch
+from azure.core.exceptions import ResourceNotFoundError
+from connectionazure.datalake import ConnectionAzureDataLake
+from connectionazure.tests.benchmark.fake_datalake import FakeDataLakeServiceClient, NetworkModel
+from connectionazure.tests.benchmark.run_benchmarks import BenchmarkConfig, BENCHMARKS, run_benchmarks, format_results, main
+from tempfile import TemporaryDirectory
+import pandas as pd
+import json
+import os
+
+
+TINY_CONFIG = BenchmarkConfig(latency=0, bandwidth=None, repeat=1, small_files=5, small_file_size=16, large_file_size=1000,
+                              chunk_size=256, max_concurrency=2, max_workers=2, listing_depth=2, listing_fanout=2,
+                              listing_files=3, parquet_rows=100)
+
+
+class NetworkModelTest(UnitBaseTest):
+    @patch('connectionazure.tests.benchmark.fake_datalake.time.sleep')
+    def test_request(self, mock_sleep):
+        network = NetworkModel(latency=0.01, bandwidth=1000)
+
+        network.request(500)
+        network.request()
+
+        self.assertEqual((network.requests, network.bytes_transferred), (2, 500))
+        self.assertEqual([call.args[0] for call in mock_sleep.call_args_list], [0.51, 0.01])
+
+    @patch('connectionazure.tests.benchmark.fake_datalake.time.sleep')
+    def test_request_without_delay(self, mock_sleep):
+        NetworkModel().request(500)
+
+        mock_sleep.assert_not_called()
+
+
+class FakeDataLakeServiceClientTest(UnitBaseTest):
+    def setUp(self) -> None:
+        super().setUp()
+
+        self.service = FakeDataLakeServiceClient(page_size=2)
+        self.connection = ConnectionAzureDataLake()
+        self.connection.service_client = self.service
+        self.connection.create_container('container')
+
+    def test_upload_and_download(self):
+        self.connection.upload_file_to_directory('container', 'folder', 'a.txt', b'hello')
+        self.connection.upload_file_to_directory_bulk('container', 'folder', 'b.txt', b'bulk')
+        self.connection.upload_file_to_directory_chunked('container', 'folder/sub', 'c.txt', b'0123456789', chunk_size=3,
+                                                         max_concurrency=2)
+
+        self.assertEqual(self.connection.download_file_as_binary('container', 'folder', 'a.txt'), b'hello')
+        self.assertEqual(self.connection.download_file_as_string('container', 'folder', 'b.txt'), 'bulk')
+        self.assertEqual(self.connection.download_file_as_binary('container', 'folder/sub', 'c.txt', chunk_size=4),
+                         b'0123456789')
+        self.assertTrue(self.connection.check_if_path_exists('container', 'folder', 'sub'))
+
+        with self.assertRaises(Exception):
+            self.connection.upload_file_to_directory('container', 'folder', 'a.txt', b'again')
+
+    def test_list_directory_contents(self):
+        for name in ('a.txt', 'b.txt', 'sub/c.txt'):
+            self.service.store.create('container', 'folder/' + name, False, b'1')
+
+        directory = self.connection.list_directory_contents('container', 'folder')
+        children = list(self.connection.iterate_directory_contents('container', 'folder', recursive=False))
+
+        self.assertEqual(directory.path.to_list(), ['folder/a.txt', 'folder/b.txt', 'folder/sub', 'folder/sub/c.txt'])
+        self.assertEqual(directory.is_directory.to_list(), [False, False, True, False])
+        self.assertEqual([record.path for record in children], ['folder/a.txt', 'folder/b.txt', 'folder/sub'])
+        self.assertEqual(self.connection.list_containers().container.to_list(), ['container'])
+
+        with self.assertRaises(ResourceNotFoundError):
+            self.connection.list_directory_contents('container', 'missing')
+
+    def test_rename_and_delete(self):
+        self.service.store.create('container', 'folder/a.txt', False, b'1')
+        self.service.store.create('container', 'folder/b.txt', False, b'2')
+
+        self.connection.rename_directory('container', 'folder', 'moved')
+        self.connection.rename_file('container', 'moved/a.txt', 'other/a.txt')
+        self.connection.delete_file('container', 'moved', 'b.txt')
+
+        self.assertEqual(sorted(self.service.store.containers['container']), ['moved', 'other', 'other/a.txt'])
+
+        self.connection.delete_directory('container', 'other')
+        self.assertEqual(sorted(self.service.store.containers['container']), ['moved'])
+
+    def test_parquet_round_trip(self):
+        df = pd.DataFrame({'id': range(100), 'value': [index * 0.5 for index in range(100)]})
+        self.connection.upload_dataframe_as_parquet(df, 'container', 'parquet', 'file.parquet', {'index': False,
+                                                                                                  'row_group_size': 10})
+
+        result = self.connection.download_parquet_as_dataframe('container', 'parquet', 'file.parquet', columns=['value'],
+                                                               filters=[('id', '>=', 95)])
+
+        self.assertEqual(result.value.to_list(), [47.5, 48, 48.5, 49, 49.5])
+
+    def test_directory_transfers(self):
+        with TemporaryDirectory() as local, TemporaryDirectory() as sink:
+            os.makedirs(os.path.join(local, 'sub'))
+            for name in ('a.txt', os.path.join('sub', 'b.txt')):
+                with open(os.path.join(local, name), 'wb') as file_handle:
+                    file_handle.write(b'data')
+
+            uploaded = self.connection.upload_directory(local, 'container', 'folder', max_workers=2)
+            downloaded = self.connection.download_directory('container', 'folder', sink, max_workers=2)
+
+            self.assertEqual((uploaded.bytes_transferred, downloaded.bytes_transferred), (8, 8))
+            with open(os.path.join(sink, 'sub', 'b.txt'), 'rb') as file_handle:
+                self.assertEqual(file_handle.read(), b'data')
+
+
+class RunBenchmarksTest(UnitBaseTest):
+    def test_run_benchmarks(self):
+        results = run_benchmarks(TINY_CONFIG)
+
+        self.assertEqual([result.name for result in results], list(BENCHMARKS))
+        results = {result.name: result for result in results}
+        self.assertEqual((results['small_file_upload'].operations, results['small_file_upload'].bytes_transferred), (5, 80))
+        self.assertEqual(results['large_file_download'].bytes_transferred, 1000)
+        self.assertEqual(results['large_file_download'].requests, 5)
+        self.assertEqual(results['deep_listing'].operations, 2 + 4 + 4 * 3)
+        self.assertEqual(results['directory_download'].operations, 5)
+        self.assertTrue(all(result.seconds > 0 for result in results.values()))
+        self.assertEqual(len(format_results(results.values()).splitlines()), len(BENCHMARKS) + 1)
+
+    def test_run_benchmarks_unknown(self):
+        with self.assertRaises(Exception) as context:
+            run_benchmarks(TINY_CONFIG, ['missing'])
+
+        self.assertIn("unknown benchmarks ['missing']", context.exception.args[0])
+
+    def test_scaled(self):
+        config = BenchmarkConfig().scaled(0.5)
+
+        self.assertEqual((config.small_files, config.parquet_rows, config.listing_depth), (500, 250000, 3))
+
+    @patch('builtins.print')
+    def test_main(self, mock_print):
+        with TemporaryDirectory() as folder:
+            output = os.path.join(folder, 'results.json')
+
+            results = main(['deep_listing', '--latency-ms', '0', '--bandwidth-mbps', '0', '--scale', '0.01',
+                            '--repeat', '1', '--json', output])
+
+            with open(output) as file_handle:
+                saved = json.load(file_handle)
+
+        self.assertEqual([result.name for result in results], ['deep_listing'])
+        self.assertEqual(saved['results'][0]['operations'], results[0].operations)
+        self.assertIsNone(saved['config']['bandwidth'])
+        mock_print.assert_called_once()
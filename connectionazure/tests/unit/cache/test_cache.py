@@ -0,0 +1,189 @@
+from connectionazure.tests.unit.unit_base_test import UnitBaseTest
+from connectionazure.cache import LRUCache, DiskCache, ListingCache
+from connectionazure.results import PathRecord
+from tempfile import TemporaryDirectory
+import time
+import os
+from unittest.mock import Mock, patch
+
+
+class LRUCacheTest(UnitBaseTest):
+    def test_get_or_create_reuses_item(self):
+        cache = LRUCache(max_size=2)
+        factory = Mock(return_value='client')
+
+        first = cache.get_or_create('key', factory)
+        second = cache.get_or_create('key', factory)
+
+        self.assertEqual(first, 'client')
+        self.assertEqual(second, 'client')
+        factory.assert_called_once()
+
+    def test_get_or_create_evicts_least_recently_used(self):
+        cache = LRUCache(max_size=2)
+
+        cache.get_or_create('a', lambda: 'a')
+        cache.get_or_create('b', lambda: 'b')
+        cache.get_or_create('a', lambda: 'new a')
+        cache.get_or_create('c', lambda: 'c')
+
+        self.assertEqual(len(cache), 2)
+        self.assertEqual(cache.get_or_create('a', lambda: 'new a'), 'a')
+        self.assertEqual(cache.get_or_create('b', lambda: 'new b'), 'new b')
+
+    def test_clear(self):
+        cache = LRUCache()
+        cache.get_or_create('a', lambda: 'a')
+
+        cache.clear()
+
+        self.assertEqual(len(cache), 0)
+
+
+class DiskCacheTest(UnitBaseTest):
+    def setUp(self) -> None:
+        super().setUp()
+
+        self.temp_directory = TemporaryDirectory()
+        self.directory = os.path.join(self.temp_directory.name, 'cache')
+
+    def tearDown(self) -> None:
+        self.temp_directory.cleanup()
+
+        super().tearDown()
+
+    def test_put_and_get(self):
+        cache = DiskCache(self.directory, max_size=100)
+
+        cache.put('container/folder/file.txt', '"0x8D9"', b'content\nwith lines')
+        entry = cache.get('container/folder/file.txt')
+
+        self.assertEqual((entry.etag, entry.data), ('"0x8D9"', b'content\nwith lines'))
+        self.assertIsNone(cache.get('container/folder/other.txt'))
+        self.assertFalse(any(name.endswith('.part') for name in os.listdir(self.directory)))
+
+    def test_is_fresh(self):
+        cache = DiskCache(self.directory, ttl=60)
+        cache_without_ttl = DiskCache(self.directory)
+        cache.put('key', 'etag', b'data')
+
+        self.assertTrue(cache.is_fresh(cache.get('key')))
+        self.assertFalse(cache_without_ttl.is_fresh(cache.get('key')))
+
+        os.utime(cache._path('key'), (time.time() - 120, time.time() - 120))
+        self.assertFalse(cache.is_fresh(cache.get('key')))
+
+        cache.touch('key')
+        self.assertTrue(cache.is_fresh(cache.get('key')))
+
+    def test_evict_least_recently_used(self):
+        cache = DiskCache(self.directory, max_size=2 * (len(b'etag\n') + 10))
+
+        for index, key in enumerate(['a', 'b']):
+            cache.put(key, 'etag', b'0' * 10)
+            os.utime(cache._path(key), (1000 + index, 1000 + index))
+
+        cache.touch('a')
+        cache.put('c', 'etag', b'0' * 10)
+
+        self.assertIsNone(cache.get('b'))
+        self.assertIsNotNone(cache.get('a'))
+        self.assertIsNotNone(cache.get('c'))
+
+    def test_evict_by_access_not_validation(self):
+        cache = DiskCache(self.directory, max_size=2 * (len(b'etag\n') + 10), ttl=60)
+
+        for index, key in enumerate(['hot', 'cold']):
+            cache.put(key, 'etag', b'0' * 10)
+            os.utime(cache._path(key), (1000 + index, 1000 + index))
+
+        entry = cache.get('hot')
+        cache.put('new', 'etag', b'0' * 10)
+
+        self.assertEqual(entry.validated_at, 1000)
+        self.assertEqual(os.stat(cache._path('hot')).st_mtime, 1000)
+        self.assertIsNone(cache.get('cold'))
+        self.assertIsNotNone(cache.get('hot'))
+
+    def test_put_bigger_than_max_size(self):
+        cache = DiskCache(self.directory, max_size=5)
+
+        cache.put('key', 'etag', b'0' * 10)
+
+        self.assertIsNone(cache.get('key'))
+
+    def test_clear(self):
+        cache = DiskCache(self.directory)
+        cache.put('key', 'etag', b'data')
+
+        cache.clear()
+
+        self.assertIsNone(cache.get('key'))
+
+
+class ListingCacheTest(UnitBaseTest):
+    def records(self, *paths):
+        return [PathRecord(None, path, None, None, False, 0, None) for path in paths]
+
+    def test_put_and_get(self):
+        cache = ListingCache(ttl=60)
+        key = ListingCache.key('container', '/folder/', True)
+
+        cache.put(key, self.records('folder/a.txt'), cache.generation)
+
+        self.assertEqual(key, ('container', 'folder', True))
+        self.assertEqual(cache.get(key), tuple(self.records('folder/a.txt')))
+        self.assertTrue(cache.contains_path(key, 'folder/a.txt'))
+        self.assertFalse(cache.contains_path(key, 'folder/b.txt'))
+        self.assertIsNone(cache.contains_path(ListingCache.key('container', 'other', True), 'other/a.txt'))
+
+    @patch('connectionazure.cache.time.monotonic')
+    def test_expires_after_ttl(self, mock_monotonic):
+        cache = ListingCache(ttl=60)
+        key = ListingCache.key('container', 'folder', True)
+
+        mock_monotonic.return_value = 100
+        cache.put(key, self.records('folder/a.txt'), cache.generation)
+        mock_monotonic.return_value = 159
+        self.assertIsNotNone(cache.get(key))
+        mock_monotonic.return_value = 160
+        self.assertIsNone(cache.get(key))
+        self.assertEqual(len(cache), 0)
+
+    def test_put_after_invalidation_is_ignored(self):
+        cache = ListingCache(ttl=60)
+        key = ListingCache.key('container', 'folder', True)
+        generation = cache.generation
+
+        cache.invalidate('container', 'folder/a.txt')
+        cache.put(key, self.records('folder/a.txt'), generation)
+
+        self.assertIsNone(cache.get(key))
+
+    def test_invalidate(self):
+        cache = ListingCache(ttl=60)
+        keys = [ListingCache.key('container', path, True) for path in ('', 'a', 'a/b', 'a/b/c', 'other')]
+        keys.append(ListingCache.key('other_container', 'a', True))
+        for key in keys:
+            cache.put(key, [], cache.generation)
+
+        cache.invalidate('container', 'a/b/file.txt')
+        self.assertEqual([key[1:] for key in keys if cache.get(key) is not None], [('a/b/c', True), ('other', True), ('a', True)])
+
+        cache.invalidate('container', 'a/b')
+        self.assertEqual([key[1:] for key in keys if cache.get(key) is not None], [('other', True), ('a', True)])
+
+        cache.invalidate('container')
+        self.assertEqual([key for key in keys if cache.get(key) is not None], [('other_container', 'a', True)])
+
+        cache.invalidate()
+        self.assertEqual(len(cache), 0)
+
+    def test_max_size(self):
+        cache = ListingCache(ttl=60, max_size=2)
+        for path in ('a', 'b', 'c'):
+            cache.put(ListingCache.key('container', path, True), [], cache.generation)
+
+        self.assertIsNone(cache.get(ListingCache.key('container', 'a', True)))
+        self.assertEqual(len(cache), 2)
+
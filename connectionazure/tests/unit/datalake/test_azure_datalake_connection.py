@@ -1,8 +1,25 @@
 from connectionazure.tests.unit.unit_base_test import UnitBaseTest
-from unittest.mock import Mock, patch
-from connectionazure.datalake import ConnectionAzureDataLake
+from unittest.mock import ANY, Mock, patch, mock_open
+from azure.core.exceptions import AzureError, HttpResponseError, ResourceNotFoundError, ResourceNotModifiedError, \
+    ResourceModifiedError, ServiceResponseError
+from azure.core import MatchConditions
+from connectionazure.datalake import ConnectionAzureDataLake, DEFAULT_CHUNK_SIZE, DEFAULT_MAX_CONCURRENCY, RANGE_READ_AHEAD, \
+    CONNECTION_TIMEOUT, READ_TIMEOUT, DATA_BLOCK_SIZE
+from connectionazure.results import PathRecord, PATH_SCHEMA
+from connectionazure.retry import ThrottledTransport, TokenBucket
+from connectionazure.tests.unit.streams.test_streams import MockFileClient, MockRangedFileClient
+from connectionazure.streams import DataLakeFileReader
+from connectionazure.metrics import MetricsRecorder
+from connectionazure.tests.benchmark.fake_datalake import FakeDataLakeServiceClient
+import pyarrow as pa
+import pyarrow.parquet as pq
 from pandas import DataFrame
 import pandas as pd
+from io import BytesIO
+from tempfile import TemporaryDirectory
+import os
+import hashlib
+from datetime import datetime, timezone
 
 class MockContainer:
     def __init__(self, name, last_modified):
@@ -10,12 +27,32 @@ class MockContainer:
         self.last_modified = last_modified
 
 class MockDirectory:
-    def __init__(self, permissions, path, last_modified, owner, is_directory):
+    def __init__(self, permissions, path, last_modified, owner, is_directory, content_length=0, etag='0x0'):
         self.permissions = permissions
         self.name = path
         self.last_modified = last_modified
         self.owner = owner
         self.is_directory = is_directory
+        self.content_length = content_length
+        self.etag = etag
+
+class MockPageIterator:
+    def __init__(self, pages, continuation_token):
+        self.pages = pages
+        self.continuation_token = continuation_token
+
+    def __iter__(self):
+        for index, page in enumerate(self.pages):
+            self.continuation_token = str(index + 1) if index + 1 < len(self.pages) else None
+            yield iter(page)
+
+class MockItemPaged:
+    def __init__(self, *pages):
+        self.pages = list(pages)
+
+    def by_page(self, continuation_token=None):
+        start = int(continuation_token) if continuation_token else 0
+        return MockPageIterator(self.pages[start:], continuation_token)
 
 class MockDirectoryList:
     def __init__(self):
@@ -26,11 +63,15 @@ class MockDirectoryList:
         is_directory = [False, True, False]
 
         self.directory = []
-        for file in zip(owner, last_modified, permissions_list, path, is_directory):
+        for file in zip(permissions_list, path, last_modified, owner, is_directory):
             self.directory.append(MockDirectory(*file))
     
-    def get_paths(self, path):
-        return self.directory
+    def get_paths(self, path, **kwargs):
+        return MockItemPaged(self.directory)
+
+def mock_path_records(df_dict):
+    return [PathRecord(None, df_dict['path'][index], None, None, df_dict['is_directory'][index], 10, None)
+            for index in df_dict['path']]
 
 class ConnectionAzureDataLakeTest(UnitBaseTest):       
     def setUp(self) -> None:
@@ -60,8 +101,61 @@ class ConnectionAzureDataLakeTest(UnitBaseTest):
 
         mock_ClientSecretCredential.assert_called_with(teanat_id, client_id, client_secret)
 
-        mock_DataLakeServiceClient.assert_called_with(account_url=f"https://{storage_account_name}.dfs.core.windows.net", credential=(teanat_id, client_id, client_secret))
+        mock_DataLakeServiceClient.assert_called_with(account_url=f"https://{storage_account_name}.dfs.core.windows.net", credential=(teanat_id, client_id, client_secret),
+                                                      transport=ANY)
+
+        transport = mock_DataLakeServiceClient.call_args.kwargs['transport']
+        self.assertIsInstance(transport, ThrottledTransport)
+        self.assertIs(transport.concurrency_limiter, self.datalake_connection.concurrency_limiter)
+        self.assertIsNone(transport.rate_limiter)
+        self.assertEqual((transport.transport.connection_config.timeout, transport.transport.connection_config.read_timeout,
+                          transport.transport.connection_config.data_block_size),
+                         (CONNECTION_TIMEOUT, READ_TIMEOUT, DATA_BLOCK_SIZE))
+
+
+    @patch('connectionazure.datalake.DataLakeServiceClient')
+    @patch('connectionazure.datalake.RequestsTransport')
+    @patch('connectionazure.datalake.ClientSecretCredential', side_effect = lambda *args: args)
+    @patch('connectionazure.datalake.os')
+    def test_initialize_storage_account_ad_env_variable_connection_pool_size(self, mock_os, mock_ClientSecretCredential,
+                                                                              mock_RequestsTransport, mock_DataLakeServiceClient):
+        mock_os.environ = {
+            "client_id": '1234ID',
+            "client_secret": 'storage_account_secret',
+            "tenant_id": 'tenant_231',
+            "storage_account_name": 'datalake'
+        }
+
+        self.datalake_connection.initialize_storage_account_ad_env_variable(connection_pool_size=64)
+
+        session = mock_RequestsTransport.call_args.kwargs['session']
+        adapter = session.get_adapter('https://datalake.dfs.core.windows.net')
+        self.assertEqual(adapter._pool_maxsize, 64)
+        mock_DataLakeServiceClient.assert_called_with(account_url="https://datalake.dfs.core.windows.net",
+                                                      credential=('tenant_231', '1234ID', 'storage_account_secret'),
+                                                      transport=ANY)
+        mock_RequestsTransport.assert_called_once_with(session=session, session_owner=False,
+                                                       connection_timeout=CONNECTION_TIMEOUT, read_timeout=READ_TIMEOUT,
+                                                       connection_data_block_size=DATA_BLOCK_SIZE)
 
+    def test_get_directory_client_cached(self):
+        container = 'test_container'
+
+        first = self.datalake_connection.get_directory_client(container, 'folder')
+        second = self.datalake_connection.get_directory_client(container, 'folder')
+        self.datalake_connection.get_directory_client(container, 'other_folder')
+
+        self.assertIs(first, second)
+        self.assertEqual(self.datalake_connection.service_client.get_file_system_client.call_count, 1)
+        self.assertEqual(self.datalake_connection.service_client.get_file_system_client().get_directory_client.call_count, 2)
+
+    def test_service_client_change_clears_client_cache(self):
+        self.datalake_connection.get_file_system_client('test_container')
+
+        self.datalake_connection.service_client = Mock()
+        self.datalake_connection.get_file_system_client('test_container')
+
+        self.datalake_connection.service_client.get_file_system_client.assert_called_once_with(file_system='test_container')
 
     def test_list_directory_contents(self):
         container = 'test_container'
@@ -73,7 +167,52 @@ class ConnectionAzureDataLakeTest(UnitBaseTest):
         self.assertTrue(len(directory)>=0)
         self.assertEqual(list(directory.columns), expected_columns)
         self.assertEqual(type(directory), DataFrame)
-    
+        self.assertEqual(directory.path.to_list(), ['202105180007', '202105180007/teste', '202105180008'])
+        self.assertTrue(pd.api.types.is_datetime64_any_dtype(directory.last_modified))
+        self.assertTrue(pd.api.types.is_bool_dtype(directory.is_directory))
+
+    def test_list_directory_contents_empty(self):
+        self.datalake_connection.service_client.get_file_system_client().get_paths.return_value = MockItemPaged([])
+
+        directory = self.datalake_connection.list_directory_contents(container='test_container')
+
+        self.assertEqual(len(directory), 0)
+        self.assertEqual(list(directory.columns), ['permissions', 'path', 'last_modified', 'owner', 'is_directory'])
+
+    def test_iterate_directory_pages(self):
+        file_system_client = self.datalake_connection.service_client.get_file_system_client()
+        file_system_client.get_paths.return_value = MockItemPaged([MockDirectory('rwxrwxrwx', 'folder/a', '2022-03-04', 'john', True)],
+                                                                  [MockDirectory('rwxrwxrwx', 'folder/b', '2022-03-04', 'john', True)])
+
+        pages = list(self.datalake_connection.iterate_directory_pages('test_container', 'folder', recursive=False, max_results=1))
+
+        file_system_client.get_paths.assert_called_with(path='folder', recursive=False, max_results=1)
+        self.assertEqual([[record.path for record in records] for records, _ in pages], [['folder/a'], ['folder/b']])
+        self.assertEqual([continuation_token for _, continuation_token in pages], ['1', None])
+
+    def test_iterate_directory_contents_resume(self):
+        file_system_client = self.datalake_connection.service_client.get_file_system_client()
+        file_system_client.get_paths.return_value = MockItemPaged([MockDirectory('rwxrwxrwx', 'folder/a', '2022-03-04', 'john', True)],
+                                                                  [MockDirectory('rwxrwxrwx', 'folder/b', '2022-03-04', 'john', True)])
+
+        records = list(self.datalake_connection.iterate_directory_contents('test_container', 'folder', continuation_token='1'))
+
+        self.assertEqual([record.path for record in records], ['folder/b'])
+
+    def test_iterate_directory_contents(self):
+        container = 'test_container'
+        file_system_client = self.datalake_connection.service_client.get_file_system_client()
+        file_system_client.get_paths.return_value = MockItemPaged([MockDirectory('rwxrwxrwx', 'folder/inner', '2022-03-04', 'john', True),
+                                                                   MockDirectory('rw-r-----', 'folder/inner/file.txt', '2022-03-04',
+                                                                                 'jack', False, 10, '0x1')])
+
+        records = list(self.datalake_connection.iterate_directory_contents(container=container, path='folder'))
+
+        self.datalake_connection.service_client.get_file_system_client.assert_called_with(file_system=container)
+        file_system_client.get_paths.assert_called_with(path='folder', recursive=True, max_results=None)
+        self.assertEqual(records, [PathRecord('rwxrwxrwx', 'folder/inner', '2022-03-04', 'john', True, 0, '0x0'),
+                                   PathRecord('rw-r-----', 'folder/inner/file.txt', '2022-03-04', 'jack', False, 10, '0x1')])
+
     def test_list_containers(self):
         self.datalake_connection.service_client.list_file_systems.return_value = [MockContainer('test_container', '2022-03-04')]
         
@@ -84,6 +223,23 @@ class ConnectionAzureDataLakeTest(UnitBaseTest):
         self.assertEqual(list(df.columns), ['container', 'last_modified'])
         
         
+    def test_list_containers_as_table(self):
+        self.datalake_connection.service_client.list_file_systems.return_value = [MockContainer('test_container', '2022-03-04')]
+
+        table = self.datalake_connection.list_containers(as_table=True)
+
+        self.assertEqual(table.column_names, ['container', 'last_modified'])
+        self.assertEqual(table.column('container').to_pylist(), ['test_container'])
+
+    def test_list_directory_contents_as_table(self):
+        self.datalake_connection.service_client.get_file_system_client.return_value = MockDirectoryList()
+
+        table = self.datalake_connection.list_directory_contents('test_container', as_table=True)
+
+        self.assertEqual(table.schema, PATH_SCHEMA)
+        self.assertEqual(table.column('is_directory').to_pylist(), [False, True, False])
+        self.assertEqual(table.column('owner').type, pa.dictionary(pa.int32(), pa.string()))
+
     def test_create_and_delete_container(self):
         container_name = 'teste-container'
 
@@ -142,61 +298,73 @@ class ConnectionAzureDataLakeTest(UnitBaseTest):
 
         self.assertTrue(resp)
 
-    @patch('connectionazure.datalake.len')
-    def test_check_if_path_exists_false(self, mock_len):
+    def test_get_path_properties(self):
         container = 'test_container'
-        path = '/'
+        path = 'folder'
         file_name = 'file.txt'
+        expected = Mock()
 
-        mock_len.return_value = 3
-        paths_df = Mock()
-        paths_df.path.values = ['/folder', '/folder/file_not.txt']
-
-        self.datalake_connection.list_directory_contents = Mock()
-        self.datalake_connection.list_directory_contents.return_value = paths_df
+        (self.datalake_connection
+            .service_client.get_file_system_client()
+            .get_directory_client()
+            .get_file_client()
+            .get_file_properties.return_value) = expected
 
-        resp = self.datalake_connection.check_if_path_exists(container, path, file_name)
+        resp = self.datalake_connection.get_path_properties(container, path, file_name)
 
-        self.assertFalse(resp)
-        self.datalake_connection.list_directory_contents.assert_called_with(container=container, path=path)
+        self.assertEqual(resp, expected)
+        self.datalake_connection.service_client.get_file_system_client.assert_called_with(file_system=container)
+        (self.datalake_connection
+            .service_client.get_file_system_client()
+            .get_directory_client.assert_called_with(path))
+        (self.datalake_connection
+            .service_client.get_file_system_client()
+            .get_directory_client()
+            .get_file_client.assert_called_with(file_name))
 
-    @patch('connectionazure.datalake.len')
-    def test_check_if_path_exists_true(self, mock_len):
+    def test_get_path_properties_not_found(self):
         container = 'test_container'
-        path = '/'
+        path = 'folder'
         file_name = 'file.txt'
 
+        (self.datalake_connection
+            .service_client.get_file_system_client()
+            .get_directory_client()
+            .get_file_client()
+            .get_file_properties.side_effect) = ResourceNotFoundError('not found')
+
+        resp = self.datalake_connection.get_path_properties(container, path, file_name)
 
-        mock_len.return_value = 3
-        paths_df = Mock()
-        paths_df.path.values = ['/folder', '/folder/file_not.txt', '/file.txt']
+        self.assertIsNone(resp)
 
+    def test_check_if_path_exists_false(self):
+        container = 'test_container'
+        path = '/'
+        file_name = 'file.txt'
+
+        self.datalake_connection.get_path_properties = Mock()
+        self.datalake_connection.get_path_properties.return_value = None
         self.datalake_connection.list_directory_contents = Mock()
-        self.datalake_connection.list_directory_contents.return_value = paths_df
 
         resp = self.datalake_connection.check_if_path_exists(container, path, file_name)
 
-        self.assertTrue(resp)
-        self.datalake_connection.list_directory_contents.assert_called_with(container=container, path=path)
+        self.assertFalse(resp)
+        self.datalake_connection.get_path_properties.assert_called_with(container, path, file_name)
+        self.datalake_connection.list_directory_contents.assert_not_called()
 
-    @patch('connectionazure.datalake.len')
-    def test_check_if_path_exists_empty(self, mock_len):
+    def test_check_if_path_exists_true(self):
         container = 'test_container'
         path = '/'
         file_name = 'file.txt'
 
-
-        mock_len.return_value = 0
-        paths_df = Mock()
-        paths_df.path.values = []
-
+        self.datalake_connection.get_path_properties = Mock()
         self.datalake_connection.list_directory_contents = Mock()
-        self.datalake_connection.list_directory_contents.return_value = paths_df
 
         resp = self.datalake_connection.check_if_path_exists(container, path, file_name)
 
-        self.assertFalse(resp)
-        self.datalake_connection.list_directory_contents.assert_called_with(container=container, path=path)
+        self.assertTrue(resp)
+        self.datalake_connection.get_path_properties.assert_called_with(container, path, file_name)
+        self.datalake_connection.list_directory_contents.assert_not_called()
 
     def test_upload_file_to_directory_raise_exception(self):
         container = 'test_container'
@@ -306,6 +474,71 @@ class ConnectionAzureDataLakeTest(UnitBaseTest):
             .create_file()
             .upload_data.assert_called_with(file_content, overwrite=True))
 
+    def test_upload_file_to_directory_chunked(self):
+        container = 'test_container'
+        file_name = 'teste-file.txt'
+        path ='/folder'
+        file_content = b'Hello from test upload file to directory'
+        chunk_size = 16
+
+        self.datalake_connection.check_if_path_exists = Mock()
+        self.datalake_connection.check_if_path_exists.return_value = False
+        file_client = self.datalake_connection.service_client.get_file_system_client().get_directory_client().create_file()
+
+        resp = self.datalake_connection.upload_file_to_directory_chunked(container=container,
+                                                                         path=path,
+                                                                         file_name=file_name,
+                                                                         data=BytesIO(file_content),
+                                                                         chunk_size=chunk_size,
+                                                                         max_concurrency=2)
+
+        self.assertEqual(resp, len(file_content))
+        self.datalake_connection.check_if_path_exists.assert_called_with(container, path, file_name)
+        self.assertEqual(file_client.append_data.call_count, 3)
+        file_client.append_data.assert_any_call(data=file_content[:16], offset=0, length=16)
+        file_client.append_data.assert_any_call(data=file_content[16:32], offset=16, length=16)
+        file_client.append_data.assert_any_call(data=file_content[32:], offset=32, length=len(file_content) - 32)
+        file_client.flush_data.assert_called_once_with(len(file_content))
+
+    def test_upload_file_to_directory_chunked_retry(self):
+        container = 'test_container'
+        file_name = 'teste-file.txt'
+        path ='/folder'
+        file_content = b'Hello'
+
+        file_client = self.datalake_connection.service_client.get_file_system_client().get_directory_client().create_file()
+        file_client.append_data.side_effect = [ServiceResponseError('timeout'), None]
+
+        resp = self.datalake_connection.upload_file_to_directory_chunked(container=container,
+                                                                         path=path,
+                                                                         file_name=file_name,
+                                                                         data=file_content,
+                                                                         overwrite=True,
+                                                                         max_retries=1)
+
+        self.assertEqual(resp, len(file_content))
+        self.assertEqual(file_client.append_data.call_count, 2)
+        file_client.flush_data.assert_called_once_with(len(file_content))
+
+    def test_upload_file_to_directory_chunked_retry_exhausted(self):
+        container = 'test_container'
+        file_name = 'teste-file.txt'
+        path ='/folder'
+
+        file_client = self.datalake_connection.service_client.get_file_system_client().get_directory_client().create_file()
+        file_client.append_data.side_effect = ServiceResponseError('timeout')
+
+        with self.assertRaises(AzureError):
+            self.datalake_connection.upload_file_to_directory_chunked(container=container,
+                                                                      path=path,
+                                                                      file_name=file_name,
+                                                                      data=b'Hello',
+                                                                      overwrite=True,
+                                                                      max_retries=2)
+
+        self.assertEqual(file_client.append_data.call_count, 3)
+        file_client.flush_data.assert_not_called()
+
     def test_download_file_as_binary(self):
         container = 'container_test'
         path = 'folder'
@@ -354,6 +587,83 @@ class ConnectionAzureDataLakeTest(UnitBaseTest):
             .get_file_client()
             .download_file().readall.assert_called())
 
+    def mock_ranged_file_client(self, content):
+        file_client = (self.datalake_connection
+                        .service_client.get_file_system_client()
+                        .get_directory_client()
+                        .get_file_client())
+        file_client.get_file_properties.return_value.size = len(content)
+        file_client.get_file_properties.return_value.etag = '"0x1"'
+
+        def download_file(offset, length, **kwargs):
+            download = Mock()
+            download.readall.return_value = content[offset:offset + length]
+            return download
+
+        file_client.download_file.side_effect = download_file
+
+        return file_client
+
+    def test_iterate_file_chunks(self):
+        container = 'container_test'
+        path = 'folder'
+        file_name = 'text.txt'
+        content = b'the data is correct on this file'
+        file_client = self.mock_ranged_file_client(content)
+
+        chunks = list(self.datalake_connection.iterate_file_chunks(container, path, file_name, chunk_size=10, max_concurrency=2))
+
+        self.assertEqual(chunks, [content[:10], content[10:20], content[20:30], content[30:]])
+        file_client.download_file.assert_any_call(offset=0, length=10, etag='"0x1"',
+                                                  match_condition=MatchConditions.IfNotModified)
+        file_client.download_file.assert_any_call(offset=30, length=len(content) - 30, etag='"0x1"',
+                                                  match_condition=MatchConditions.IfNotModified)
+        self.assertEqual(file_client.download_file.call_count, 4)
+
+    def test_iterate_file_chunks_overwritten(self):
+        connection = ConnectionAzureDataLake()
+        connection.service_client = FakeDataLakeServiceClient()
+        store = connection.service_client.store
+        connection.create_container('container')
+        store.create('container', 'folder/text.txt', False, b'first version')
+
+        chunks = connection.iterate_file_chunks('container', 'folder', 'text.txt', chunk_size=5, max_concurrency=1)
+        first = next(chunks)
+        store.create('container', 'folder/text.txt', False, b'second version')
+
+        self.assertEqual(first, b'first')
+        with self.assertRaises(ResourceModifiedError):
+            list(chunks)
+
+    def test_iterate_file_chunks_empty_file(self):
+        file_client = self.mock_ranged_file_client(b'')
+
+        chunks = list(self.datalake_connection.iterate_file_chunks('container_test', 'folder', 'text.txt'))
+
+        self.assertEqual(chunks, [])
+        file_client.download_file.assert_not_called()
+
+    def test_iterate_file_chunks_retry(self):
+        content = b'the data is correct on this file'
+        file_client = self.mock_ranged_file_client(content)
+        download = Mock()
+        download.readall.return_value = content
+        file_client.download_file.side_effect = [ServiceResponseError('timeout'), download]
+
+        chunks = list(self.datalake_connection.iterate_file_chunks('container_test', 'folder', 'text.txt', max_retries=1))
+
+        self.assertEqual(chunks, [content])
+        self.assertEqual(file_client.download_file.call_count, 2)
+
+    def test_download_file_as_binary_ranged(self):
+        content = b'the data is correct on this file'
+        file_client = self.mock_ranged_file_client(content)
+
+        download = self.datalake_connection.download_file_as_binary('container_test', 'folder', 'text.txt', chunk_size=7)
+
+        self.assertEqual(download, content)
+        self.assertEqual(file_client.download_file.call_count, 5)
+
     def test_download_file_as_string(self):
         container = 'container_test'
         path = 'folder'
@@ -367,19 +677,77 @@ class ConnectionAzureDataLakeTest(UnitBaseTest):
         download = self.datalake_connection.download_file_as_string(container, path, file_name)
 
         self.assertEqual(download, expected)
-        self.datalake_connection.download_file_as_binary.assert_called_with(container, path, file_name)
+        self.datalake_connection.download_file_as_binary.assert_called_with(container, path, file_name, chunk_size=None,
+                                                                            max_concurrency=DEFAULT_MAX_CONCURRENCY)
+
+    @patch('connectionazure.datalake.write_chunks_to_file')
+    def test_download_to_file(self, mock_write_chunks_to_file):
+        container = 'container_test'
+        source_path = 'folder/inner_folder/text.txt'
+        path_sink = 'tmp/text.txt'
+
+        self.datalake_connection.iterate_file_chunks = Mock()
+
+        resp = self.datalake_connection.download_to_file(container, source_path, path_sink, chunk_size=10, max_concurrency=2)
+
+        self.assertTrue(resp)
+        self.datalake_connection.iterate_file_chunks.assert_called_with(container, 'folder/inner_folder', 'text.txt',
+                                                                        chunk_size=10, max_concurrency=2)
+        mock_write_chunks_to_file.assert_called_with(path_sink, self.datalake_connection.iterate_file_chunks())
+
+    def test_download_to_file_known_size(self):
+        connection = ConnectionAzureDataLake()
+        connection.service_client = FakeDataLakeServiceClient()
+        network = connection.service_client.network
+        connection.create_container('container')
+        connection.service_client.store.create('container', 'folder/small.txt', False, b'small')
+        connection.service_client.store.create('container', 'folder/large.txt', False, b'large content')
+
+        with TemporaryDirectory() as folder:
+            requests = network.requests
+            connection.download_to_file('container', 'folder/small.txt', folder + '/small.txt', chunk_size=5, size=5)
+            small_requests = network.requests - requests
+
+            requests = network.requests
+            connection.download_to_file('container', 'folder/large.txt', folder + '/large.txt', chunk_size=5, size=13)
+            large_requests = network.requests - requests
+
+            with open(folder + '/small.txt', 'rb') as small, open(folder + '/large.txt', 'rb') as large:
+                self.assertEqual((small.read(), large.read()), (b'small', b'large content'))
+            self.assertEqual(sorted(os.listdir(folder)), ['large.txt', 'small.txt'])
+
+        self.assertEqual(small_requests, 1)
+        self.assertEqual(large_requests, 4)
+
+    def test_download_to_file_known_size_retry(self):
+        def interrupted(f):
+            f.write(b'sma')
+            raise ServiceResponseError('connection reset')
+
+        file_client = Mock()
+        file_client.download_file.side_effect = [Mock(readinto=interrupted), Mock(readinto=lambda f: f.write(b'small'))]
+        self.datalake_connection.get_directory_client = Mock()
+        self.datalake_connection.get_directory_client.return_value.get_file_client.return_value = file_client
+
+        with TemporaryDirectory() as folder:
+            self.datalake_connection.download_to_file('container', 'folder/small.txt', folder + '/small.txt', size=5)
+
+            with open(folder + '/small.txt', 'rb') as file_handle:
+                self.assertEqual(file_handle.read(), b'small')
+
+        self.assertEqual(file_client.download_file.call_count, 2)
 
     @patch('builtins.print')
-    @patch('connectionazure.datalake.read_file_as_bytes')
+    @patch('builtins.open', new_callable=mock_open)
     @patch('connectionazure.datalake.os')
-    def test_upload_directory_recursive(self, mock_os, mock_read_file_as_bytes, mock_print):
+    def test_upload_directory_recursive(self, mock_os, mock_open_file, mock_print):
         upload_file_mock = Mock()
-        self.datalake_connection.upload_file_to_directory_bulk = upload_file_mock
+        self.datalake_connection.upload_file_to_directory_chunked = upload_file_mock
         source_directory = 'root_folder'
         container = 'upload_container'
         sink_path = 'container_folder'
 
-        expected_read_calls = ['root_folder/file.txt', 'root_folder/folder/inner_file.txt']
+        expected_open_calls = ['root_folder/file.txt', 'root_folder/folder/inner_file.txt']
         
         def mock_listdir(folder):
             if folder=='root_folder':
@@ -400,15 +768,72 @@ class ConnectionAzureDataLakeTest(UnitBaseTest):
 
         self.datalake_connection.upload_directory_recursive(source_directory, container, sink_path)
 
-        mock_read_file_as_bytes.assert_any_call(expected_read_calls[0])
-        mock_read_file_as_bytes.assert_any_call(expected_read_calls[1])
+        mock_open_file.assert_any_call(expected_open_calls[0], 'rb')
+        mock_open_file.assert_any_call(expected_open_calls[1], 'rb')
+        mock_open_file().read.assert_not_called()
 
-        upload_file_mock.assert_any_call(container=container, path=sink_path, file_name='file.txt', data=mock_read_file_as_bytes(), overwrite=True)
-        upload_file_mock.assert_any_call(container=container, path=sink_path+'/folder', file_name='inner_file.txt', data=mock_read_file_as_bytes(), overwrite=True)
+        upload_file_mock.assert_any_call(container=container, path=sink_path, file_name='file.txt', data=mock_open_file(), overwrite=True,
+                                         chunk_size=DEFAULT_CHUNK_SIZE, max_concurrency=DEFAULT_MAX_CONCURRENCY)
+        upload_file_mock.assert_any_call(container=container, path=sink_path+'/folder', file_name='inner_file.txt', data=mock_open_file(), overwrite=True,
+                                         chunk_size=DEFAULT_CHUNK_SIZE, max_concurrency=DEFAULT_MAX_CONCURRENCY)
 
         mock_print.assert_any_call('root_folder/file.txt copied')
         mock_print.assert_any_call('root_folder/folder/inner_file.txt copied')
 
+    def test_upload_directory(self):
+        container = 'upload_container'
+        sink_path = 'container_folder'
+        upload_file_mock = Mock(side_effect=lambda **kwargs: len(kwargs['data'].read()))
+        self.datalake_connection.upload_file_to_directory_chunked = upload_file_mock
+        self.datalake_connection.create_directory = Mock()
+
+        with TemporaryDirectory() as source_directory:
+            os.makedirs(source_directory + '/folder/empty_folder')
+            with open(source_directory + '/file.txt', 'wb') as f:
+                f.write(b'hello')
+            with open(source_directory + '/folder/inner_file.txt', 'wb') as f:
+                f.write(b'hello world')
+
+            result = self.datalake_connection.upload_directory(source_directory, container, sink_path, max_workers=2)
+
+            self.assertEqual(sorted(result.succeeded), [os.path.join(source_directory, 'file.txt'),
+                                                        os.path.join(source_directory, 'folder', 'inner_file.txt')])
+
+        self.assertTrue(result.ok)
+        self.assertEqual(result.bytes_transferred, 16)
+        self.assertEqual(self.datalake_connection.create_directory.call_count, 3)
+        self.datalake_connection.create_directory.assert_any_call(container, sink_path)
+        self.datalake_connection.create_directory.assert_any_call(container, sink_path + '/folder')
+        self.datalake_connection.create_directory.assert_any_call(container, sink_path + '/folder/empty_folder')
+        self.assertEqual(upload_file_mock.call_count, 2)
+        upload_file_mock.assert_any_call(container=container, path=sink_path + '/folder', file_name='inner_file.txt',
+                                         data=ANY, overwrite=True, chunk_size=DEFAULT_CHUNK_SIZE, max_concurrency=1)
+
+    def test_upload_directory_failure(self):
+        error = ServiceResponseError('server busy')
+
+        def upload_file(**kwargs):
+            if kwargs['file_name'] == 'fail.txt':
+                raise error
+            return len(kwargs['data'].read())
+
+        self.datalake_connection.upload_file_to_directory_chunked = Mock(side_effect=upload_file)
+        self.datalake_connection.create_directory = Mock()
+
+        with TemporaryDirectory() as source_directory:
+            for file_name in ['fail.txt', 'file.txt']:
+                with open(source_directory + '/' + file_name, 'wb') as f:
+                    f.write(b'hello')
+
+            result = self.datalake_connection.upload_directory(source_directory, 'upload_container', '/')
+
+            self.assertEqual(result.succeeded, [os.path.join(source_directory, 'file.txt')])
+            self.assertEqual(result.failed, {os.path.join(source_directory, 'fail.txt'): error})
+
+        self.assertFalse(result.ok)
+        self.assertEqual(result.bytes_transferred, 5)
+        self.datalake_connection.create_directory.assert_not_called()
+
     def test_download_directory(self):
         container = 'dev'
         source_path = 'backup'
@@ -416,9 +841,9 @@ class ConnectionAzureDataLakeTest(UnitBaseTest):
 
 
         mock_download_to_file = Mock()
-        mock_list_direcotory_content = Mock()
+        mock_iterate_directory_contents = Mock()
         self.datalake_connection.download_to_file = mock_download_to_file
-        self.datalake_connection.list_directory_contents = mock_list_direcotory_content
+        self.datalake_connection.iterate_directory_contents = mock_iterate_directory_contents
 
         df_dict = {'path': {0: 'backup/democopy',
                     1: 'backup/democopy/file1.txt',
@@ -426,18 +851,19 @@ class ConnectionAzureDataLakeTest(UnitBaseTest):
                     3: 'backup/democopy/file3.txt'},
                     'is_directory': {0: True, 1: False, 2: False, 3: False}}
 
-        df = pd.DataFrame(df_dict)
-
-        mock_list_direcotory_content.return_value = df
+        mock_iterate_directory_contents.return_value = iter(mock_path_records(df_dict))
 
         expected_local_path_download = ['tmp/democopy/file1.txt', 'tmp/democopy/file2.txt', 'tmp/democopy/file3.txt']
 
-        self.datalake_connection.download_directory(source_container=container, source_path=source_path, sink_path=sink_path)
+        result = self.datalake_connection.download_directory(source_container=container, source_path=source_path, sink_path=sink_path)
 
-        mock_download_to_file.assert_any_call(container, df_dict['path'][1], expected_local_path_download[0])
-        mock_download_to_file.assert_any_call(container, df_dict['path'][2], expected_local_path_download[1])
-        mock_download_to_file.assert_any_call(container, df_dict['path'][3], expected_local_path_download[2])
+        mock_download_to_file.assert_any_call(container, df_dict['path'][1], expected_local_path_download[0], chunk_size=DEFAULT_CHUNK_SIZE, max_concurrency=1, size=10)
+        mock_download_to_file.assert_any_call(container, df_dict['path'][2], expected_local_path_download[1], chunk_size=DEFAULT_CHUNK_SIZE, max_concurrency=1, size=10)
+        mock_download_to_file.assert_any_call(container, df_dict['path'][3], expected_local_path_download[2], chunk_size=DEFAULT_CHUNK_SIZE, max_concurrency=1, size=10)
         self.assertEqual(mock_download_to_file.call_count, 3)
+        mock_iterate_directory_contents.assert_called_with(container, source_path)
+        self.assertTrue(result.ok)
+        self.assertEqual(result.bytes_transferred, 30)
 
     def test_download_directory_root(self):
         container = 'dev'
@@ -446,9 +872,9 @@ class ConnectionAzureDataLakeTest(UnitBaseTest):
 
 
         mock_download_to_file = Mock()
-        mock_list_direcotory_content = Mock()
+        mock_iterate_directory_contents = Mock()
         self.datalake_connection.download_to_file = mock_download_to_file
-        self.datalake_connection.list_directory_contents = mock_list_direcotory_content
+        self.datalake_connection.iterate_directory_contents = mock_iterate_directory_contents
 
         df_dict = {'path': {0: 'backup',
                             1: 'backup/democopy',
@@ -483,22 +909,53 @@ class ConnectionAzureDataLakeTest(UnitBaseTest):
                                     14: True,
                                     15: True}}
 
-        df = pd.DataFrame(df_dict)
-
-        mock_list_direcotory_content.return_value = df
+        mock_iterate_directory_contents.return_value = iter(mock_path_records(df_dict))
 
         expected_local_path_download = ['tmp/hz_zone/housing_data/HousingDataHZ.csv',
                                         'tmp/hz_zone/sales/_committed_6039367007359554159',
                                         'tmp/backup/democopy/file3.txt']
 
-        self.datalake_connection.download_directory(source_container=container, source_path=source_path, sink_path=sink_path)
+        result = self.datalake_connection.download_directory(source_container=container, source_path=source_path, sink_path=sink_path)
 
-        mock_download_to_file.assert_any_call(container, df_dict['path'][8], expected_local_path_download[0])
-        mock_download_to_file.assert_any_call(container, df_dict['path'][11], expected_local_path_download[1])
-        mock_download_to_file.assert_any_call(container, df_dict['path'][4], expected_local_path_download[2])
+        mock_download_to_file.assert_any_call(container, df_dict['path'][8], expected_local_path_download[0], chunk_size=DEFAULT_CHUNK_SIZE, max_concurrency=1, size=10)
+        mock_download_to_file.assert_any_call(container, df_dict['path'][11], expected_local_path_download[1], chunk_size=DEFAULT_CHUNK_SIZE, max_concurrency=1, size=10)
+        mock_download_to_file.assert_any_call(container, df_dict['path'][4], expected_local_path_download[2], chunk_size=DEFAULT_CHUNK_SIZE, max_concurrency=1, size=10)
         self.assertEqual(mock_download_to_file.call_count, 8)
+        self.assertEqual(len(result.succeeded), 8)
 
 
+    def test_download_directory_failure_and_retry(self):
+        container = 'dev'
+        df_dict = {'path': {0: 'backup/file1.txt', 1: 'backup/file2.txt'},
+                   'is_directory': {0: False, 1: False}}
+        error = ServiceResponseError('server busy')
+        calls = []
+
+        def download_to_file(container, remote_path, local_path, **kwargs):
+            calls.append(remote_path)
+            if remote_path == 'backup/file2.txt':
+                raise error
+            if calls.count(remote_path) == 1:
+                raise ServiceResponseError('timeout')
+            return True
+
+        progress = Mock()
+        self.datalake_connection.download_to_file = Mock(side_effect=download_to_file)
+        self.datalake_connection.iterate_directory_contents = Mock(return_value=iter(mock_path_records(df_dict)))
+
+        result = self.datalake_connection.download_directory(source_container=container, source_path='backup', sink_path='/tmp/',
+                                                             max_workers=2, max_retries=2, progress_callback=progress)
+
+        self.assertEqual(result.succeeded, ['backup/file1.txt'])
+        self.assertEqual(result.failed, {'backup/file2.txt': error})
+        self.assertEqual(result.bytes_transferred, 10)
+        self.assertEqual(calls.count('backup/file1.txt'), 2)
+        self.assertEqual(calls.count('backup/file2.txt'), 3)
+        self.datalake_connection.download_to_file.assert_any_call(container, 'backup/file1.txt', '/tmp/file1.txt',
+                                                                  chunk_size=DEFAULT_CHUNK_SIZE, max_concurrency=1, size=10)
+        self.assertEqual(progress.call_count, 2)
+        progress.assert_called_with(result)
+
     def test_upload_dataframe_as_parquet(self):
         container = 'upload_container'
         sink_path = 'container_folder'
@@ -553,6 +1010,28 @@ class ConnectionAzureDataLakeTest(UnitBaseTest):
         mock_upload_file_to_directory_bulk.assert_called_with(container=container, path=sink_path, file_name=file_name, data=df.to_parquet(**to_parquet_options_dict))
         self.assertTrue(resp)
 
+    def test_upload_dataframe_as_parquet_row_groups(self):
+        container = 'upload_container'
+        sink_path = 'container_folder'
+        file_name = 'df_test.parquet'
+        df = pd.DataFrame({'id': list(range(10)), 'value': [float(value) for value in range(10)]})
+        file_client = MockFileClient()
+
+        self.datalake_connection.check_if_path_exists = Mock(return_value=False)
+        self.datalake_connection.service_client.get_file_system_client().get_directory_client().create_file.return_value = file_client
+
+        resp = self.datalake_connection.upload_dataframe_as_parquet(df, container, sink_path, file_name,
+                                                                    {'compression': 'gzip'}, row_group_size=3, chunk_size=64)
+
+        self.assertTrue(resp)
+        self.datalake_connection.check_if_path_exists.assert_called_with(container, sink_path, file_name)
+        self.assertGreater(len(file_client.chunks), 1)
+        self.assertEqual(file_client.flushed, len(file_client.content()))
+        parquet_file = pq.ParquetFile(BytesIO(file_client.content()))
+        self.assertEqual(parquet_file.metadata.num_row_groups, 4)
+        self.assertEqual(parquet_file.metadata.row_group(0).column(0).compression, 'GZIP')
+        self.assertTrue(df.equals(pd.read_parquet(BytesIO(file_client.content()))))
+
     def test_download_parquet_as_dataframe(self):
         container = 'upload_container'
         source_path = 'container_folder'
@@ -576,4 +1055,763 @@ class ConnectionAzureDataLakeTest(UnitBaseTest):
 
         df_returned = self.datalake_connection.download_parquet_as_dataframe(container, source_path, file_name)
 
-        self.assertTrue(df.equals(df_returned))
\ No newline at end of file
+        self.assertTrue(df.equals(df_returned))
+
+    @patch('connectionazure.datalake.read_parquet_projection')
+    def test_download_parquet_as_dataframe_projection(self, mock_read_parquet_projection):
+        container = 'upload_container'
+        source_path = 'container_folder'
+        file_name = 'df_test.parquet'
+        columns = ['id']
+        filters = [('id', '>', 2)]
+
+        self.datalake_connection.open_file_reader = Mock()
+        self.datalake_connection.download_file_as_binary = Mock()
+
+        df_returned = self.datalake_connection.download_parquet_as_dataframe(container, source_path, file_name,
+                                                                             columns=columns, filters=filters, max_concurrency=4)
+
+        self.datalake_connection.open_file_reader.assert_called_with(container, source_path, file_name, read_ahead=RANGE_READ_AHEAD)
+        mock_read_parquet_projection.assert_called_with(self.datalake_connection.open_file_reader(), columns=columns,
+                                                        filters=filters, max_concurrency=4, chunk_size=DEFAULT_CHUNK_SIZE)
+        self.assertEqual(df_returned, mock_read_parquet_projection().to_pandas())
+        self.datalake_connection.download_file_as_binary.assert_not_called()
+
+    def test_open_file_reader(self):
+        file_client = self.datalake_connection.service_client.get_file_system_client().get_directory_client().get_file_client()
+        file_client.get_file_properties.return_value.size = 100
+
+        file_client.get_file_properties.return_value.etag = '"0x1"'
+
+        reader = self.datalake_connection.open_file_reader('container_test', 'folder', 'text.txt', read_ahead=10)
+
+        self.assertEqual(reader.size, 100)
+        self.assertEqual(reader.etag, '"0x1"')
+        self.assertEqual(reader.read_ahead, 10)
+        self.assertIs(reader.file_client, file_client)
+
+
+    def test_get_arrow_filesystem(self):
+        filesystem = self.datalake_connection.get_arrow_filesystem(read_ahead=10, chunk_size=20, max_concurrency=3)
+
+        self.assertEqual(filesystem.type_name, 'py::azure-datalake')
+        self.assertIs(filesystem.handler.connection, self.datalake_connection)
+        self.assertEqual((filesystem.handler.read_ahead, filesystem.handler.chunk_size, filesystem.handler.max_concurrency),
+                         (10, 20, 3))
+
+    def mock_parquet_dataset(self, files):
+        records = [PathRecord(None, 'dataset', None, None, True, 0, None)]
+        for path, df in files.items():
+            records.append(PathRecord(None, 'dataset/' + path, None, None, False, 0, None))
+            files[path] = df.to_parquet() if isinstance(df, DataFrame) else df
+
+        def open_file_reader(container, directory, file_name, read_ahead):
+            content = files[directory[len('dataset/'):] + '/' + file_name]
+            return DataLakeFileReader(MockRangedFileClient(content), len(content), read_ahead, max_retries=0)
+
+        self.datalake_connection.iterate_directory_contents = Mock(return_value=iter(records))
+        self.datalake_connection.open_file_reader = Mock(side_effect=open_file_reader)
+
+    def test_read_parquet_dataset(self):
+        self.mock_parquet_dataset({
+            'day=1/part-0.parquet': pd.DataFrame({'id': [1, 2], 'value': [1.0, 2.0]}),
+            'day=1/part-1.parquet': pd.DataFrame({'id': [3], 'value': [3.0]}),
+            'day=2/part-0.parquet': pd.DataFrame({'id': [4, 5], 'value': [4.0, 5.0]}),
+            'day=2/_SUCCESS': b'',
+        })
+
+        df_returned = self.datalake_connection.read_parquet_dataset('container', 'dataset', max_workers=2)
+
+        self.assertEqual(df_returned.to_dict('list'), {'id': [1, 2, 3, 4, 5], 'value': [1.0, 2.0, 3.0, 4.0, 5.0],
+                                                       'day': ['1', '1', '1', '2', '2']})
+        self.datalake_connection.iterate_directory_contents.assert_called_once_with('container', 'dataset')
+
+    def test_read_parquet_dataset_prunes_partitions(self):
+        self.mock_parquet_dataset({
+            'day=1/part-0.parquet': pd.DataFrame({'id': [1, 2], 'value': [1.0, 2.0]}),
+            'day=2/part-0.parquet': pd.DataFrame({'id': [3, 4], 'value': [3.0, 4.0]}),
+            'day=3/part-0.parquet': pd.DataFrame({'id': [5, 6], 'value': [5.0, 6.0]}),
+        })
+
+        table = self.datalake_connection.read_parquet_dataset('container', 'dataset', columns=['id', 'day'],
+                                                              filters=[[('day', '>=', 3)], [('day', '=', 1), ('id', '>', 1)]],
+                                                              as_table=True)
+
+        self.assertEqual(table.column_names, ['id', 'day'])
+        self.assertEqual(table.to_pydict(), {'id': [2, 5, 6], 'day': ['1', '3', '3']})
+        self.assertEqual(self.datalake_connection.open_file_reader.call_count, 2)
+
+    def test_iterate_parquet_dataset(self):
+        self.mock_parquet_dataset({
+            'day=1/part-0.parquet': pd.DataFrame({'id': [1, 2]}),
+            'day=2/part-0.parquet': pd.DataFrame({'id': [3]}),
+        })
+
+        tables = list(self.datalake_connection.iterate_parquet_dataset('container', 'dataset', max_workers=1))
+
+        self.assertEqual([table.to_pydict() for table in tables], [{'id': [1, 2], 'day': ['1', '1']}, {'id': [3], 'day': ['2']}])
+
+    def test_upload_partitioned_dataframe(self):
+        df = pd.DataFrame({'day': ['1', '2', '1', '2', '1'], 'id': [0, 1, 2, 3, 4], 'value': [0.0, 1.0, 2.0, 3.0, 4.0]})
+        uploaded = dict()
+        self.datalake_connection.upload_file_to_directory_bulk = Mock(
+            side_effect=lambda container, path, file_name, data, overwrite: uploaded.update({path + '/' + file_name: data}))
+
+        for max_processes in (0, 1):
+            uploaded.clear()
+            with patch('connectionazure.datalake.rows_per_file', return_value=2) as mock_rows_per_file:
+                manifest = self.datalake_connection.upload_partitioned_dataframe(df, 'container', 'dataset/', ['day'],
+                                                                                 target_file_size=4096, max_workers=2,
+                                                                                 max_processes=max_processes)
+
+            self.assertEqual(list(mock_rows_per_file.call_args.args[0].columns), ['id', 'value'])
+            self.assertEqual(mock_rows_per_file.call_args.args[1:], (4096, {'index': False}))
+            self.assertEqual([(written.path, written.partitions, written.num_rows) for written in manifest],
+                             [('dataset/day=1/part-00000.parquet', {'day': '1'}, 1),
+                              ('dataset/day=1/part-00001.parquet', {'day': '1'}, 2),
+                              ('dataset/day=2/part-00002.parquet', {'day': '2'}, 2)])
+            self.assertEqual([written.size for written in manifest], [len(uploaded[written.path]) for written in manifest])
+            self.assertEqual(pd.read_parquet(BytesIO(uploaded['dataset/day=1/part-00001.parquet'])).to_dict('list'),
+                             {'id': [2, 4], 'value': [2.0, 4.0]})
+
+    def test_upload_partitioned_dataframe_overwrite(self):
+        connection = ConnectionAzureDataLake()
+        connection.service_client = FakeDataLakeServiceClient()
+        connection.create_container('container')
+        df = pd.DataFrame({'day': ['1', '2'], 'id': [0, 1]})
+        connection.upload_partitioned_dataframe(df, 'container', 'dataset', ['day'], max_processes=0)
+        requests = connection.service_client.network.requests
+
+        manifest = connection.upload_partitioned_dataframe(df.assign(id=[5, 6]), 'container', 'dataset', ['day'],
+                                                           max_processes=0, overwrite=True)
+
+        self.assertEqual(connection.service_client.network.requests - requests, 2 * len(manifest))
+        self.assertEqual(connection.read_parquet_dataset('container', 'dataset').id.to_list(), [5, 6])
+        with self.assertRaises(Exception):
+            connection.upload_partitioned_dataframe(df, 'container', 'dataset', ['day'], max_processes=0)
+
+    def test_upload_partitioned_dataframe_raise(self):
+        df = pd.DataFrame({'day': ['1', '2'], 'id': [0, 1]})
+        self.datalake_connection.upload_file_to_directory_bulk = Mock(side_effect=ServiceResponseError('error'))
+
+        with self.assertRaises(Exception) as context:
+            self.datalake_connection.upload_partitioned_dataframe(df, 'container', 'dataset', ['day'], max_processes=0,
+                                                                  max_retries=1)
+
+        self.assertIn('2 files failed to be written', context.exception.args[0])
+        self.assertIsInstance(context.exception.__cause__, AzureError)
+        self.assertEqual(self.datalake_connection.upload_file_to_directory_bulk.call_count, 4)
+
+    def write_local_files(self, folder, files):
+        for relative_path, (content, mtime) in files.items():
+            local_path = os.path.join(folder, *relative_path.split('/'))
+            os.makedirs(os.path.dirname(local_path), exist_ok=True)
+            with open(local_path, 'wb') as file_handle:
+                file_handle.write(content)
+            os.utime(local_path, (mtime, mtime))
+
+    def test_sync_directory_to_lake(self):
+        last_modified = datetime.fromtimestamp(1000, timezone.utc)
+        self.datalake_connection.iterate_directory_contents = Mock(side_effect=lambda container, path: iter([
+            PathRecord(None, 'sink/same.txt', last_modified, None, False, 4, None),
+            PathRecord(None, 'sink/sub', last_modified, None, True, 0, None),
+            PathRecord(None, 'sink/sub/changed.txt', last_modified, None, False, 4, None),
+            PathRecord(None, 'sink/extra.txt', last_modified, None, False, 1, None),
+        ]))
+        uploaded = dict()
+
+        def upload_file_to_directory_chunked(container, path, file_name, data, **kwargs):
+            uploaded[path + '/' + file_name] = data.read()
+            return len(uploaded[path + '/' + file_name])
+
+        self.datalake_connection.upload_file_to_directory_chunked = Mock(side_effect=upload_file_to_directory_chunked)
+        file_client = self.datalake_connection.service_client.get_file_system_client().get_directory_client().get_file_client()
+
+        with TemporaryDirectory() as folder:
+            self.write_local_files(folder, {'same.txt': (b'same', 500), 'sub/changed.txt': (b'new!', 2000),
+                                            'new.txt': (b'new', 500)})
+
+            dry_run = self.datalake_connection.sync_directory_to_lake(folder, 'container', 'sink', delete=True, dry_run=True)
+            self.datalake_connection.upload_file_to_directory_chunked.assert_not_called()
+
+            plan = self.datalake_connection.sync_directory_to_lake(folder, 'container', 'sink', delete=True, max_workers=2)
+
+        self.assertEqual((dry_run.transfer, dry_run.delete, dry_run.unchanged, dry_run.result),
+                         (['new.txt', 'sub/changed.txt'], ['extra.txt'], ['same.txt'], None))
+        self.assertEqual(uploaded, {'sink/new.txt': b'new', 'sink/sub/changed.txt': b'new!'})
+        self.assertTrue(plan.result.ok)
+        self.assertEqual(sorted(plan.result.succeeded), ['extra.txt', 'new.txt', 'sub/changed.txt'])
+        file_client.delete_file.assert_called_once_with()
+        self.assertEqual(plan.result.bytes_transferred, 7)
+        self.datalake_connection.iterate_directory_contents.assert_called_with('container', 'sink')
+
+    def test_sync_directory_to_lake_checksum(self):
+        last_modified = datetime.fromtimestamp(1000, timezone.utc)
+        self.datalake_connection.iterate_directory_contents = Mock(return_value=iter([
+            PathRecord(None, 'equal.txt', last_modified, None, False, 4, None),
+            PathRecord(None, 'different.txt', last_modified, None, False, 4, None),
+        ]))
+        remote_md5 = {'equal.txt': hashlib.md5(b'same').digest(), 'different.txt': hashlib.md5(b'diff').digest()}
+        self.datalake_connection.get_path_properties = Mock(
+            side_effect=lambda container, path, file_name: Mock(content_settings=Mock(content_md5=bytearray(remote_md5[file_name]))))
+        self.datalake_connection.upload_file_to_directory_chunked = Mock(return_value=4)
+
+        with TemporaryDirectory() as folder:
+            self.write_local_files(folder, {'equal.txt': (b'same', 2000), 'different.txt': (b'same', 500)})
+
+            plan = self.datalake_connection.sync_directory_to_lake(folder, 'container', '', compare='checksum')
+
+        self.assertEqual((plan.transfer, plan.unchanged), (['different.txt'], ['equal.txt']))
+        self.datalake_connection.upload_file_to_directory_chunked.assert_called_once_with(
+            container='container', path='/', file_name='different.txt', data=ANY, overwrite=True, chunk_size=DEFAULT_CHUNK_SIZE,
+            max_concurrency=1, compute_md5=True)
+
+    def test_sync_directory_to_lake_invalid_compare(self):
+        with self.assertRaises(Exception) as context:
+            self.datalake_connection.sync_directory_to_lake('folder', 'container', 'sink', compare='hash')
+
+        self.assertIn('compare must be one of', context.exception.args[0])
+
+    def test_sync_lake_to_directory(self):
+        last_modified = datetime.fromtimestamp(1000, timezone.utc)
+        self.datalake_connection.iterate_directory_contents = Mock(side_effect=lambda container, path: iter([
+            PathRecord(None, 'source/same.txt', last_modified, None, False, 4, None),
+            PathRecord(None, 'source/sub/changed.txt', last_modified, None, False, 4, None),
+        ]))
+
+        def download_to_file(container, source_path, path_sink, chunk_size, max_concurrency, size):
+            os.makedirs(os.path.dirname(path_sink), exist_ok=True)
+            with open(path_sink, 'wb') as file_handle:
+                file_handle.write(b'lake')
+
+        self.datalake_connection.download_to_file = Mock(side_effect=download_to_file)
+
+        with TemporaryDirectory() as folder:
+            self.write_local_files(folder, {'same.txt': (b'same', 1000), 'sub/changed.txt': (b'old!', 500),
+                                            'extra.txt': (b'extra', 500)})
+
+            plan = self.datalake_connection.sync_lake_to_directory('container', 'source', folder, delete=True)
+
+            self.assertEqual(sorted(os.listdir(folder)), ['same.txt', 'sub'])
+            self.assertEqual(os.stat(os.path.join(folder, 'sub', 'changed.txt')).st_mtime, 1000)
+            second_plan = self.datalake_connection.sync_lake_to_directory('container', 'source', folder, dry_run=True)
+
+        self.assertEqual((plan.transfer, plan.delete, plan.unchanged), (['sub/changed.txt'], ['extra.txt'], ['same.txt']))
+        self.assertEqual(plan.result.bytes_transferred, 4)
+        self.datalake_connection.download_to_file.assert_called_once_with('container', 'source/sub/changed.txt',
+                                                                          os.path.join(folder, 'sub', 'changed.txt'),
+                                                                          chunk_size=DEFAULT_CHUNK_SIZE, max_concurrency=1, size=4)
+        self.assertEqual(second_plan.transfer, [])
+
+    def mock_download(self, data, etag):
+        download = Mock()
+        download.readall.return_value = data
+        download.properties.etag = etag
+        return download
+
+    def test_download_file_as_binary_read_cache(self):
+        with TemporaryDirectory() as folder:
+            connection = ConnectionAzureDataLake(read_cache_directory=folder)
+            connection.service_client = Mock()
+            file_client = connection.service_client.get_file_system_client().get_directory_client().get_file_client()
+
+            file_client.download_file.return_value = self.mock_download(b'content', 'etag-1')
+            first = connection.download_file_as_binary('container', 'folder', 'file.txt', max_concurrency=2)
+
+            file_client.download_file.side_effect = ResourceNotModifiedError('not modified')
+            second = connection.download_file_as_binary('container', 'folder', 'file.txt', max_concurrency=2)
+
+            file_client.download_file.side_effect = None
+            file_client.download_file.return_value = self.mock_download(b'changed', 'etag-2')
+            third = connection.download_file_as_binary('container', 'folder', 'file.txt', max_concurrency=2)
+
+        self.assertEqual((first, second, third), (b'content', b'content', b'changed'))
+        self.assertEqual(file_client.download_file.call_args_list[0].kwargs, {'max_concurrency': 2})
+        self.assertEqual(file_client.download_file.call_args_list[1].kwargs,
+                         {'etag': 'etag-1', 'match_condition': MatchConditions.IfModified, 'max_concurrency': 2})
+
+    def test_download_file_as_binary_read_cache_ttl(self):
+        with TemporaryDirectory() as folder:
+            connection = ConnectionAzureDataLake(read_cache_directory=folder, read_cache_ttl=60)
+            connection.service_client = Mock()
+            file_client = connection.service_client.get_file_system_client().get_directory_client().get_file_client()
+            file_client.download_file.return_value = self.mock_download(b'content', 'etag-1')
+
+            responses = [connection.download_file_as_binary('container', 'folder', 'file.txt') for _ in range(3)]
+
+        self.assertEqual(responses, [b'content'] * 3)
+        self.assertEqual(file_client.download_file.call_count, 1)
+
+    def test_download_file_as_binary_read_cache_chunked(self):
+        metrics = MetricsRecorder(keep_records=10)
+
+        with TemporaryDirectory() as folder:
+            connection = ConnectionAzureDataLake(read_cache_directory=folder, metrics=metrics)
+            connection.service_client = FakeDataLakeServiceClient()
+            network = connection.service_client.network
+            store = connection.service_client.store
+            connection.create_container('container')
+            store.create('container', 'folder/file.txt', False, b'first version')
+
+            requests = network.requests
+            first = connection.download_file_as_binary('container', 'folder', 'file.txt', chunk_size=5)
+            miss_requests = network.requests - requests
+
+            requests = network.requests
+            second = connection.download_file_as_binary('container', 'folder', 'file.txt', chunk_size=5)
+            hit_requests = network.requests - requests
+
+            store.create('container', 'folder/file.txt', False, b'second version')
+            third = connection.download_file_as_binary('container', 'folder', 'file.txt', chunk_size=5)
+
+        self.assertEqual((first, second, third), (b'first version', b'first version', b'second version'))
+        self.assertEqual((miss_requests, hit_requests), (4, 1))
+        self.assertEqual([record.bytes_transferred for record in metrics.records
+                          if record.operation == 'download_file_as_binary'], [13, 0, 14])
+
+    def test_download_parquet_as_dataframe_read_cache(self):
+        df = pd.DataFrame({'id': [1, 2, 3], 'value': [1.0, 2.0, 3.0]})
+
+        with TemporaryDirectory() as folder:
+            connection = ConnectionAzureDataLake(read_cache_directory=folder, read_cache_ttl=60)
+            connection.service_client = Mock()
+            file_client = connection.service_client.get_file_system_client().get_directory_client().get_file_client()
+            file_client.download_file.return_value = self.mock_download(df.to_parquet(), 'etag-1')
+
+            df_all = connection.download_parquet_as_dataframe('container', 'folder', 'df.parquet')
+            df_projection = connection.download_parquet_as_dataframe('container', 'folder', 'df.parquet', columns=['id'],
+                                                                     filters=[('id', '>', 1)])
+
+        self.assertTrue(df.equals(df_all))
+        self.assertEqual(df_projection.to_dict('list'), {'id': [2, 3]})
+        self.assertEqual(file_client.download_file.call_count, 1)
+
+    def test_listing_cache(self):
+        connection = ConnectionAzureDataLake(listing_cache_ttl=60)
+        connection.service_client = Mock()
+        file_system_client = connection.service_client.get_file_system_client()
+        file_system_client.get_paths.side_effect = lambda path, recursive, max_results: MockItemPaged(
+            [MockDirectory(None, 'folder/a.txt', None, None, False, 10)])
+
+        first = connection.list_directory_contents('container', 'folder')
+        second = connection.list_directory_contents('container', 'folder/')
+        self.assertEqual(file_system_client.get_paths.call_count, 1)
+        self.assertTrue(first.equals(second))
+
+        self.assertTrue(connection.check_if_path_exists('container', 'folder', 'a.txt'))
+        self.assertFalse(connection.check_if_path_exists('container', 'folder', 'b.txt'))
+        connection.service_client.get_file_system_client().get_directory_client().get_file_client().get_file_properties.assert_not_called()
+
+        connection.upload_file_to_directory_bulk('container', 'folder', 'b.txt', b'data', overwrite=True)
+        connection.list_directory_contents('container', 'folder')
+        self.assertEqual(file_system_client.get_paths.call_count, 2)
+
+        list(connection.iterate_directory_contents('container', 'folder', max_results=1))
+        self.assertEqual(file_system_client.get_paths.call_count, 3)
+
+    def test_listing_cache_invalidation(self):
+        connection = ConnectionAzureDataLake(listing_cache_ttl=60)
+        connection.service_client = Mock()
+        file_system_client = connection.service_client.get_file_system_client()
+        file_system_client.get_paths.side_effect = lambda path, recursive, max_results: MockItemPaged([])
+        file_system_client.get_directory_client().file_system_name = 'container'
+
+        mutations = [
+            lambda: connection.create_directory('container', 'folder/sub'),
+            lambda: connection.delete_directory('container', 'folder'),
+            lambda: connection.rename_directory('container', 'other', 'folder/renamed'),
+            lambda: connection.upload_file_to_directory('container', 'folder', 'a.txt', b'data', overwrite=True),
+            lambda: connection.upload_file_to_directory_chunked('container', 'folder', 'a.txt', b'data', overwrite=True),
+            lambda: connection.delete_container('container'),
+            lambda: connection.invalidate_listing_cache('container', 'folder/a.txt'),
+        ]
+        for index, mutation in enumerate(mutations):
+            list(connection.iterate_directory_contents('container', 'folder'))
+            list(connection.iterate_directory_contents('container', 'folder'))
+            mutation()
+            list(connection.iterate_directory_contents('container', 'folder'))
+
+            self.assertEqual(file_system_client.get_paths.call_count, 2 * (index + 1))
+            connection.invalidate_listing_cache()
+
+    def test_listing_cache_incomplete_listing_is_not_cached(self):
+        connection = ConnectionAzureDataLake(listing_cache_ttl=60)
+        connection.service_client = Mock()
+        file_system_client = connection.service_client.get_file_system_client()
+        file_system_client.get_paths.side_effect = lambda path, recursive, max_results: MockItemPaged(
+            [MockDirectory(None, 'a.txt', None, None, False)], [MockDirectory(None, 'b.txt', None, None, False)])
+
+        next(connection.iterate_directory_contents('container'))
+        list(connection.iterate_directory_contents('container'))
+
+        self.assertEqual(file_system_client.get_paths.call_count, 2)
+
+    def test_delete_file(self):
+        self.datalake_connection.delete_file('container', 'folder', 'file.txt')
+
+        self.datalake_connection.service_client.get_file_system_client.assert_called_with(file_system='container')
+        self.datalake_connection.service_client.get_file_system_client().get_directory_client.assert_called_with('folder')
+        self.datalake_connection.service_client.get_file_system_client().get_directory_client().get_file_client.assert_called_with('file.txt')
+        self.datalake_connection.service_client.get_file_system_client().get_directory_client().get_file_client().delete_file.assert_called_once_with()
+
+    def test_rename_file(self):
+        self.datalake_connection.rename_file('container', '/folder/file.txt', 'other/file.txt')
+
+        file_system_client = self.datalake_connection.service_client.get_file_system_client()
+        file_system_client.get_file_client.assert_called_with('folder/file.txt')
+        file_system_client.get_file_client().rename_file.assert_called_once_with('container/other/file.txt')
+        file_system_client.create_directory.assert_called_once_with('other')
+
+    def test_delete_files(self):
+        self.datalake_connection.delete_file = Mock(side_effect=[None, ResourceNotFoundError('not found'), None])
+
+        result = self.datalake_connection.delete_files('container', ['folder/a.txt', 'folder/b.txt', 'c.txt'], max_workers=1)
+
+        self.assertEqual(result.succeeded, ['folder/a.txt', 'c.txt'])
+        self.assertIsInstance(result.failed['folder/b.txt'], ResourceNotFoundError)
+        self.datalake_connection.delete_file.assert_any_call('container', 'folder', 'a.txt')
+        self.datalake_connection.delete_file.assert_any_call('container', '/', 'c.txt')
+        self.assertEqual(self.datalake_connection.delete_file.call_count, 3)
+
+    def test_delete_files_filter(self):
+        self.datalake_connection.iterate_directory_contents = Mock(return_value=iter([
+            PathRecord(None, 'logs/2022', None, None, True, 0, None),
+            PathRecord(None, 'logs/2022/a.log', None, None, False, 1, None),
+            PathRecord(None, 'logs/2022/b.txt', None, None, False, 1, None),
+            PathRecord(None, 'logs/2022/c.log', None, None, False, 1, None),
+        ]))
+        self.datalake_connection.delete_file = Mock()
+
+        result = self.datalake_connection.delete_files('container', prefix='logs', pattern='*.log', max_workers=2)
+
+        self.assertEqual(sorted(result.succeeded), ['logs/2022/a.log', 'logs/2022/c.log'])
+        self.datalake_connection.iterate_directory_contents.assert_called_once_with('container', 'logs')
+
+    @patch('connectionazure.retry.time.sleep')
+    def test_delete_files_retries_throttling(self, mock_sleep):
+        throttling_error = HttpResponseError('server busy')
+        throttling_error.status_code = 503
+        self.datalake_connection.delete_file = Mock(side_effect=[throttling_error, None])
+
+        result = self.datalake_connection.delete_files('container', ['folder/a.txt'], max_retries=1)
+
+        self.assertTrue(result.ok)
+        self.assertEqual(self.datalake_connection.delete_file.call_count, 2)
+
+    def test_delete_files_without_selection_raise(self):
+        with self.assertRaises(Exception) as context:
+            self.datalake_connection.delete_files('container')
+
+        self.assertEqual(context.exception.args[0], 'paths, prefix or pattern must be set to delete files')
+
+    def test_rename_paths(self):
+        self.datalake_connection.rename_file = Mock()
+        self.datalake_connection.create_directory = Mock()
+
+        result = self.datalake_connection.rename_paths('container', [('a.txt', 'b.txt'), ('folder', 'other')], max_workers=1)
+
+        self.assertEqual(result.succeeded, ['a.txt', 'folder'])
+        self.datalake_connection.rename_file.assert_any_call('container', 'a.txt', 'b.txt', create_parent=False)
+        self.datalake_connection.rename_file.assert_any_call('container', 'folder', 'other', create_parent=False)
+        self.datalake_connection.create_directory.assert_not_called()
+
+    def test_rename_paths_creates_missing_parents(self):
+        connection = ConnectionAzureDataLake()
+        connection.service_client = FakeDataLakeServiceClient()
+        store = connection.service_client.store
+        connection.create_container('container')
+        for path in ('staging/2022/a.parquet', 'staging/2022/b.parquet', 'staging/2023/c.parquet'):
+            store.create('container', path, False, b'data')
+        connection.create_directory = Mock(wraps=connection.create_directory)
+
+        result = connection.rename_paths('container', prefix='staging', pattern='*.parquet', new_prefix='final/v1')
+
+        self.assertTrue(result.ok)
+        self.assertEqual(sorted(call.args[1] for call in connection.create_directory.call_args_list),
+                         ['final/v1/2022', 'final/v1/2023'])
+        self.assertEqual(sorted(record.path for record in connection.iterate_directory_contents('container', 'final')
+                                if not record.is_directory),
+                         ['final/v1/2022/a.parquet', 'final/v1/2022/b.parquet', 'final/v1/2023/c.parquet'])
+
+    def test_rename_file_creates_missing_parent(self):
+        connection = ConnectionAzureDataLake()
+        connection.service_client = FakeDataLakeServiceClient()
+        store = connection.service_client.store
+        connection.create_container('container')
+        store.create('container', 'folder/a.txt', False, b'data')
+        store.create('container', 'folder/b.txt', False, b'data')
+
+        with self.assertRaises(ResourceNotFoundError):
+            connection.rename_file('container', 'folder/a.txt', 'other/a.txt', create_parent=False)
+        connection.rename_file('container', 'folder/b.txt', 'other/b.txt')
+
+        self.assertTrue(connection.check_if_path_exists('container', 'other', 'b.txt'))
+        self.assertTrue(connection.check_if_path_exists('container', 'folder', 'a.txt'))
+
+    def test_rename_paths_filter(self):
+        self.datalake_connection.iterate_directory_contents = Mock(return_value=iter([
+            PathRecord(None, 'staging/2022', None, None, True, 0, None),
+            PathRecord(None, 'staging/2022/a.parquet', None, None, False, 1, None),
+            PathRecord(None, 'staging/2022/a.tmp', None, None, False, 1, None),
+        ]))
+        self.datalake_connection.rename_file = Mock()
+
+        result = self.datalake_connection.rename_paths('container', prefix='/staging/', pattern='*.parquet', new_prefix='final')
+
+        self.assertEqual(result.succeeded, ['staging/2022/a.parquet'])
+        self.datalake_connection.rename_file.assert_called_once_with('container', 'staging/2022/a.parquet', 'final/2022/a.parquet',
+                                                                      create_parent=False)
+        self.datalake_connection.service_client.get_file_system_client().create_directory.assert_called_once_with('final/2022')
+
+    def test_rename_paths_without_new_prefix_raise(self):
+        with self.assertRaises(Exception) as context:
+            self.datalake_connection.rename_paths('container', prefix='staging')
+
+        self.assertEqual(context.exception.args[0], 'new_prefix must be set to rename the files selected by prefix and pattern')
+
+    def mock_blob_service_client(self, *statuses):
+        blob_service_client = Mock()
+        self.datalake_connection._blob_service_client = blob_service_client
+
+        properties = [Mock(size=10, copy=Mock(status=status, status_description='description')) for status in statuses]
+        sink_blob_clients = []
+
+        def get_blob_client(container, path):
+            blob_client = Mock(url=f'https://account.blob/{container}/{path}')
+            blob_client.get_blob_properties.side_effect = list(properties)
+            sink_blob_clients.append(blob_client)
+            return blob_client
+
+        blob_service_client.get_blob_client.side_effect = get_blob_client
+        return sink_blob_clients
+
+    def test_blob_service_client(self):
+        connection = ConnectionAzureDataLake()
+        connection.service_client = Mock(primary_endpoint='https://account.dfs.core.windows.net/')
+
+        blob_service_client = connection.blob_service_client
+
+        self.assertEqual(blob_service_client.url, 'https://account.blob.core.windows.net/')
+        self.assertIs(connection.blob_service_client, blob_service_client)
+        self.assertIs(blob_service_client.credential, connection.service_client.credential)
+
+    @patch('connectionazure.datalake.time.sleep')
+    def test_copy_file(self, mock_sleep):
+        blob_clients = self.mock_blob_service_client('pending', 'success')
+
+        resp = self.datalake_connection.copy_file('staging', '/folder/file.txt', 'curated', 'other/file.txt', overwrite=True,
+                                                  poll_interval=2)
+
+        source_blob_client, sink_blob_client = blob_clients
+        self.assertEqual(resp, 10)
+        sink_blob_client.start_copy_from_url.assert_called_once_with('https://account.blob/staging/folder/file.txt')
+        self.assertEqual(sink_blob_client.url, 'https://account.blob/curated/other/file.txt')
+        mock_sleep.assert_called_once_with(2)
+        source_blob_client.start_copy_from_url.assert_not_called()
+
+    def test_copy_file_failed(self):
+        self.mock_blob_service_client('failed')
+
+        with self.assertRaises(Exception) as context:
+            self.datalake_connection.copy_file('staging', 'file.txt', 'curated', 'file.txt', overwrite=True)
+
+        self.assertEqual(context.exception.args[0], 'copy of staging/file.txt to curated/file.txt finished with status failed: description')
+
+    def test_copy_file_raise_if_exists(self):
+        blob_clients = self.mock_blob_service_client('success')
+        self.datalake_connection.check_if_path_exists = Mock(return_value=True)
+
+        with self.assertRaises(Exception) as context:
+            self.datalake_connection.copy_file('staging', 'folder/file.txt', 'curated', 'folder/file.txt')
+
+        self.assertEqual(context.exception.args[0], 'folder/file.txt already exists, can be set overwrite=True to overwrite this file.')
+        self.datalake_connection.check_if_path_exists.assert_called_once_with('curated', 'folder', 'file.txt')
+        self.assertEqual(blob_clients, [])
+
+    def test_copy_directory(self):
+        self.datalake_connection.iterate_directory_contents = Mock(return_value=iter([
+            PathRecord(None, 'staging/2022', None, None, True, 0, None),
+            PathRecord(None, 'staging/2022/a.parquet', None, None, False, 10, None),
+            PathRecord(None, 'staging/2022/b.parquet', None, None, False, 20, None),
+        ]))
+        self.datalake_connection.copy_file = Mock(side_effect=[10, 20])
+
+        result = self.datalake_connection.copy_directory('raw', 'staging', 'curated', 'tables/', max_workers=1)
+
+        self.assertEqual(result.succeeded, ['staging/2022/a.parquet', 'staging/2022/b.parquet'])
+        self.assertEqual(result.bytes_transferred, 30)
+        self.datalake_connection.copy_file.assert_any_call('raw', 'staging/2022/a.parquet', 'curated', 'tables/2022/a.parquet',
+                                                           overwrite=True, poll_interval=1.0)
+        self.datalake_connection.iterate_directory_contents.assert_called_once_with('raw', 'staging')
+
+    def test_throttling_limiters(self):
+        connection = ConnectionAzureDataLake(max_requests_per_second=100, max_concurrent_requests=8)
+        connection.service_client = Mock(primary_endpoint='https://account.dfs.core.windows.net/')
+
+        self.assertIsInstance(connection.rate_limiter, TokenBucket)
+        self.assertEqual(connection.rate_limiter.rate, 100)
+        self.assertEqual(connection.concurrency_limiter.max_concurrency, 8)
+
+        transport = connection.blob_service_client._config.transport
+        self.assertIsInstance(transport, ThrottledTransport)
+        self.assertIs(transport.rate_limiter, connection.rate_limiter)
+        self.assertIs(transport.concurrency_limiter, connection.concurrency_limiter)
+
+    def test_metrics_disabled(self):
+        self.assertIsNone(self.datalake_connection.metrics)
+        self.assertIsNone(self.datalake_connection._create_transport().metrics)
+
+    def test_metrics_upload_file_to_directory_bulk(self):
+        metrics = MetricsRecorder(keep_records=10)
+        connection = ConnectionAzureDataLake(metrics=metrics)
+        connection.service_client = Mock()
+
+        connection.upload_file_to_directory_bulk('test_container', 'folder', 'file.txt', b'12345', overwrite=True)
+
+        record = metrics.records[0]
+        self.assertEqual(record.operation, 'upload_file_to_directory_bulk')
+        self.assertEqual(record.bytes_transferred, 5)
+        self.assertEqual(list(record.phases), ['network'])
+        self.assertIsNone(record.error)
+        self.assertIs(connection._create_transport().metrics, metrics)
+
+        snapshot = metrics.snapshot()
+        self.assertEqual(snapshot['counters']['upload_file_to_directory_bulk.calls'], 1)
+        self.assertEqual(snapshot['histograms']['upload_file_to_directory_bulk.bytes']['sum'], 5)
+
+    def test_metrics_list_directory_contents(self):
+        metrics = MetricsRecorder(keep_records=10)
+        connection = ConnectionAzureDataLake(metrics=metrics)
+        connection.service_client = Mock()
+        connection.service_client.get_file_system_client.return_value = MockDirectoryList()
+
+        directory = connection.list_directory_contents('test_container')
+
+        self.assertEqual(len(directory), 3)
+        self.assertEqual(set(metrics.records[0].phases), {'listing', 'serialization'})
+
+    def test_metrics_download_directory_counts_retries(self):
+        metrics = MetricsRecorder(keep_records=10)
+        connection = ConnectionAzureDataLake(metrics=metrics)
+        connection.iterate_directory_contents = Mock(return_value=iter([
+            PathRecord(None, 'folder/a.txt', None, None, False, 10, None),
+        ]))
+        connection.download_to_file = Mock(side_effect=[ServiceResponseError('timeout'), True])
+
+        result = connection.download_directory('test_container', 'folder', 'local', max_workers=1, max_retries=1)
+
+        self.assertTrue(result.ok)
+        record = metrics.records[0]
+        self.assertEqual(record.operation, 'download_directory')
+        self.assertEqual((record.bytes_transferred, record.retries), (10, 1))
+        self.assertEqual(set(record.phases), {'listing', 'network'})
+
+    def test_metrics_record_error(self):
+        metrics = MetricsRecorder(keep_records=10)
+        connection = ConnectionAzureDataLake(metrics=metrics)
+        connection.service_client = Mock()
+        connection.service_client.get_file_system_client().get_directory_client().get_file_client().download_file \
+            .side_effect = ResourceNotFoundError('not found')
+
+        with self.assertRaises(ResourceNotFoundError):
+            connection.download_file_as_binary('test_container', 'folder', 'file.txt')
+
+        self.assertEqual(metrics.records[0].error, 'ResourceNotFoundError')
+        self.assertEqual(metrics.counters['download_file_as_binary.errors'], 1)
+
+    def fake_partition_tree(self):
+        service = FakeDataLakeServiceClient(page_size=3)
+        service.create_file_system('container')
+        for day in ('2022-12-31', '2023-01-01', '2023-01-02'):
+            for hour in ('00', '01', '12'):
+                for part in range(2):
+                    service.store.create('container', f'table/date={day}/hour={hour}/part-{part}.parquet', False, b'x')
+            service.store.create('container', f'table/date={day}/_SUCCESS', False)
+
+        connection = ConnectionAzureDataLake()
+        connection.service_client = service
+        connection.iterate_directory_contents = Mock(wraps=connection.iterate_directory_contents)
+
+        return connection
+
+    def listed_directories(self, connection):
+        return sorted((call.args[1], call.kwargs['recursive']) for call in connection.iterate_directory_contents.call_args_list)
+
+    def test_iterate_directory_tree(self):
+        connection = self.fake_partition_tree()
+        expected = [record.path for record in connection.iterate_directory_contents('container', 'table')]
+        connection.iterate_directory_contents.reset_mock()
+
+        paths = [record.path for record in connection.iterate_directory_tree('container', 'table', max_workers=4)]
+
+        self.assertEqual(sorted(paths), sorted(expected))
+        self.assertEqual(len(paths), len(set(paths)))
+        self.assertEqual(self.listed_directories(connection), [('table', False), ('table/date=2022-12-31', True),
+                                                               ('table/date=2023-01-01', True), ('table/date=2023-01-02', True)])
+
+    def test_iterate_directory_tree_max_depth(self):
+        connection = self.fake_partition_tree()
+
+        paths = sorted(record.path for record in connection.iterate_directory_tree('container', 'table', max_depth=2))
+
+        self.assertEqual(len(paths), 3 + 3 * 4)
+        self.assertIn('table/date=2023-01-01/hour=12', paths)
+        self.assertIn('table/date=2023-01-01/_SUCCESS', paths)
+        self.assertTrue(all(recursive is False for _, recursive in self.listed_directories(connection)))
+
+    def test_iterate_directory_tree_pattern_skips_subtrees(self):
+        connection = self.fake_partition_tree()
+
+        paths = sorted(record.path for record in connection.iterate_directory_tree(
+            'container', '/table/', pattern='date=2023-*/hour=0?/*.parquet', fan_out_depth=0))
+
+        self.assertEqual(paths, [f'table/date={day}/hour={hour}/part-{part}.parquet'
+                                 for day in ('2023-01-01', '2023-01-02') for hour in ('00', '01') for part in range(2)])
+        self.assertEqual(self.listed_directories(connection), [
+            ('table', False), ('table/date=2023-01-01', False), ('table/date=2023-01-01/hour=00', False),
+            ('table/date=2023-01-01/hour=01', False), ('table/date=2023-01-02', False),
+            ('table/date=2023-01-02/hour=00', False), ('table/date=2023-01-02/hour=01', False)])
+
+    def test_iterate_directory_tree_regex_and_files_only(self):
+        connection = self.fake_partition_tree()
+
+        paths = sorted(record.path for record in connection.iterate_directory_tree(
+            'container', 'table', pattern=r'date=2022-.*/.*/part-\d\.parquet', regex=True, include_directories=False))
+
+        self.assertEqual(paths, [f'table/date=2022-12-31/hour={hour}/part-{part}.parquet'
+                                 for hour in ('00', '01', '12') for part in range(2)])
+
+    def test_iterate_directory_tree_any_depth_pattern(self):
+        connection = self.fake_partition_tree()
+
+        paths = list(connection.iterate_directory_tree('container', 'table', pattern='date=2023-01-02/**/_SUCCESS'))
+
+        self.assertEqual([record.path for record in paths], ['table/date=2023-01-02/_SUCCESS'])
+        self.assertEqual(self.listed_directories(connection), [('table', False), ('table/date=2023-01-02', True)])
+
+    def test_iterate_directory_tree_not_found(self):
+        connection = self.fake_partition_tree()
+
+        with self.assertRaises(ResourceNotFoundError):
+            list(connection.iterate_directory_tree('container', 'missing'))
+
+    def test_iterate_directory_tree_close_early(self):
+        connection = self.fake_partition_tree()
+
+        records = connection.iterate_directory_tree('container', 'table', max_depth=3, max_workers=1)
+        first = next(records)
+        records.close()
+
+        self.assertTrue(first.path.startswith('table/'))
+        self.assertLessEqual(len(self.listed_directories(connection)), 4)
+
+    def test_list_directory_tree(self):
+        connection = self.fake_partition_tree()
+
+        df = connection.list_directory_tree('container', 'table', pattern='*/hour=12')
+        table = connection.list_directory_tree('container', 'table', pattern='*/hour=12', as_table=True)
+
+        self.assertEqual(df.path.to_list(), [f'table/date={day}/hour=12' for day in ('2022-12-31', '2023-01-01', '2023-01-02')])
+        self.assertEqual(list(df.columns), ['permissions', 'path', 'last_modified', 'owner', 'is_directory'])
+        self.assertEqual(table.schema, PATH_SCHEMA)
+
@@ -0,0 +1,375 @@
+from connectionazure.tests.unit.unit_base_test import UnitBaseAsyncTest
+from unittest.mock import ANY, AsyncMock, Mock, patch
+from azure.core.exceptions import ResourceModifiedError, ResourceNotFoundError, ServiceResponseError
+from azure.core import MatchConditions
+from connectionazure.datalake_async import AsyncConnectionAzureDataLake
+from connectionazure.datalake import CONNECTION_TIMEOUT, READ_TIMEOUT, DATA_BLOCK_SIZE
+from connectionazure.retry import AsyncThrottledTransport
+from connectionazure.results import PATH_SCHEMA
+from pandas import DataFrame
+import pandas as pd
+from tempfile import TemporaryDirectory
+import os
+import threading
+from io import BytesIO
+
+
+class MockAsyncIterator:
+    def __init__(self, items):
+        self.items = iter(items)
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        try:
+            return next(self.items)
+        except StopIteration:
+            raise StopAsyncIteration
+
+class MockAsyncPageIterator:
+    def __init__(self, pages):
+        self.pages = iter(pages)
+        self.continuation_token = None
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        try:
+            return MockAsyncIterator(next(self.pages))
+        except StopIteration:
+            raise StopAsyncIteration
+
+class MockAsyncItemPaged:
+    def __init__(self, *pages):
+        self.pages = pages
+
+    def by_page(self, continuation_token=None):
+        return MockAsyncPageIterator(self.pages)
+
+class MockPath:
+    def __init__(self, path, is_directory, content_length=0):
+        self.permissions = 'rwxr-----'
+        self.name = path
+        self.last_modified = '2022-03-04'
+        self.owner = 'john'
+        self.is_directory = is_directory
+        self.content_length = content_length
+        self.etag = '0x0'
+
+class AsyncConnectionAzureDataLakeTest(UnitBaseAsyncTest):
+    def setUp(self) -> None:
+        super().setUp()
+
+        self.datalake_connection = AsyncConnectionAzureDataLake()
+        self.datalake_connection.service_client = Mock()
+        self.file_system_client = self.datalake_connection.service_client.get_file_system_client()
+        self.directory_client = self.file_system_client.get_directory_client()
+        self.file_client = self.directory_client.get_file_client()
+
+    def mock_ranged_file_client(self, content):
+        self.etag = '"0x1"'
+        self.file_client.get_file_properties = AsyncMock()
+        self.file_client.get_file_properties.return_value.size = len(content)
+        self.file_client.get_file_properties.return_value.etag = self.etag
+
+        async def download_file(offset, length, etag=None, match_condition=None):
+            if match_condition == MatchConditions.IfNotModified and etag != self.etag:
+                raise ResourceModifiedError('the file was modified')
+            download = Mock()
+            download.readall = AsyncMock(return_value=content[offset:offset + length])
+            return download
+
+        self.file_client.download_file = AsyncMock(side_effect=download_file)
+
+    @patch('connectionazure.datalake_async.DataLakeServiceClient')
+    @patch('connectionazure.datalake_async.ClientSecretCredential', side_effect = lambda *args: args)
+    @patch('connectionazure.datalake_async.os')
+    async def test_initialize_storage_account_ad_env_variable(self, mock_os, mock_ClientSecretCredential, mock_DataLakeServiceClient):
+        mock_os.environ = {
+            "client_id": '1234ID',
+            "client_secret": 'storage_account_secret',
+            "tenant_id": 'tenant_231',
+            "storage_account_name": 'datalake'
+        }
+
+        self.datalake_connection.initialize_storage_account_ad_env_variable()
+
+        mock_ClientSecretCredential.assert_called_with('tenant_231', '1234ID', 'storage_account_secret')
+        mock_DataLakeServiceClient.assert_called_with(account_url="https://datalake.dfs.core.windows.net",
+                                                      credential=('tenant_231', '1234ID', 'storage_account_secret'),
+                                                      transport=ANY)
+
+        transport = mock_DataLakeServiceClient.call_args.kwargs['transport']
+        self.assertIsInstance(transport, AsyncThrottledTransport)
+        self.assertIs(transport.concurrency_limiter, self.datalake_connection.concurrency_limiter)
+        self.assertIsNone(transport.rate_limiter)
+        self.assertEqual((transport.transport.connection_config.timeout, transport.transport.connection_config.read_timeout,
+                          transport.transport.connection_config.data_block_size),
+                         (CONNECTION_TIMEOUT, READ_TIMEOUT, DATA_BLOCK_SIZE))
+
+    def test_limits(self):
+        connection = AsyncConnectionAzureDataLake(max_requests_per_second=20, max_concurrent_requests=8)
+
+        self.assertEqual(connection.rate_limiter.rate, 20)
+        self.assertEqual(connection.concurrency_limiter.max_concurrency, 8)
+
+    async def test_context_manager_closes_clients(self):
+        self.datalake_connection.service_client.close = AsyncMock()
+        self.datalake_connection.credential = Mock()
+        self.datalake_connection.credential.close = AsyncMock()
+
+        async with self.datalake_connection as datalake_connection:
+            self.assertIs(datalake_connection, self.datalake_connection)
+
+        self.datalake_connection.service_client.close.assert_awaited()
+        self.datalake_connection.credential.close.assert_awaited()
+
+    async def test_list_directory_contents(self):
+        self.file_system_client.get_paths.return_value = MockAsyncItemPaged([MockPath('folder', True)],
+                                                                             [MockPath('folder/file.txt', False, 10)])
+
+        df = await self.datalake_connection.list_directory_contents('test_container', 'folder')
+
+        self.file_system_client.get_paths.assert_called_with(path='folder', recursive=True, max_results=None)
+        self.assertEqual(type(df), DataFrame)
+        self.assertEqual(list(df.columns), ['permissions', 'path', 'last_modified', 'owner', 'is_directory'])
+        self.assertEqual(df.path.to_list(), ['folder', 'folder/file.txt'])
+        self.assertTrue(pd.api.types.is_bool_dtype(df.is_directory))
+
+    async def test_list_containers(self):
+        container = Mock(last_modified='2022-03-04')
+        container.name = 'test_container'
+        self.datalake_connection.service_client.list_file_systems.return_value = MockAsyncItemPaged([container])
+
+        df = await self.datalake_connection.list_containers()
+
+        self.assertEqual(list(df.columns), ['container', 'last_modified'])
+        self.assertEqual(df.container.to_list(), ['test_container'])
+
+    async def test_list_directory_contents_as_table(self):
+        self.file_system_client.get_paths.return_value = MockAsyncItemPaged([MockPath('folder', True)],
+                                                                             [MockPath('folder/file.txt', False, 10)])
+
+        table = await self.datalake_connection.list_directory_contents('test_container', 'folder', as_table=True)
+
+        self.assertEqual(table.column('path').to_pylist(), ['folder', 'folder/file.txt'])
+        self.assertEqual(table.column('content_length').to_pylist()[1], 10)
+        self.assertEqual(table.schema, PATH_SCHEMA)
+        self.assertEqual([len(batch) for batch in table.to_batches()], [1, 1])
+
+    async def test_list_directory_contents_empty(self):
+        self.file_system_client.get_paths.return_value = MockAsyncItemPaged()
+
+        table = await self.datalake_connection.list_directory_contents('test_container', 'folder', as_table=True)
+
+        self.assertEqual((table.num_rows, table.schema), (0, PATH_SCHEMA))
+
+    async def test_create_directory(self):
+        self.file_system_client.create_directory = AsyncMock()
+
+        await self.datalake_connection.create_directory('test_container', 'folder/inner_folder')
+
+        self.datalake_connection.service_client.get_file_system_client.assert_called_with(file_system='test_container')
+        self.file_system_client.create_directory.assert_awaited_with('folder/inner_folder')
+
+    async def test_check_if_path_exists(self):
+        self.file_client.get_file_properties = AsyncMock()
+
+        resp = await self.datalake_connection.check_if_path_exists('test_container', 'folder', 'file.txt')
+
+        self.assertTrue(resp)
+        self.directory_client.get_file_client.assert_called_with('file.txt')
+
+    async def test_check_if_path_exists_not_found(self):
+        self.file_client.get_file_properties = AsyncMock(side_effect=ResourceNotFoundError('not found'))
+
+        resp = await self.datalake_connection.check_if_path_exists('test_container', 'folder', 'file.txt')
+
+        self.assertFalse(resp)
+
+    async def test_upload_file_to_directory_raise_exception(self):
+        self.datalake_connection.check_if_path_exists = AsyncMock(return_value=True)
+
+        with self.assertRaises(Exception) as context:
+            await self.datalake_connection.upload_file_to_directory('test_container', '/folder', 'teste-file.txt', b'Hello')
+
+        self.assertEqual("/folder/teste-file.txt already exists, can be set overwrite=True to overwrite this file.",
+                         context.exception.args[0])
+
+    async def test_upload_file_to_directory_chunked(self):
+        file_content = b'Hello from test upload file to directory'
+        file_client = Mock()
+        file_client.append_data = AsyncMock(side_effect=[ServiceResponseError('timeout'), None, None, None])
+        file_client.flush_data = AsyncMock()
+        self.directory_client.create_file = AsyncMock(return_value=file_client)
+
+        resp = await self.datalake_connection.upload_file_to_directory_chunked('test_container', '/folder', 'teste-file.txt',
+                                                                               file_content, overwrite=True, chunk_size=16,
+                                                                               max_concurrency=2)
+
+        self.assertEqual(resp, len(file_content))
+        self.assertEqual(file_client.append_data.await_count, 4)
+        file_client.append_data.assert_any_await(data=file_content[16:32], offset=16, length=16)
+        file_client.flush_data.assert_awaited_once_with(len(file_content))
+
+    async def test_upload_file_to_directory_chunked_reads_stream_off_the_loop(self):
+        file_client = Mock()
+        file_client.append_data = AsyncMock()
+        file_client.flush_data = AsyncMock()
+        self.directory_client.create_file = AsyncMock(return_value=file_client)
+        stream = BytesIO(b'0123456789')
+        read_threads = []
+
+        def read(size):
+            read_threads.append(threading.get_ident())
+            return BytesIO.read(stream, size)
+
+        stream.read = read
+
+        resp = await self.datalake_connection.upload_file_to_directory_chunked('test_container', 'folder', 'file.txt', stream,
+                                                                               overwrite=True, chunk_size=4)
+
+        self.assertEqual(resp, 10)
+        self.assertEqual(file_client.append_data.await_count, 3)
+        self.assertNotIn(threading.get_ident(), read_threads)
+
+    async def test_download_file_as_binary_ranged(self):
+        content = b'the data is correct on this file'
+        self.mock_ranged_file_client(content)
+
+        download = await self.datalake_connection.download_file_as_binary('container_test', 'folder', 'text.txt', chunk_size=7,
+                                                                          max_concurrency=2)
+
+        self.assertEqual(download, content)
+        self.assertEqual(self.file_client.download_file.await_count, 5)
+
+    async def test_iterate_file_chunks_overwritten(self):
+        self.mock_ranged_file_client(b'first version')
+
+        chunks = self.datalake_connection.iterate_file_chunks('container_test', 'folder', 'text.txt', chunk_size=5,
+                                                              max_concurrency=1)
+        first = await chunks.__anext__()
+        self.etag = '"0x2"'
+
+        self.assertEqual(first, b'first')
+        with self.assertRaises(ResourceModifiedError):
+            async for _ in chunks:
+                pass
+        self.file_client.download_file.assert_any_await(offset=0, length=5, etag='"0x1"',
+                                                        match_condition=MatchConditions.IfNotModified)
+
+    async def test_download_to_file(self):
+        content = b'the data is correct on this file'
+        self.mock_ranged_file_client(content)
+
+        with TemporaryDirectory() as folder:
+            resp = await self.datalake_connection.download_to_file('container_test', 'folder/text.txt', folder + '/tmp/text.txt',
+                                                                   chunk_size=10)
+
+            with open(folder + '/tmp/text.txt', 'rb') as f:
+                self.assertEqual(f.read(), content)
+            self.assertEqual(os.listdir(folder + '/tmp'), ['text.txt'])
+
+        self.assertTrue(resp)
+        self.datalake_connection.service_client.get_file_system_client().get_directory_client.assert_called_with('folder')
+
+    async def test_download_to_file_disk_io_off_loop(self):
+        self.mock_ranged_file_client(b'the data is correct on this file')
+        replace_threads = []
+
+        def replace_in_thread(*args):
+            replace_threads.append(threading.get_ident())
+            os.rename(*args)
+
+        with TemporaryDirectory() as folder, \
+                patch('connectionazure.datalake_async.os.replace', side_effect=replace_in_thread):
+            await self.datalake_connection.download_to_file('container_test', 'folder/text.txt', folder + '/text.txt',
+                                                            chunk_size=10)
+
+        self.assertEqual(len(replace_threads), 1)
+        self.assertNotEqual(replace_threads[0], threading.get_ident())
+
+    async def test_download_directory(self):
+        error = ServiceResponseError('server busy')
+
+        async def download_to_file(container, remote_path, local_path, **kwargs):
+            if remote_path == 'backup/democopy/file2.txt':
+                raise error
+            return True
+
+        self.datalake_connection.download_to_file = AsyncMock(side_effect=download_to_file)
+        self.file_system_client.get_paths.return_value = MockAsyncItemPaged([MockPath('backup/democopy', True),
+                                                                              MockPath('backup/democopy/file1.txt', False, 10),
+                                                                              MockPath('backup/democopy/file2.txt', False, 10)])
+
+        result = await self.datalake_connection.download_directory('dev', 'backup', 'tmp', max_workers=2, max_retries=1)
+
+        self.assertEqual(result.succeeded, ['backup/democopy/file1.txt'])
+        self.assertEqual(result.failed, {'backup/democopy/file2.txt': error})
+        self.assertEqual(result.bytes_transferred, 10)
+        self.datalake_connection.download_to_file.assert_any_await('dev', 'backup/democopy/file1.txt', 'tmp/democopy/file1.txt',
+                                                                   chunk_size=8 * 1024 * 1024, max_concurrency=1)
+        self.assertEqual(self.datalake_connection.download_to_file.await_count, 3)
+
+    async def test_upload_directory(self):
+        self.datalake_connection.upload_file_to_directory_chunked = AsyncMock(side_effect=lambda **kwargs: len(kwargs['data'].read()))
+        self.datalake_connection.create_directory = AsyncMock()
+
+        with TemporaryDirectory() as source_directory:
+            os.makedirs(source_directory + '/folder')
+            with open(source_directory + '/folder/inner_file.txt', 'wb') as f:
+                f.write(b'hello world')
+
+            result = await self.datalake_connection.upload_directory(source_directory, 'upload_container', 'sink')
+
+        self.assertTrue(result.ok)
+        self.assertEqual(result.bytes_transferred, 11)
+        self.datalake_connection.create_directory.assert_any_await('upload_container', 'sink')
+        self.datalake_connection.create_directory.assert_any_await('upload_container', 'sink/folder')
+
+    async def test_upload_directory_walks_off_loop(self):
+        self.datalake_connection.upload_file_to_directory_chunked = AsyncMock(side_effect=lambda **kwargs: len(kwargs['data'].read()))
+        self.datalake_connection.create_directory = AsyncMock()
+        walk_threads = []
+
+        def walk_in_thread(path):
+            walk_threads.append(threading.get_ident())
+            return iter([(path, [], ['file.txt'])])
+
+        with TemporaryDirectory() as source_directory, \
+                patch('connectionazure.datalake_async.os.walk', side_effect=walk_in_thread):
+            with open(source_directory + '/file.txt', 'wb') as f:
+                f.write(b'hello')
+
+            result = await self.datalake_connection.upload_directory(source_directory, 'upload_container', 'sink')
+
+        self.assertEqual(result.bytes_transferred, 5)
+        self.assertEqual(len(walk_threads), 1)
+        self.assertNotEqual(walk_threads[0], threading.get_ident())
+
+    async def test_upload_and_download_parquet(self):
+        df = pd.DataFrame({'id': [1, 2, 3, 4], 'value': [18.5, 20.1, 100.0, 0.5]})
+        self.datalake_connection.upload_file_to_directory_bulk = AsyncMock()
+
+        resp = await self.datalake_connection.upload_dataframe_as_parquet(df, 'upload_container', 'folder', 'df_test.parquet')
+
+        self.assertTrue(resp)
+        binary = self.datalake_connection.upload_file_to_directory_bulk.call_args.kwargs['data']
+        self.datalake_connection.download_file_as_binary = AsyncMock(return_value=binary)
+
+        read_threads = []
+        read_parquet = pd.read_parquet
+
+        def read_parquet_in_thread(*args, **kwargs):
+            read_threads.append(threading.get_ident())
+            return read_parquet(*args, **kwargs)
+
+        with patch('connectionazure.datalake_async.pd.read_parquet', side_effect=read_parquet_in_thread):
+            df_returned = await self.datalake_connection.download_parquet_as_dataframe('upload_container', 'folder',
+                                                                                       'df_test.parquet')
+
+        self.assertTrue(df.equals(df_returned))
+        self.assertEqual(len(read_threads), 1)
+        self.assertNotEqual(read_threads[0], threading.get_ident())
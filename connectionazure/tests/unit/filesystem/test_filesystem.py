@@ -0,0 +1,150 @@
+from connectionazure.tests.unit.unit_base_test import UnitBaseTest
+from connectionazure.tests.unit.streams.test_streams import MockFileClient, MockRangedFileClient
+from connectionazure.filesystem import create_filesystem, split_path
+from connectionazure.streams import DataLakeFileReader, DataLakeFileWriter
+from connectionazure.results import PathRecord
+from azure.core.exceptions import ResourceNotFoundError
+from pyarrow.fs import FileSelector, FileType
+from unittest.mock import Mock
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+import pandas as pd
+
+
+class MockStoredFileClient(MockFileClient):
+    def __init__(self, files, key):
+        super().__init__()
+        self.files = files
+        self.key = key
+
+    def flush_data(self, offset):
+        super().flush_data(offset)
+        self.files[self.key] = self.content()
+
+class MockFailingFileClient(MockStoredFileClient):
+    def append_data(self, data, offset, length):
+        if offset == 16:
+            raise ValueError('rejected')
+        super().append_data(data, offset, length)
+
+
+class MockConnection:
+    def __init__(self):
+        self.files = dict()
+        self.readers = []
+        self.file_client_class = MockStoredFileClient
+
+    def get_path_properties(self, container, directory, name):
+        key = (container + '/' + directory.strip('/') + '/' + name).replace('//', '/')
+        if key in self.files:
+            return Mock(size=len(self.files[key]), last_modified=None, metadata={})
+        if any(file_key.startswith(key + '/') for file_key in self.files):
+            return Mock(last_modified=None, metadata={'hdi_isfolder': 'true'})
+        return None
+
+    def iterate_directory_contents(self, container, path, recursive=True):
+        prefix = container + '/' + path.strip('/') + '/' if path.strip('/') else container + '/'
+        directories = set()
+        matched = False
+        for key, content in sorted(self.files.items()):
+            if not key.startswith(prefix):
+                continue
+            matched = True
+            parts = key[len(container) + 1:].split('/')
+            depth = len(prefix[len(container) + 1:].strip('/').split('/')) if path.strip('/') else 0
+            for level in range(depth + 1, len(parts)):
+                directory = '/'.join(parts[:level])
+                if directory not in directories and (recursive or level == depth + 1):
+                    directories.add(directory)
+                    yield PathRecord(None, directory, None, None, True, 0, None)
+            if recursive or len(parts) == depth + 1:
+                yield PathRecord(None, '/'.join(parts), None, None, False, len(content), None)
+        if not matched and path.strip('/'):
+            raise ResourceNotFoundError('not found')
+
+    def open_file_reader(self, container, directory, name, read_ahead):
+        key = (container + '/' + directory.strip('/') + '/' + name).replace('//', '/')
+        if key not in self.files:
+            raise ResourceNotFoundError('not found')
+        file_client = MockRangedFileClient(self.files[key])
+        self.readers.append(file_client)
+        return DataLakeFileReader(file_client, len(self.files[key]), read_ahead=read_ahead, max_retries=0)
+
+    def open_file_writer(self, container, directory, name, overwrite, chunk_size, max_concurrency):
+        key = (container + '/' + directory.strip('/') + '/' + name).replace('//', '/')
+        return DataLakeFileWriter(self.file_client_class(self.files, key), chunk_size=chunk_size,
+                                  max_concurrency=max_concurrency, max_retries=0)
+
+    def create_directory(self, container, path):
+        pass
+
+
+class DataLakeFileSystemTest(UnitBaseTest):
+    def setUp(self) -> None:
+        super().setUp()
+
+        self.connection = MockConnection()
+        self.filesystem = create_filesystem(self.connection, read_ahead=1024, chunk_size=256, max_concurrency=2)
+        self.df = pd.DataFrame({'id': list(range(100)),
+                                'day': ['2022-01-01'] * 50 + ['2022-01-02'] * 50,
+                                'value': [float(index) for index in range(100)]})
+
+    def test_split_path(self):
+        self.assertEqual(split_path('container/folder/inner/file.txt'), ('container', 'folder/inner', 'file.txt'))
+        self.assertEqual(split_path('/container/file.txt'), ('container', '/', 'file.txt'))
+        self.assertEqual(split_path('container'), ('container', '/', ''))
+
+    def test_write_and_read_parquet(self):
+        pq.write_table(pa.Table.from_pandas(self.df, preserve_index=False), 'container/folder/df.parquet',
+                       filesystem=self.filesystem)
+
+        df_returned = pd.read_parquet('container/folder/df.parquet', filesystem=self.filesystem, columns=['id', 'value'])
+
+        self.assertIn('container/folder/df.parquet', self.connection.files)
+        self.assertTrue(self.df[['id', 'value']].equals(df_returned))
+
+    def test_write_parquet_failed_does_not_commit(self):
+        self.connection.file_client_class = MockFailingFileClient
+        filesystem = create_filesystem(self.connection, read_ahead=1024, chunk_size=16, max_concurrency=1)
+
+        with self.assertRaises(Exception):
+            pq.write_table(pa.Table.from_pandas(self.df, preserve_index=False), 'container/folder/df.parquet',
+                           filesystem=filesystem)
+
+        self.assertNotIn('container/folder/df.parquet', self.connection.files)
+
+    def test_get_file_info(self):
+        self.connection.files['container/folder/file.txt'] = b'hello'
+
+        infos = self.filesystem.get_file_info(['container/folder/file.txt', 'container/folder', 'container/missing.txt'])
+
+        self.assertEqual([info.type for info in infos], [FileType.File, FileType.Directory, FileType.NotFound])
+        self.assertEqual(infos[0].size, 5)
+
+    def test_get_file_info_selector_not_found(self):
+        self.assertEqual(self.filesystem.get_file_info(FileSelector('container/missing', allow_not_found=True)), [])
+
+        with self.assertRaises(FileNotFoundError):
+            self.filesystem.get_file_info(FileSelector('container/missing'))
+
+    def test_open_input_file_not_found(self):
+        with self.assertRaises(FileNotFoundError):
+            self.filesystem.open_input_file('container/missing.txt')
+
+    def test_partitioned_dataset(self):
+        pq.write_to_dataset(pa.Table.from_pandas(self.df, preserve_index=False), 'container/dataset', partition_cols=['day'],
+                            filesystem=self.filesystem)
+
+        dataset = ds.dataset('container/dataset', filesystem=self.filesystem, format='parquet', partitioning='hive')
+        table = dataset.to_table(filter=ds.field('day') == '2022-01-02', columns=['id'])
+
+        self.assertEqual(len([key for key in self.connection.files if key.startswith('container/dataset/day=')]), 2)
+        self.assertEqual(sorted(table.column('id').to_pylist()), list(range(50, 100)))
+
+    def test_copy_file(self):
+        self.connection.files['container/file.txt'] = b'hello world' * 100
+
+        self.filesystem.copy_file('container/file.txt', 'other/copy/file.txt')
+
+        self.assertEqual(self.connection.files['other/copy/file.txt'], b'hello world' * 100)
@@ -0,0 +1,44 @@
+from connectionazure.tests.unit.unit_base_test import UnitBaseTest
+from connectionazure.listing import compile_path_pattern, pattern_depth, match_path, may_contain_matches
+
+
+class ListingPatternTest(UnitBaseTest):
+    def test_match_path_glob(self):
+        matchers = compile_path_pattern('/date=2023-*/hour=0?/*.parquet/')
+
+        self.assertEqual(pattern_depth(matchers), 3)
+        self.assertTrue(match_path(['date=2023-01-01', 'hour=05', 'part-0.parquet'], matchers))
+        self.assertFalse(match_path(['date=2023-01-01', 'hour=15', 'part-0.parquet'], matchers))
+        self.assertFalse(match_path(['date=2023-01-01', 'hour=05'], matchers))
+
+    def test_match_path_regex(self):
+        matchers = compile_path_pattern(r'date=2023-0[12]-\d+/hour=(00|12)', regex=True)
+
+        self.assertTrue(match_path(['date=2023-02-10', 'hour=12'], matchers))
+        self.assertFalse(match_path(['date=2023-03-10', 'hour=12'], matchers))
+        self.assertFalse(match_path(['date=2023-02-10', 'hour=120'], matchers))
+
+    def test_match_path_any_depth(self):
+        matchers = compile_path_pattern('raw/**/*.json')
+
+        self.assertIsNone(pattern_depth(matchers))
+        self.assertTrue(match_path(['raw', 'a.json'], matchers))
+        self.assertTrue(match_path(['raw', 'x', 'y', 'a.json'], matchers))
+        self.assertFalse(match_path(['curated', 'a.json'], matchers))
+        self.assertFalse(match_path(['raw', 'x', 'a.csv'], matchers))
+
+    def test_may_contain_matches(self):
+        matchers = compile_path_pattern('date=2023-*/hour=0?/*.parquet')
+
+        self.assertTrue(may_contain_matches([], matchers))
+        self.assertTrue(may_contain_matches(['date=2023-01-01'], matchers))
+        self.assertFalse(may_contain_matches(['date=2022-01-01'], matchers))
+        self.assertTrue(may_contain_matches(['date=2023-01-01', 'hour=01'], matchers))
+        self.assertFalse(may_contain_matches(['date=2023-01-01', 'hour=11'], matchers))
+        self.assertFalse(may_contain_matches(['date=2023-01-01', 'hour=01', 'part-0.parquet'], matchers))
+
+    def test_may_contain_matches_any_depth(self):
+        matchers = compile_path_pattern('raw/**/*.json')
+
+        self.assertTrue(may_contain_matches(['raw', 'x', 'y'], matchers))
+        self.assertFalse(may_contain_matches(['curated'], matchers))
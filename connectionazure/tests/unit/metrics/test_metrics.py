@@ -0,0 +1,202 @@
+from connectionazure.tests.unit.unit_base_test import UnitBaseTest
+from unittest.mock import ANY, MagicMock, Mock, patch
+from azure.core.exceptions import ServiceResponseError
+from connectionazure.metrics import Histogram, MetricsRecorder, OpenTelemetryRecorder, NULL_OPERATION, record_request, \
+    DEFAULT_SIZE_BUCKETS
+from connectionazure.retry import call_with_retries, ThrottledTransport, AdaptiveConcurrencyLimiter
+import contextvars
+import concurrent.futures
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+    def advance(self, seconds):
+        self.now += seconds
+
+
+class HistogramTest(UnitBaseTest):
+    def test_observe(self):
+        histogram = Histogram((1, 10, 100))
+
+        for value in (0.5, 5, 5, 50, 500):
+            histogram.observe(value)
+
+        self.assertEqual(histogram.counts, [1, 2, 1, 1])
+        self.assertEqual(histogram.to_dict(), {'count': 5, 'sum': 560.5, 'mean': 112.1, 'min': 0.5, 'max': 500,
+                                               'p50': 10, 'p90': 500, 'p99': 500})
+
+    def test_quantile_empty(self):
+        self.assertIsNone(Histogram().quantile(0.5))
+        self.assertIsNone(Histogram().to_dict()['mean'])
+
+    def test_quantile_lower_than_bucket(self):
+        histogram = Histogram((1, 10))
+        histogram.observe(2)
+
+        self.assertEqual(histogram.quantile(0.5), 2)
+
+
+class OperationTest(UnitBaseTest):
+    def setUp(self) -> None:
+        super().setUp()
+
+        self.clock = FakeClock()
+        clock_patcher = patch('connectionazure.metrics.time.perf_counter', self.clock)
+        clock_patcher.start()
+        self.addCleanup(clock_patcher.stop)
+
+    def test_phases_are_exclusive(self):
+        recorder = MetricsRecorder(keep_records=1)
+
+        with recorder.operation('read') as operation:
+            with operation.phase('serialization'):
+                self.clock.advance(1)
+                with operation.phase('network'):
+                    self.clock.advance(2)
+                self.clock.advance(3)
+                with operation.phase('network'):
+                    self.clock.advance(4)
+            self.clock.advance(5)
+
+        record = recorder.records[0]
+        self.assertEqual(record.seconds, 15)
+        self.assertEqual(record.phases, {'serialization': 4, 'network': 6})
+
+    def test_iterate(self):
+        recorder = MetricsRecorder(keep_records=1)
+
+        def pages():
+            for page in range(3):
+                self.clock.advance(2)
+                yield page
+
+        with recorder.operation('list') as operation, operation.phase('serialization'):
+            for _ in operation.iterate(pages(), 'listing'):
+                self.clock.advance(1)
+
+        self.assertEqual(recorder.records[0].phases, {'serialization': 3, 'listing': 6})
+
+    def test_requests_and_retries_of_threads_with_context(self):
+        recorder = MetricsRecorder(keep_records=1)
+        function = Mock(side_effect=[ServiceResponseError('timeout'), 'done'])
+
+        with recorder.operation('upload') as operation:
+            record_request(False)
+            with concurrent.futures.ThreadPoolExecutor(max_workers=1) as executor:
+                executor.submit(contextvars.copy_context().run, call_with_retries, function, 1).result()
+                executor.submit(contextvars.copy_context().run, record_request, True).result()
+                executor.submit(record_request, False).result()
+            operation.add_bytes(10)
+
+        record = recorder.records[0]
+        self.assertEqual((record.requests, record.throttled, record.retries), (2, 1, 1))
+        self.assertEqual(record.bytes_transferred, 10)
+
+    def test_nested_operations(self):
+        recorder = MetricsRecorder(keep_records=2)
+
+        with recorder.operation('outer'):
+            with recorder.operation('inner'):
+                record_request(False)
+            record_request(False)
+
+        self.assertEqual([(record.operation, record.requests) for record in recorder.records], [('inner', 1), ('outer', 1)])
+
+    def test_null_operation(self):
+        iterable = [1, 2]
+
+        with NULL_OPERATION as operation, operation.phase('network'):
+            operation.add_bytes(10)
+
+        self.assertIs(NULL_OPERATION.iterate(iterable, 'listing'), iterable)
+
+
+class MetricsRecorderTest(UnitBaseTest):
+    def test_on_end(self):
+        recorder = MetricsRecorder()
+        operation = recorder.operation('download')
+        operation.seconds = 2
+        operation.add_phase_seconds('network', 1.5)
+        operation.add_bytes(4096)
+        operation.add_request(True)
+        operation.add_retry()
+
+        recorder.on_end(operation, ValueError('bad'))
+
+        snapshot = recorder.snapshot()
+        self.assertEqual(snapshot['counters'], {'download.calls': 1, 'download.requests': 1, 'download.throttled': 1,
+                                                'download.retries': 1, 'download.errors': 1})
+        self.assertEqual(snapshot['histograms']['download.seconds']['sum'], 2)
+        self.assertEqual(snapshot['histograms']['download.network.seconds']['sum'], 1.5)
+        self.assertEqual(snapshot['histograms']['download.bytes']['sum'], 4096)
+        self.assertEqual(snapshot['histograms']['download.bytes_per_second']['sum'], 2048)
+        self.assertEqual(recorder.histograms['download.bytes'].buckets, DEFAULT_SIZE_BUCKETS)
+        self.assertEqual(recorder.records, [])
+
+    def test_keep_records(self):
+        recorder = MetricsRecorder(keep_records=2)
+
+        for name in ('a', 'b', 'c'):
+            with recorder.operation(name):
+                pass
+
+        self.assertEqual([record.operation for record in recorder.records], ['b', 'c'])
+
+    def test_reset(self):
+        recorder = MetricsRecorder(keep_records=1)
+        with recorder.operation('a'):
+            pass
+
+        recorder.reset()
+
+        self.assertEqual(recorder.snapshot(), {'counters': {}, 'histograms': {}})
+        self.assertEqual(recorder.records, [])
+
+    def test_transport_on_request(self):
+        recorder = MetricsRecorder(keep_records=1)
+        inner = Mock()
+        inner.send.side_effect = [Mock(status_code=503), Mock(status_code=200)]
+        transport = ThrottledTransport(inner, AdaptiveConcurrencyLimiter(max_concurrency=4), metrics=recorder)
+
+        with recorder.operation('get_path_properties'):
+            transport.send(Mock(method='HEAD'))
+            transport.send(Mock(method='HEAD'))
+
+        self.assertEqual(recorder.counters['http.requests'], 2)
+        self.assertEqual(recorder.counters['http.throttled'], 1)
+        self.assertEqual(recorder.histograms['http.HEAD.seconds'].count, 2)
+        self.assertEqual((recorder.records[0].requests, recorder.records[0].throttled), (2, 1))
+
+
+class OpenTelemetryRecorderTest(UnitBaseTest):
+    def test_span(self):
+        tracer = MagicMock()
+        span_context = tracer.start_as_current_span.return_value
+        span = span_context.__enter__.return_value
+        recorder = OpenTelemetryRecorder(tracer=tracer)
+
+        with recorder.operation('upload_file_to_directory') as operation, operation.phase('network'):
+            operation.add_bytes(10)
+
+        tracer.start_as_current_span.assert_called_once_with('ConnectionAzureDataLake.upload_file_to_directory')
+        span.set_attribute.assert_any_call('connectionazure.bytes_transferred', 10)
+        span.set_attribute.assert_any_call('connectionazure.phase.network.seconds', operation.phases['network'])
+        span_context.__exit__.assert_called_once_with(None, None, None)
+        self.assertEqual(recorder.counters['upload_file_to_directory.calls'], 1)
+
+    def test_span_error(self):
+        tracer = MagicMock()
+        span_context = tracer.start_as_current_span.return_value
+        recorder = OpenTelemetryRecorder(tracer=tracer)
+        error = ValueError('bad')
+
+        with self.assertRaises(ValueError):
+            with recorder.operation('download_file_as_binary'):
+                raise error
+
+        span_context.__exit__.assert_called_once_with(ValueError, error, ANY)
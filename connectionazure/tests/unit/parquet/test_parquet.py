@@ -0,0 +1,132 @@
+from connectionazure.tests.unit.unit_base_test import UnitBaseTest
+from connectionazure.tests.unit.streams.test_streams import MockRangedFileClient
+from connectionazure.parquet import normalize_filters, select_row_groups, column_chunk_ranges, split_ranges, read_parquet_projection, \
+    parse_partitions, prune_partition_filters, add_partition_columns, partition_path, rows_per_file, split_partitions, \
+    serialize_dataframe_as_parquet
+from connectionazure.streams import DataLakeFileReader
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pandas as pd
+import numpy as np
+from io import BytesIO
+
+
+class ParquetTest(UnitBaseTest):
+    def setUp(self) -> None:
+        super().setUp()
+
+        self.df = pd.DataFrame({'id': list(range(20000)),
+                                'day': [f'2022-01-{1 + index // 2000:02d}' for index in range(20000)],
+                                'value': [float(index) * 1.5 for index in range(20000)],
+                                'text': [f'row number {index} with some padding text' for index in range(20000)]})
+        buffer = BytesIO()
+        self.df.to_parquet(buffer, row_group_size=2000)
+        self.content = buffer.getvalue()
+        self.metadata = pq.read_metadata(BytesIO(self.content))
+
+    def test_normalize_filters(self):
+        self.assertEqual(normalize_filters(None), [])
+        self.assertEqual(normalize_filters([('id', '>', 1)]), [[('id', '>', 1)]])
+        self.assertEqual(normalize_filters([[('id', '>', 1)], [('id', '<', 0)]]), [[('id', '>', 1)], [('id', '<', 0)]])
+
+    def test_select_row_groups(self):
+        self.assertEqual(select_row_groups(self.metadata), list(range(10)))
+        self.assertEqual(select_row_groups(self.metadata, [('id', '>=', 17000)]), [8, 9])
+        self.assertEqual(select_row_groups(self.metadata, [('day', '=', '2022-01-03'), ('id', '<', 20000)]), [2])
+        self.assertEqual(select_row_groups(self.metadata, [[('id', '<', 50)], [('day', 'in', ['2022-01-05'])]]), [0, 4])
+        self.assertEqual(select_row_groups(self.metadata, [('id', '>', 'not comparable')]), list(range(10)))
+
+    def test_column_chunk_ranges(self):
+        all_ranges = column_chunk_ranges(self.metadata, [0, 1])
+        id_ranges = column_chunk_ranges(self.metadata, [0, 5], ['id'])
+
+        self.assertEqual(len(all_ranges), 1)
+        self.assertEqual(len(id_ranges), 2)
+        self.assertLess(sum(length for _, length in id_ranges), sum(length for _, length in all_ranges))
+
+    def test_split_ranges(self):
+        self.assertEqual(split_ranges([(10, 25), (100, 5)], 10), [(10, 10), (20, 10), (30, 5), (100, 5)])
+
+    def test_read_parquet_projection(self):
+        file_client = MockRangedFileClient(self.content)
+        reader = DataLakeFileReader(file_client, len(self.content), read_ahead=64 * 1024, max_retries=0)
+
+        table = read_parquet_projection(reader, columns=['id', 'value'], filters=[('day', '=', '2022-01-03')], max_concurrency=2)
+
+        expected = self.df[self.df.day == '2022-01-03'][['id', 'value']].reset_index(drop=True)
+        self.assertTrue(expected.equals(table.to_pandas()))
+
+    def test_read_parquet_projection_downloads_only_needed_ranges(self):
+        file_client = MockRangedFileClient(self.content)
+        reader = DataLakeFileReader(file_client, len(self.content), read_ahead=1024, max_retries=0)
+
+        table = read_parquet_projection(reader, columns=['id'], filters=[('id', '<', 10)], max_concurrency=2)
+
+        self.assertEqual(table.column('id').to_pylist(), list(range(10)))
+        self.assertLess(file_client.bytes_downloaded(), len(self.content) / 4)
+
+    def test_parse_partitions(self):
+        self.assertEqual(parse_partitions('year=2022/month=01/part-0.parquet'), {'year': '2022', 'month': '01'})
+        self.assertEqual(parse_partitions('folder/part-0.parquet'), {})
+        self.assertEqual(parse_partitions('name=a=b/part-0.parquet'), {'name': 'a=b'})
+
+    def test_prune_partition_filters(self):
+        partitions = {'year': '2022', 'country': 'BR'}
+
+        self.assertEqual(prune_partition_filters(None, partitions), (True, None))
+        self.assertEqual(prune_partition_filters([('year', '=', 2022)], partitions), (True, None))
+        self.assertEqual(prune_partition_filters([('year', '>', 2022)], partitions), (False, None))
+        self.assertEqual(prune_partition_filters([('country', 'in', ['BR', 'US']), ('id', '<', 5)], partitions),
+                         (True, [[('id', '<', 5)]]))
+        self.assertEqual(prune_partition_filters([[('country', '!=', 'BR')], [('id', '<', 5)]], partitions),
+                         (True, [[('id', '<', 5)]]))
+        self.assertEqual(prune_partition_filters([('year', '=', 'not a number')], partitions), (False, None))
+        self.assertEqual(prune_partition_filters([('year', '>', 1.5j)], partitions), (True, None))
+
+    def test_add_partition_columns(self):
+        table = pa.table({'id': [1, 2]})
+
+        self.assertEqual(add_partition_columns(table, {'year': '2022', 'day': '1'}).to_pydict(),
+                         {'id': [1, 2], 'year': ['2022', '2022'], 'day': ['1', '1']})
+        self.assertEqual(add_partition_columns(table, {'year': '2022', 'day': '1'}, ['id', 'day']).column_names, ['id', 'day'])
+
+    def test_partition_path(self):
+        self.assertEqual(partition_path({'year': 2022, 'country': 'BR'}), 'year=2022/country=BR')
+        self.assertEqual(partition_path({'country': None}), 'country=__HIVE_DEFAULT_PARTITION__')
+
+    def test_rows_per_file(self):
+        df = pd.DataFrame({'id': np.arange(100000), 'value': np.random.default_rng(0).random(100000)})
+        options = {'index': False}
+        target_file_size = 256 * 1024
+
+        max_rows = rows_per_file(df.iloc[:10000], target_file_size, options)
+        size = len(serialize_dataframe_as_parquet(df.iloc[:max_rows], options))
+
+        self.assertLess(abs(size - target_file_size), 0.1 * target_file_size)
+        self.assertEqual(rows_per_file(df.iloc[:10], 4, options), 1)
+        self.assertEqual(rows_per_file(df.iloc[:0], 800, options), 1)
+
+    def test_split_partitions(self):
+        df = pd.DataFrame({'day': ['a', 'a', 'a', 'b', 'a'], 'id': [0, 1, 2, 3, 4]})
+
+        parts = [(partitions, frame['id'].tolist()) for partitions, frame in split_partitions(df, ['day'], 2)]
+
+        self.assertEqual(parts, [({'day': 'a'}, [0, 1]), ({'day': 'a'}, [2, 4]), ({'day': 'b'}, [3])])
+
+    def test_split_partitions_even_sizes(self):
+        df = pd.DataFrame({'day': ['a'] * 100, 'id': range(100)})
+
+        sizes = [len(frame) for _, frame in split_partitions(df, ['day'], 75)]
+
+        self.assertEqual(sizes, [50, 50])
+
+    def test_split_partitions_contiguous_rows_are_not_copied(self):
+        df = pd.DataFrame({'day': ['a', 'a', 'b', 'b'], 'country': ['BR', 'BR', 'BR', 'US'], 'id': [0, 1, 2, 3]})
+
+        parts = list(split_partitions(df, ['day', 'country'], 10))
+
+        self.assertEqual([partitions for partitions, _ in parts],
+                         [{'day': 'a', 'country': 'BR'}, {'day': 'b', 'country': 'BR'}, {'day': 'b', 'country': 'US'}])
+        self.assertEqual(list(parts[0][1].columns), ['id'])
+        self.assertEqual(list(parts[0][1].index), [0, 1])
+
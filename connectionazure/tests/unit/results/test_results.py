@@ -0,0 +1,72 @@
+from connectionazure.tests.unit.unit_base_test import UnitBaseTest
+from connectionazure.results import TransferResult, PathRecord, PATH_SCHEMA, CONTAINER_SCHEMA, path_records_to_table, \
+    containers_to_table
+from datetime import datetime, timezone
+from unittest.mock import Mock
+import pyarrow as pa
+
+
+class TransferResultTest(UnitBaseTest):
+    def test_transfer_result_ok(self):
+        result = TransferResult(succeeded=['folder/file.txt'], bytes_transferred=10)
+
+        self.assertTrue(result.ok)
+
+    def test_transfer_result_failed(self):
+        result = TransferResult(failed={'folder/file.txt': Exception('error')})
+
+        self.assertFalse(result.ok)
+        self.assertEqual(result.succeeded, [])
+        self.assertEqual(result.bytes_transferred, 0)
+
+    def test_transfer_result_throughput(self):
+        result = TransferResult(succeeded=['a.txt', 'b.txt'], bytes_transferred=4 * 1024 * 1024, elapsed_seconds=2.0)
+
+        self.assertEqual(result.files_per_second, 1.0)
+        self.assertEqual(result.megabytes_per_second, 2.0)
+
+    def test_transfer_result_throughput_not_started(self):
+        result = TransferResult()
+
+        self.assertEqual(result.files_per_second, 0.0)
+        self.assertEqual(result.megabytes_per_second, 0.0)
+
+
+class ListingTableTest(UnitBaseTest):
+    def records(self):
+        modified = datetime(2022, 3, 4, 10, 30, tzinfo=timezone.utc)
+        return [PathRecord('rwxr-x---', 'folder', modified, 'john', True, None, '0x1'),
+                PathRecord('rw-r-----', 'folder/a.txt', modified, 'john', False, 10, '0x2'),
+                PathRecord('rw-r-----', 'folder/b.txt', modified, 'jack', False, 20, '0x3')]
+
+    def test_path_records_to_table(self):
+        table = path_records_to_table(iter(self.records()), batch_size=2)
+
+        self.assertEqual(table.schema, PATH_SCHEMA)
+        self.assertEqual([len(batch) for batch in table.to_batches()], [2, 1])
+        self.assertEqual(table.column('path').to_pylist(), ['folder', 'folder/a.txt', 'folder/b.txt'])
+        self.assertEqual(table.column('content_length').to_pylist(), [None, 10, 20])
+        self.assertEqual(table.column('owner').to_pylist(), ['john', 'john', 'jack'])
+        self.assertEqual(table.column('last_modified')[0].as_py(), datetime(2022, 3, 4, 10, 30, tzinfo=timezone.utc))
+
+    def test_path_records_to_table_empty(self):
+        table = path_records_to_table([])
+
+        self.assertEqual(table.schema, PATH_SCHEMA)
+        self.assertEqual(table.num_rows, 0)
+
+    def test_path_records_to_table_parses_strings(self):
+        table = path_records_to_table([PathRecord('rwxr-x---', 'folder', '2022-03-04', 'john', True, None, '0x1')])
+
+        self.assertEqual(table.column('last_modified')[0].as_py(), datetime(2022, 3, 4, tzinfo=timezone.utc))
+
+    def test_containers_to_table(self):
+        containers = [Mock(last_modified=datetime(2022, 3, 4)), Mock(last_modified=datetime(2022, 3, 5))]
+        containers[0].name, containers[1].name = 'raw', 'curated'
+
+        table = containers_to_table(containers)
+
+        self.assertEqual(table.schema, CONTAINER_SCHEMA)
+        self.assertEqual(table.column('container').to_pylist(), ['raw', 'curated'])
+        self.assertEqual(table.column('last_modified').type, pa.timestamp('us', tz='UTC'))
+
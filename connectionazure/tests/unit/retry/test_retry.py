@@ -0,0 +1,302 @@
+from connectionazure.tests.unit.unit_base_test import UnitBaseTest, UnitBaseAsyncTest
+from connectionazure.retry import call_with_retries, call_with_throttling_retries, is_throttling_error, backoff_delay, \
+    is_transient_error, TokenBucket, AdaptiveConcurrencyLimiter, ThrottledTransport, call_with_retries_async, \
+    AsyncAdaptiveConcurrencyLimiter, AsyncThrottledTransport
+from azure.core.exceptions import AzureError, HttpResponseError, ResourceNotFoundError, ServiceRequestError, \
+    ServiceResponseError
+from unittest.mock import AsyncMock, Mock, patch
+import asyncio
+import threading
+
+
+def http_error(status_code):
+    error = HttpResponseError('error')
+    error.status_code = status_code
+    return error
+
+
+class RetryTest(UnitBaseTest):
+    def test_call_with_retries(self):
+        function = Mock(side_effect=[ServiceResponseError('timeout'), 'ok'])
+
+        resp = call_with_retries(function, 1, 'arg', key='value')
+
+        self.assertEqual(resp, 'ok')
+        function.assert_called_with('arg', key='value')
+        self.assertEqual(function.call_count, 2)
+
+    def test_call_with_retries_exhausted(self):
+        function = Mock(side_effect=ServiceResponseError('timeout'))
+
+        with self.assertRaises(AzureError):
+            call_with_retries(function, 2)
+
+        self.assertEqual(function.call_count, 3)
+
+    @patch('connectionazure.retry.time.sleep')
+    def test_call_with_retries_permanent_errors_not_retried(self, mock_sleep):
+        for error in (ResourceNotFoundError('not found'), http_error(403), http_error(409), http_error(412)):
+            function = Mock(side_effect=error)
+
+            with self.assertRaises(AzureError):
+                call_with_retries(function, 2)
+
+            function.assert_called_once()
+        mock_sleep.assert_not_called()
+
+    def test_is_transient_error(self):
+        for error in (ServiceRequestError('connection reset'), ServiceResponseError('timeout'), http_error(408),
+                      http_error(429), http_error(500), http_error(503)):
+            self.assertTrue(is_transient_error(error))
+        for error in (ResourceNotFoundError('not found'), http_error(403), AzureError('error'), ValueError('wrong')):
+            self.assertFalse(is_transient_error(error))
+
+    def test_call_with_retries_other_errors_not_retried(self):
+        function = Mock(side_effect=ValueError('wrong value'))
+
+        with self.assertRaises(ValueError):
+            call_with_retries(function, 2)
+
+        function.assert_called_once()
+
+    def test_is_throttling_error(self):
+        self.assertTrue(is_throttling_error(http_error(429)))
+        self.assertTrue(is_throttling_error(http_error(503)))
+        self.assertFalse(is_throttling_error(http_error(500)))
+        self.assertFalse(is_throttling_error(ServiceResponseError('timeout')))
+
+    @patch('connectionazure.retry.time.sleep')
+    def test_call_with_throttling_retries(self, mock_sleep):
+        function = Mock(side_effect=[http_error(429), http_error(503), 'ok'])
+
+        with patch('connectionazure.retry.backoff_delay', side_effect=[0.25, 0.75]) as mock_backoff_delay:
+            resp = call_with_throttling_retries(function, 2, 'arg', key='value')
+
+        self.assertEqual(resp, 'ok')
+        function.assert_called_with('arg', key='value')
+        self.assertEqual([call.args[0] for call in mock_backoff_delay.call_args_list], [0, 1])
+        self.assertEqual([call.args[0] for call in mock_sleep.call_args_list], [0.25, 0.75])
+
+    @patch('connectionazure.retry.time.sleep')
+    def test_call_with_throttling_retries_other_errors_not_retried(self, mock_sleep):
+        for error in (ResourceNotFoundError('not found'), http_error(500), ServiceResponseError('timeout')):
+            function = Mock(side_effect=error)
+
+            with self.assertRaises(AzureError):
+                call_with_throttling_retries(function, 2)
+
+            function.assert_called_once()
+        mock_sleep.assert_not_called()
+
+    @patch('connectionazure.retry.time.sleep')
+    def test_call_with_throttling_retries_exhausted(self, mock_sleep):
+        function = Mock(side_effect=http_error(429))
+
+        with self.assertRaises(HttpResponseError):
+            call_with_throttling_retries(function, 1)
+
+        self.assertEqual(function.call_count, 2)
+
+
+class AsyncRetryTest(UnitBaseAsyncTest):
+    async def test_call_with_retries_async(self):
+        function = AsyncMock(side_effect=[ServiceResponseError('timeout'), http_error(503), 'ok'])
+
+        with patch('connectionazure.retry.backoff_delay', side_effect=[0.01, 0.02]) as mock_backoff_delay, \
+                patch('connectionazure.retry.record_retry') as mock_record_retry:
+            resp = await call_with_retries_async(function, 2, 'arg', key='value')
+
+        self.assertEqual(resp, 'ok')
+        function.assert_awaited_with('arg', key='value')
+        self.assertEqual([call.args[0] for call in mock_backoff_delay.call_args_list], [0, 1])
+        self.assertEqual(mock_record_retry.call_count, 2)
+
+    async def test_call_with_retries_async_permanent_errors_not_retried(self):
+        function = AsyncMock(side_effect=ResourceNotFoundError('not found'))
+
+        with self.assertRaises(ResourceNotFoundError):
+            await call_with_retries_async(function, 2)
+
+        function.assert_awaited_once()
+
+
+class BackoffTest(UnitBaseTest):
+    @patch('connectionazure.retry.random.uniform', side_effect=lambda low, high: high)
+    def test_backoff_delay(self, mock_uniform):
+        self.assertEqual([backoff_delay(attempt) for attempt in range(8)], [0.5, 1, 2, 4, 8, 16, 30, 30])
+
+    def test_backoff_delay_jitter(self):
+        delays = [backoff_delay(3) for _ in range(100)]
+
+        self.assertTrue(all(0 <= delay <= 4 for delay in delays))
+        self.assertGreater(len(set(delays)), 1)
+
+
+class TokenBucketTest(UnitBaseTest):
+    @patch('connectionazure.retry.time')
+    def test_acquire(self, mock_time):
+        now = [0.0]
+        mock_time.monotonic.side_effect = lambda: now[0]
+        mock_time.sleep.side_effect = lambda seconds: now.__setitem__(0, now[0] + seconds)
+        bucket = TokenBucket(rate=4, burst=2)
+
+        for _ in range(4):
+            bucket.acquire()
+
+        self.assertEqual(now[0], 0.5)
+        self.assertEqual(mock_time.sleep.call_count, 2)
+
+
+class AsyncTokenBucketTest(UnitBaseAsyncTest):
+    async def test_acquire_async(self):
+        now = [0.0]
+
+        async def sleep(seconds):
+            now[0] += seconds
+
+        with patch('connectionazure.retry.time.monotonic', side_effect=lambda: now[0]), \
+                patch('connectionazure.retry.asyncio.sleep', side_effect=sleep) as mock_sleep:
+            bucket = TokenBucket(rate=4, burst=2)
+            for _ in range(4):
+                await bucket.acquire_async()
+
+        self.assertEqual(now[0], 0.5)
+        self.assertEqual(mock_sleep.await_count, 2)
+
+
+class AdaptiveConcurrencyLimiterTest(UnitBaseTest):
+    @patch('connectionazure.retry.time.monotonic')
+    def test_on_throttle_halves_limit_once_per_cooldown(self, mock_monotonic):
+        limiter = AdaptiveConcurrencyLimiter(max_concurrency=16, min_concurrency=2)
+
+        mock_monotonic.return_value = 100
+        limiter.on_throttle()
+        limiter.on_throttle()
+        self.assertEqual(limiter.limit, 8)
+
+        for now in (102, 104, 106):
+            mock_monotonic.return_value = now
+            limiter.on_throttle()
+        self.assertEqual(limiter.limit, 2)
+
+    def test_on_success_raises_limit_while_latency_recovers(self):
+        limiter = AdaptiveConcurrencyLimiter(max_concurrency=4)
+        limiter.limit = 2
+
+        limiter.on_success(0.1)
+        limiter.on_success(0.1)
+        self.assertEqual(limiter.limit, 2.5 + 1 / 2.5)
+
+        limit = limiter.limit
+        limiter.on_success(1.0)
+        self.assertEqual(limiter.limit, limit)
+
+        for _ in range(20):
+            limiter.on_success(0.1)
+        self.assertEqual(limiter.limit, 4)
+
+    def test_acquire_blocks_at_limit(self):
+        limiter = AdaptiveConcurrencyLimiter(max_concurrency=2)
+        limiter.acquire()
+        limiter.acquire()
+        acquired = threading.Event()
+
+        thread = threading.Thread(target=lambda: (limiter.acquire(), acquired.set()))
+        thread.start()
+        self.assertFalse(acquired.wait(0.05))
+
+        limiter.release()
+        self.assertTrue(acquired.wait(1))
+        thread.join()
+        self.assertEqual(limiter.in_flight, 2)
+
+
+class ThrottledTransportTest(UnitBaseTest):
+    def test_send(self):
+        inner = Mock()
+        inner.send.side_effect = [Mock(status_code=200), Mock(status_code=503)]
+        limiter = Mock(wraps=AdaptiveConcurrencyLimiter(max_concurrency=4))
+        rate_limiter = Mock()
+        transport = ThrottledTransport(inner, limiter, rate_limiter)
+
+        first = transport.send('request', stream=True)
+        second = transport.send('request')
+
+        self.assertEqual((first.status_code, second.status_code), (200, 503))
+        inner.send.assert_any_call('request', stream=True)
+        self.assertEqual(rate_limiter.acquire.call_count, 2)
+        self.assertEqual((limiter.acquire.call_count, limiter.release.call_count), (2, 2))
+        limiter.on_success.assert_called_once()
+        limiter.on_throttle.assert_called_once_with()
+
+    def test_send_releases_on_error(self):
+        inner = Mock()
+        inner.send.side_effect = ConnectionError('reset')
+        limiter = AdaptiveConcurrencyLimiter(max_concurrency=1)
+        transport = ThrottledTransport(inner, limiter)
+
+        with self.assertRaises(ConnectionError):
+            transport.send('request')
+
+        self.assertEqual(limiter.in_flight, 0)
+
+
+
+class AsyncAdaptiveConcurrencyLimiterTest(UnitBaseAsyncTest):
+    async def test_acquire_waits_at_limit(self):
+        limiter = AsyncAdaptiveConcurrencyLimiter(max_concurrency=2)
+        await limiter.acquire()
+        await limiter.acquire()
+
+        waiting = asyncio.ensure_future(limiter.acquire())
+        await asyncio.sleep(0.01)
+        self.assertFalse(waiting.done())
+
+        await limiter.release()
+        await asyncio.wait_for(waiting, 1)
+        self.assertEqual(limiter.in_flight, 2)
+
+    async def test_release_wakes_requests_allowed_by_limit(self):
+        limiter = AsyncAdaptiveConcurrencyLimiter(max_concurrency=4)
+        limiter.limit = 1
+        await limiter.acquire()
+        waiting = [asyncio.ensure_future(limiter.acquire()) for _ in range(3)]
+        await asyncio.sleep(0.01)
+
+        limiter.limit = 3
+        await limiter.release()
+        await asyncio.sleep(0.01)
+
+        self.assertEqual(sum(task.done() for task in waiting), 3)
+        self.assertEqual(limiter.in_flight, 3)
+
+
+class AsyncThrottledTransportTest(UnitBaseAsyncTest):
+    async def test_send(self):
+        inner = Mock()
+        inner.send = AsyncMock(side_effect=[Mock(status_code=200), Mock(status_code=429)])
+        limiter = AsyncAdaptiveConcurrencyLimiter(max_concurrency=4)
+        rate_limiter = Mock()
+        rate_limiter.acquire_async = AsyncMock()
+        metrics = Mock()
+        transport = AsyncThrottledTransport(inner, limiter, rate_limiter, metrics=metrics)
+
+        first = await transport.send(Mock(method='GET'), stream=True)
+        second = await transport.send(Mock(method='GET'))
+
+        self.assertEqual((first.status_code, second.status_code), (200, 429))
+        self.assertEqual(rate_limiter.acquire_async.await_count, 2)
+        self.assertEqual(limiter.limit, 2)
+        self.assertEqual(limiter.in_flight, 0)
+        self.assertEqual([call.args[2] for call in metrics.on_request.call_args_list], [False, True])
+
+    async def test_send_releases_on_error(self):
+        inner = Mock()
+        inner.send = AsyncMock(side_effect=ConnectionError('reset'))
+        limiter = AsyncAdaptiveConcurrencyLimiter(max_concurrency=1)
+        transport = AsyncThrottledTransport(inner, limiter)
+
+        with self.assertRaises(ConnectionError):
+            await transport.send(Mock(method='GET'))
+
+        self.assertEqual(limiter.in_flight, 0)
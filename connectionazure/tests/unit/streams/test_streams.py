@@ -0,0 +1,210 @@
+from connectionazure.tests.unit.unit_base_test import UnitBaseTest
+from connectionazure.streams import DataLakeFileReader, DataLakeFileWriter
+from azure.core.exceptions import AzureError, ServiceResponseError
+from azure.core import MatchConditions
+from unittest.mock import Mock
+import io
+import gc
+import hashlib
+
+
+class MockFileClient:
+    def __init__(self):
+        self.chunks = dict()
+        self.flushed = None
+        self.content_settings = None
+
+    def append_data(self, data, offset, length):
+        self.chunks[offset] = data
+
+    def flush_data(self, offset, content_settings=None):
+        self.flushed = offset
+        self.content_settings = content_settings
+
+    def content(self):
+        return b''.join(self.chunks[offset] for offset in sorted(self.chunks))
+
+
+class MockRangedFileClient:
+    def __init__(self, content):
+        self.content = content
+        self.requests = []
+
+    def download_file(self, offset, length, **kwargs):
+        self.requests.append((offset, length))
+        self.conditions = kwargs
+        download = Mock()
+        download.readall.return_value = self.content[offset:offset + length]
+        return download
+
+    def bytes_downloaded(self):
+        return sum(length for _, length in self.requests)
+
+
+class DataLakeFileWriterTest(UnitBaseTest):
+    def test_write_and_close(self):
+        file_client = MockFileClient()
+
+        with DataLakeFileWriter(file_client, chunk_size=4, max_concurrency=2, max_retries=0) as writer:
+            writer.write(b'he')
+            writer.write(b'llo wor')
+            writer.write(bytearray(b'ld, this is a long write'))
+            self.assertEqual(writer.tell(), 33)
+
+        self.assertTrue(writer.closed)
+        self.assertEqual(file_client.content(), b'hello world, this is a long write')
+        self.assertEqual(sorted(file_client.chunks), list(range(0, 33, 4)))
+        self.assertTrue(all(len(chunk) == 4 for offset, chunk in file_client.chunks.items() if offset < 32))
+        self.assertEqual(file_client.flushed, 33)
+
+    def test_close_empty_file(self):
+        file_client = MockFileClient()
+
+        DataLakeFileWriter(file_client, chunk_size=4, max_concurrency=2, max_retries=0).close()
+
+        self.assertEqual(file_client.chunks, {})
+        self.assertEqual(file_client.flushed, 0)
+
+    def test_error_inside_context_does_not_commit(self):
+        file_client = Mock()
+
+        with self.assertRaises(ValueError):
+            with DataLakeFileWriter(file_client, chunk_size=4, max_concurrency=2, max_retries=0) as writer:
+                writer.write(b'hello')
+                raise ValueError('serialization failed')
+
+        self.assertTrue(writer.closed)
+        file_client.flush_data.assert_not_called()
+
+    def test_append_error_raised_on_close(self):
+        file_client = Mock()
+        file_client.append_data.side_effect = ServiceResponseError('timeout')
+        writer = DataLakeFileWriter(file_client, chunk_size=4, max_concurrency=2, max_retries=1)
+        writer.write(b'hi')
+
+        with self.assertRaises(AzureError):
+            writer.close()
+
+        self.assertEqual(file_client.append_data.call_count, 2)
+        file_client.flush_data.assert_not_called()
+
+    def test_failed_write_does_not_commit_on_close(self):
+        file_client = Mock()
+        file_client.append_data.side_effect = [None, ValueError('rejected')]
+        writer = DataLakeFileWriter(file_client, chunk_size=4, max_concurrency=1, max_retries=0)
+
+        with self.assertRaises(ValueError):
+            writer.write(b'0123456789ab')
+
+        writer.close()
+
+        self.assertTrue(writer.closed)
+        file_client.flush_data.assert_not_called()
+
+    def test_garbage_collected_writer_does_not_commit(self):
+        file_client = Mock()
+        writer = DataLakeFileWriter(file_client, chunk_size=4, max_concurrency=1, max_retries=0)
+        writer.write(b'partial-data')
+
+        del writer
+        gc.collect()
+
+        file_client.flush_data.assert_not_called()
+
+    def test_write_closed(self):
+        writer = DataLakeFileWriter(MockFileClient(), chunk_size=4, max_concurrency=2, max_retries=0)
+        writer.close()
+
+        with self.assertRaises(ValueError):
+            writer.write(b'hello')
+
+    def test_write_computes_md5(self):
+        file_client = MockFileClient()
+
+        with DataLakeFileWriter(file_client, chunk_size=4, max_concurrency=2, max_retries=0, compute_md5=True) as writer:
+            writer.write(b'0123456789')
+            writer.write(b'abc')
+
+        self.assertEqual(file_client.content(), b'0123456789abc')
+        self.assertEqual(bytes(file_client.content_settings.content_md5), hashlib.md5(b'0123456789abc').digest())
+
+    def test_on_commit_called_after_flush(self):
+        file_client = MockFileClient()
+        on_commit = Mock(side_effect=lambda: self.assertEqual(file_client.flushed, 3))
+
+        with DataLakeFileWriter(file_client, chunk_size=4, max_concurrency=1, max_retries=0, on_commit=on_commit) as writer:
+            writer.write(b'abc')
+
+        on_commit.assert_called_once_with()
+
+    def test_on_commit_not_called_on_abort(self):
+        on_commit = Mock()
+
+        with self.assertRaises(ValueError):
+            with DataLakeFileWriter(MockFileClient(), chunk_size=4, max_concurrency=1, max_retries=0, on_commit=on_commit) as writer:
+                writer.write(b'abc')
+                raise ValueError('error')
+
+        on_commit.assert_not_called()
+
+
+class DataLakeFileReaderTest(UnitBaseTest):
+    def setUp(self) -> None:
+        super().setUp()
+
+        self.content = bytes(range(100))
+        self.file_client = MockRangedFileClient(self.content)
+        self.reader = DataLakeFileReader(self.file_client, len(self.content), read_ahead=10, max_retries=0)
+
+    def test_read_uses_read_ahead(self):
+        first = self.reader.read(3)
+        second = self.reader.read(5)
+
+        self.assertEqual(first + second, self.content[:8])
+        self.assertEqual(self.file_client.requests, [(0, 10)])
+        self.assertEqual(self.reader.tell(), 8)
+
+    def test_read_across_buffer(self):
+        self.reader.read(8)
+
+        data = self.reader.read(20)
+
+        self.assertEqual(data, self.content[8:28])
+        self.assertEqual(self.file_client.requests, [(0, 10), (10, 18)])
+
+    def test_seek_and_read_end(self):
+        self.reader.seek(-8, io.SEEK_END)
+
+        data = self.reader.read()
+
+        self.assertEqual(data, self.content[92:])
+        self.assertEqual(self.file_client.requests, [(92, 8)])
+        self.assertEqual(self.reader.read(10), b'')
+
+    def test_prefetch(self):
+        self.reader.prefetch([(20, 10), (30, 10), (60, 5)], max_concurrency=2)
+        self.reader.seek(22)
+
+        data = self.reader.read(15)
+        self.reader.seek(61)
+        end = self.reader.read(4)
+
+        self.assertEqual(data, self.content[22:37])
+        self.assertEqual(end, self.content[61:65])
+        self.assertEqual(sorted(self.file_client.requests), [(20, 10), (30, 10), (60, 5)])
+
+    def test_etag(self):
+        reader = DataLakeFileReader(self.file_client, len(self.content), read_ahead=10, max_retries=0, etag='"0x1"')
+
+        reader.read(3)
+        reader.prefetch([(50, 10)], max_concurrency=1)
+
+        self.assertEqual(self.file_client.conditions, {'etag': '"0x1"', 'match_condition': MatchConditions.IfNotModified})
+
+    def test_readinto(self):
+        buffer = bytearray(4)
+
+        size = self.reader.readinto(buffer)
+
+        self.assertEqual(size, 4)
+        self.assertEqual(bytes(buffer), self.content[:4])
@@ -0,0 +1,61 @@
+from connectionazure.tests.unit.unit_base_test import UnitBaseTest
+from connectionazure.sync import FileState, list_local_files, list_remote_files, file_md5, is_changed, build_sync_plan
+from connectionazure.results import PathRecord
+from tempfile import TemporaryDirectory
+from datetime import datetime, timezone
+import hashlib
+import os
+
+
+class SyncTest(UnitBaseTest):
+    def test_list_local_files(self):
+        with TemporaryDirectory() as folder:
+            os.makedirs(os.path.join(folder, 'sub'))
+            for relative_path, content in (('a.txt', b'abc'), ('sub/b.txt', b'12345')):
+                with open(os.path.join(folder, *relative_path.split('/')), 'wb') as file_handle:
+                    file_handle.write(content)
+            os.utime(os.path.join(folder, 'a.txt'), (100, 100))
+
+            files = list_local_files(folder)
+
+        self.assertEqual(sorted(files), ['a.txt', 'sub/b.txt'])
+        self.assertEqual(files['a.txt'], FileState(3, 100))
+        self.assertEqual(files['sub/b.txt'].size, 5)
+
+    def test_list_remote_files(self):
+        last_modified = datetime(2022, 1, 1, tzinfo=timezone.utc)
+        records = [PathRecord(None, 'root/folder', last_modified, None, True, 0, None),
+                   PathRecord(None, 'root/folder/a.txt', last_modified, None, False, 10, None),
+                   PathRecord(None, 'root/b.txt', last_modified, None, False, None, None)]
+
+        self.assertEqual(list_remote_files(records, '/root/'), {'folder/a.txt': FileState(10, last_modified.timestamp()),
+                                                               'b.txt': FileState(0, last_modified.timestamp())})
+
+    def test_file_md5(self):
+        with TemporaryDirectory() as folder:
+            local_path = os.path.join(folder, 'a.txt')
+            with open(local_path, 'wb') as file_handle:
+                file_handle.write(b'content')
+
+            self.assertEqual(file_md5(local_path), hashlib.md5(b'content').digest())
+
+    def test_is_changed(self):
+        self.assertTrue(is_changed(FileState(1, 10), None))
+        self.assertTrue(is_changed(FileState(1, 10), FileState(2, 20)))
+        self.assertTrue(is_changed(FileState(1, 30), FileState(1, 20)))
+        self.assertFalse(is_changed(FileState(1, 20), FileState(1, 20)))
+        self.assertFalse(is_changed(FileState(1, 10), FileState(1, 20)))
+
+    def test_build_sync_plan(self):
+        source = {'new.txt': FileState(1, 10), 'changed.txt': FileState(2, 10), 'same.txt': FileState(3, 10)}
+        sink = {'changed.txt': FileState(3, 10), 'same.txt': FileState(3, 10), 'extra.txt': FileState(1, 10)}
+
+        plan = build_sync_plan(source, sink, lambda path, source_file, sink_file: is_changed(source_file, sink_file))
+        plan_with_delete = build_sync_plan(source, sink, lambda path, source_file, sink_file: is_changed(source_file, sink_file),
+                                           delete=True)
+
+        self.assertEqual(plan.transfer, ['changed.txt', 'new.txt'])
+        self.assertEqual(plan.unchanged, ['same.txt'])
+        self.assertEqual(plan.delete, [])
+        self.assertIsNone(plan.result)
+        self.assertEqual(plan_with_delete.delete, ['extra.txt'])
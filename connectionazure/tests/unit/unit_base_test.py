@@ -1,4 +1,18 @@
-from unittest import TestCase
+from unittest import IsolatedAsyncioTestCase, TestCase
+from unittest.mock import patch
 
 class UnitBaseTest(TestCase):
-    pass
\ No newline at end of file
+    def setUp(self) -> None:
+        super().setUp()
+
+        backoff_patcher = patch('connectionazure.retry.backoff_delay', return_value=0)
+        backoff_patcher.start()
+        self.addCleanup(backoff_patcher.stop)
+
+class UnitBaseAsyncTest(IsolatedAsyncioTestCase):
+    def setUp(self) -> None:
+        super().setUp()
+
+        backoff_patcher = patch('connectionazure.retry.backoff_delay', return_value=0)
+        backoff_patcher.start()
+        self.addCleanup(backoff_patcher.stop)
@@ -1,6 +1,9 @@
 from os import read
 from connectionazure.tests.unit.unit_base_test import UnitBaseTest
-from connectionazure.utils import read_file_as_bytes, write_file_as_bytes
+from connectionazure.utils import read_file_as_bytes, write_file_as_bytes, iterate_chunks, write_chunks_to_file
+from tempfile import TemporaryDirectory
+import os
+from io import BytesIO
 from unittest.mock import Mock, patch, mock_open
 
 
@@ -62,3 +65,45 @@ class UtilsTest(UnitBaseTest):
         file_opened.write.assert_called_with(binary)
 
         self.assertTrue(return_value)
+
+    def test_iterate_chunks_bytes(self):
+        data = b'0123456789'
+
+        chunks = list(iterate_chunks(data, 4))
+
+        self.assertEqual(chunks, [b'0123', b'4567', b'89'])
+
+    def test_iterate_chunks_stream(self):
+        data = BytesIO(b'0123456789')
+
+        chunks = list(iterate_chunks(data, 5))
+
+        self.assertEqual(chunks, [b'01234', b'56789'])
+
+    def test_write_chunks_to_file(self):
+        with TemporaryDirectory() as folder:
+            file_path = folder + '/inner_folder/text.txt'
+
+            size = write_chunks_to_file(file_path, iter([b'hello', b' ', b'world']))
+
+            with open(file_path, 'rb') as f:
+                self.assertEqual(f.read(), b'hello world')
+            self.assertEqual(size, 11)
+            self.assertEqual(os.listdir(folder + '/inner_folder'), ['text.txt'])
+
+    def test_write_chunks_to_file_error_keeps_old_file(self):
+        def chunks():
+            yield b'partial'
+            raise IOError('connection lost')
+
+        with TemporaryDirectory() as folder:
+            file_path = folder + '/text.txt'
+            with open(file_path, 'wb') as f:
+                f.write(b'old content')
+
+            with self.assertRaises(IOError):
+                write_chunks_to_file(file_path, chunks())
+
+            with open(file_path, 'rb') as f:
+                self.assertEqual(f.read(), b'old content')
+            self.assertEqual(os.listdir(folder), ['text.txt'])
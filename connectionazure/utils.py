@@ -1,4 +1,5 @@
-from os import makedirs, path
+from os import getpid, makedirs, path, remove, replace
+from threading import get_ident
 
 def read_file_as_bytes(path):
     """
@@ -43,3 +44,80 @@ def write_file_as_bytes(path_sink: str, binary: str) -> bool:
         f.write(binary)
 
     return True
+
+
+def iterate_chunks(data, chunk_size: int):
+    """yield the content of bytes or of a binary stream in chunks.
+
+    Args:
+        data (bytes or file-like): content to be split, streams are read with read(chunk_size).
+        chunk_size (int): maximum size in bytes of each chunk.
+
+    Yields:
+        bytes: next chunk of the content.
+    """
+    if isinstance(data, (bytes, bytearray, memoryview)):
+        view = memoryview(data)
+        for start in range(0, len(view), chunk_size):
+            yield bytes(view[start:start + chunk_size])
+    else:
+        while True:
+            chunk = data.read(chunk_size)
+            if not chunk:
+                break
+            yield chunk
+
+
+def write_to_file(path_sink: str, write) -> int:
+    """save the content written by a function in a file without ever leaving a partial file on path_sink.
+
+    The function writes to a temporary file in the same folder that is renamed to path_sink after it returns.
+
+    Args:
+        path_sink (str): path were file will be saved
+        write (callable): called with the temporary file opened in binary mode, returns the number of bytes written
+
+    Returns:
+        int: number of bytes saved
+    """
+    path_folder = path.dirname(path_sink)
+
+    if path_folder and not path.isdir(path_folder):
+        makedirs(path_folder, exist_ok=True)
+
+    temp_path = f'{path_sink}.{getpid()}.{get_ident()}.part'
+
+    try:
+        with open(temp_path, 'wb') as f:
+            size = write(f)
+
+        replace(temp_path, path_sink)
+    except BaseException:
+        if path.exists(temp_path):
+            remove(temp_path)
+        raise
+
+    return size
+
+
+def write_chunks_to_file(path_sink: str, chunks) -> int:
+    """save binary chunks in a file without holding the whole content in memory.
+
+    The chunks are written to a temporary file in the same folder that is renamed to path_sink
+    after the last chunk, so path_sink never contains a partial file.
+
+    Args:
+        path_sink (str): path were file will be saved
+        chunks (iterable of bytes): content that will be saved in order
+
+    Returns:
+        int: number of bytes saved
+    """
+    def write(f):
+        size = 0
+        for chunk in chunks:
+            f.write(chunk)
+            size += len(chunk)
+        return size
+
+    return write_to_file(path_sink, write)
@@ -6,7 +6,7 @@ setup(
     version='0.1.0',
     description='First',
     author="Artur Jacques Nürnberg",
-    install_requires=["pandas", "requests", "azure-storage-file-datalake", "azure-identity", "pyarrow"],
+    install_requires=["pandas", "requests", "azure-storage-file-datalake", "azure-storage-blob", "azure-identity", "pyarrow", "aiohttp"],
     setup_requires=['pytest-runner'],
     tests_require=['pytest==4.4.1'],
     test_suite='tests',